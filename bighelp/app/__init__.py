@@ -2,14 +2,28 @@
 Application logic for BigHelp.
 
 This package contains the core application logic and interface components.
+The modules are imported on first use, so importing the package itself
+is cheap.
 """
 
-from .menu import MainMenu, TutorialMenu, CommandDetailView
-from .actions import AppActions
+import importlib
+
+_EXPORTS = {
+    "MainMenu": "app.main_menu",
+    "TutorialMenu": "app.menu",
+    "CommandDetailView": "app.menu",
+    "AppActions": "app.actions",
+}
 
 __all__ = [
     "MainMenu",
     "TutorialMenu", 
     "CommandDetailView",
     "AppActions"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
\ No newline at end of file
@@ -4,84 +4,179 @@ Application actions for BigHelp.
 This module contains the business logic for various actions that can be performed.
 """
 
-import subprocess
+import threading
+import time
+from collections import deque
+from functools import partial
+from typing import Callable, Deque, List, Tuple
+
+from textual.dom import DOMNode
 from textual.widgets import Static
-from utils import run_command, get_system_info, is_command_available
+from textual.worker import Worker, NoActiveWorker, get_current_worker
+from app.widgets import StreamOutput
+from disks import disk_usage
+from netinfo import format_interfaces, network_interfaces
+from netprobe import ProbeResult, check_connectivity, check_sites, describe_connectivity
+from processes import ProcessSampler
+from utils import stream_command, get_system_info, is_command_available, format_size
+
+
+# Kept between clicks so CPU usage is measured since the previous click
+_process_sampler = ProcessSampler()
+
+# Actions taking longer than this are remembered for the performance overlay
+SLOW_ACTION_SECONDS = 0.2
+
+# The latest slow actions, as (name, seconds), oldest first
+_slow_actions: Deque[Tuple[str, float]] = deque(maxlen=10)
+
+
+def slow_actions() -> List[Tuple[str, float]]:
+    """
+    Get the latest actions that took longer than SLOW_ACTION_SECONDS.
+    
+    Returns:
+        Up to ten (action name, seconds) pairs, oldest first
+    """
+    return list(_slow_actions)
+
+
+def _is_cancelled() -> bool:
+    """Check whether the worker running the current action was cancelled."""
+    try:
+        return get_current_worker().is_cancelled
+    except NoActiveWorker:
+        return False
+
+
+def _show(output_widget: Static, text: str) -> None:
+    """
+    Update the output widget from the UI thread or from a worker thread.
+    
+    Updates coming from a cancelled worker are dropped so a stale action
+    never overwrites the result of the one that replaced it.
+    """
+    if threading.current_thread() is threading.main_thread():
+        output_widget.update(text)
+    elif not _is_cancelled():
+        output_widget.app.call_from_thread(output_widget.update, text)
 
 
 class AppActions:
     """Collection of actions that can be performed by the application."""
     
+    # Sites checked by test_website_connection, as "host" or "host:port"
+    WEBSITES = ["google.com", "github.com", "ubuntu.com"]
+    
+    @staticmethod
+    def run_in_background(
+        node: DOMNode,
+        action: Callable[[Static], None],
+        output_widget: Static
+    ) -> Worker:
+        """
+        Run an action in a worker thread so the UI stays responsive.
+        
+        Only one action runs per screen at a time: starting a new one
+        cancels the previous action, and leaving the screen cancels it too.
+        
+        Args:
+            node: The screen that owns the action
+            action: One of the AppActions methods
+            output_widget: Widget that receives the action's status updates
+            
+        Returns:
+            The worker running the action
+        """
+        return node.run_worker(
+            partial(AppActions._guarded, action, output_widget),
+            name=action.__name__,
+            group="actions",
+            exclusive=True,
+            thread=True
+        )
+    
+    @staticmethod
+    def _guarded(action: Callable[[Static], None], output_widget: Static) -> None:
+        """Run an action, reporting unexpected errors instead of crashing."""
+        start = time.monotonic()
+        try:
+            action(output_widget)
+        except Exception as e:
+            _show(output_widget, f"❌ Something went wrong: {e}")
+        finally:
+            elapsed = time.monotonic() - start
+            if elapsed >= SLOW_ACTION_SECONDS:
+                _slow_actions.append((action.__name__, elapsed))
+    
+    @staticmethod
+    def cancel(node: DOMNode, output_widget: Static) -> bool:
+        """
+        Cancel the action running on a screen.
+        
+        Returns:
+            True if an action was cancelled, False if nothing was running
+        """
+        cancelled = node.workers.cancel_group(node, "actions")
+        if cancelled:
+            output_widget.update("⏹️ Action cancelled")
+        return bool(cancelled)
+    
     @staticmethod
     def check_internet_connection(output_widget: Static) -> None:
         """Check if internet connection is working."""
-        output_widget.update("🔍 Checking internet connection...")
-        
-        success, result = run_command(["ping", "-c", "1", "google.com"])
+        _show(output_widget, "🔍 Checking internet connection...")
         
-        if success:
-            output_widget.update("✅ Internet connection is working!")
-        else:
-            output_widget.update("❌ No internet connection detected")
+        verdict = check_connectivity()
+        _show(output_widget, describe_connectivity(verdict))
     
     @staticmethod
     def test_website_connection(output_widget: Static) -> None:
-        """Test connection to a specific website."""
-        # For now, test a few common websites
-        websites = ["google.com", "github.com", "ubuntu.com"]
+        """Test connection to several websites at the same time."""
         results = []
         
-        output_widget.update("🔍 Testing website connections...")
+        _show(output_widget, "🔍 Testing website connections...")
         
-        for site in websites:
-            success, _ = run_command(["ping", "-c", "1", site])
-            status = "✅" if success else "❌"
-            results.append(f"{status} {site}")
+        def report(result: ProbeResult) -> None:
+            if result.ok:
+                results.append(f"✅ {result.site} ({result.rtt * 1000:.0f} ms)")
+            else:
+                results.append(f"❌ {result.site} ({result.error})")
+            _show(output_widget, "\n".join(results))
         
-        output_widget.update("\n".join(results))
+        check_sites(AppActions.WEBSITES, on_result=report)
     
     @staticmethod
     def show_network_info(output_widget: Static) -> None:
         """Show network information."""
-        output_widget.update("🔍 Getting network information...")
-        
-        # Try ip command first, then ifconfig
-        if is_command_available("ip"):
-            success, result = run_command(["ip", "addr", "show"])
-        elif is_command_available("ifconfig"):
-            success, result = run_command(["ifconfig"])
-        else:
-            output_widget.update("❌ No network tools available")
-            return
+        _show(output_widget, "🔍 Getting network information...")
         
-        if success:
-            # Extract key information
-            lines = result.split('\n')
-            info = "📡 Network Information:\n"
-            for line in lines:
-                if "inet " in line and "127.0.0.1" not in line:
-                    ip = line.split()[1]
-                    info += f"🌐 IP Address: {ip}\n"
-            output_widget.update(info if info != "📡 Network Information:\n" else "❌ No active network connections")
-        else:
-            output_widget.update("❌ Error getting network information")
+        interfaces = network_interfaces()
+        info = format_interfaces(interfaces)
+        _show(output_widget, f"📡 Network Information:\n{info}" if interfaces else info)
     
     @staticmethod
-    def update_package_list(output_widget: Static) -> None:
-        """Update the package list."""
-        output_widget.update("🔄 Updating package list...")
+    def update_package_list(output_widget: StreamOutput) -> None:
+        """Update the package list, showing the output as it comes."""
+        output_widget.clear()
         
         # Detect package manager
         if is_command_available("apt"):
-            success, result = run_command(["sudo", "apt", "update"])
+            command = ["sudo", "apt", "update"]
         elif is_command_available("yum"):
-            success, result = run_command(["sudo", "yum", "check-update"])
+            command = ["sudo", "yum", "check-update"]
         elif is_command_available("pacman"):
-            success, result = run_command(["sudo", "pacman", "-Sy"])
+            command = ["sudo", "pacman", "-Sy"]
         else:
             output_widget.update("❌ No supported package manager found")
             return
         
+        output_widget.update(f"🔄 Updating package list: {' '.join(command)}")
+        success, result = stream_command(command, output_widget.write_lines, cancelled=_is_cancelled)
+        if _is_cancelled():
+            output_widget.update("⏹️ Action cancelled")
+            return
+        
         if success:
             output_widget.update("✅ Package list updated successfully!")
         else:
@@ -90,27 +185,27 @@ class AppActions:
     @staticmethod
     def upgrade_packages(output_widget: Static) -> None:
         """Upgrade packages."""
-        output_widget.update("⚠️ This action requires admin permissions")
-        output_widget.update("💡 Run this from terminal: sudo apt upgrade")
+        _show(output_widget, "⚠️ This action requires admin permissions")
+        _show(output_widget, "💡 Run this from terminal: sudo apt upgrade")
     
     @staticmethod
     def search_package(output_widget: Static) -> None:
         """Search for a package."""
         # For demo, show how to search
-        output_widget.update("🔍 To search for packages, use:\n")
+        _show(output_widget, "🔍 To search for packages, use:\n")
         if is_command_available("apt"):
-            output_widget.update("apt search <package_name>")
+            _show(output_widget, "apt search <package_name>")
         elif is_command_available("yum"):
-            output_widget.update("yum search <package_name>")
+            _show(output_widget, "yum search <package_name>")
         elif is_command_available("pacman"):
-            output_widget.update("pacman -Ss <package_name>")
+            _show(output_widget, "pacman -Ss <package_name>")
         else:
-            output_widget.update("No package manager found")
+            _show(output_widget, "No package manager found")
     
     @staticmethod
     def show_system_info(output_widget: Static) -> None:
         """Show system information."""
-        output_widget.update("🔍 Getting system information...")
+        _show(output_widget, "🔍 Getting system information...")
         
         info = get_system_info()
         display_text = f"""
@@ -121,60 +216,57 @@ class AppActions:
 📟 Terminal: {info['terminal']}
 🔢 Kernel: {info['release']}
 """
-        output_widget.update(display_text)
+        _show(output_widget, display_text)
     
     @staticmethod
     def show_disk_space(output_widget: Static) -> None:
         """Show disk space information."""
-        output_widget.update("💾 Checking disk space...")
+        _show(output_widget, "💾 Checking disk space...")
         
-        success, result = run_command(["df", "-h"])
+        try:
+            disks = disk_usage()
+        except OSError:
+            _show(output_widget, "❌ Error getting disk space information")
+            return
         
-        if success:
-            # Parse and format the output
-            lines = result.strip().split('\n')
-            if len(lines) > 1:
-                output_text = "💾 Disk Space Usage:\n━━━━━━━━━━━━━━━━━━━━\n"
-                # Show only the main filesystem (usually the first one)
-                for line in lines[1:]:
-                    parts = line.split()
-                    if len(parts) >= 6 and parts[5] == '/':
-                        output_text += f"📁 Root: {parts[1]} total, {parts[2]} used, {parts[3]} available\n"
-                        output_text += f"📊 Usage: {parts[4]}\n"
-                        break
-                output_widget.update(output_text)
-            else:
-                output_widget.update("❌ Unable to read disk information")
-        else:
-            output_widget.update("❌ Error getting disk space information")
+        if not disks:
+            _show(output_widget, "❌ Unable to read disk information")
+            return
+        
+        status_icons = {"ok": "🟢", "warning": "🟡", "critical": "🔴"}
+        output_text = "💾 Disk Space Usage:\n━━━━━━━━━━━━━━━━━━━━\n"
+        for disk in disks:
+            if disk.error:
+                output_text += f"⚪ {disk.mount.mountpoint}: {disk.error}\n"
+                continue
+            output_text += (
+                f"{status_icons[disk.status]} {disk.mount.mountpoint} ({disk.mount.fstype}): "
+                f"{format_size(disk.total)} total, {format_size(disk.used)} used, "
+                f"{format_size(disk.available)} available, {disk.percent:.0f}% full\n"
+            )
+        _show(output_widget, output_text)
     
     @staticmethod
     def show_processes(output_widget: Static) -> None:
         """Show running processes."""
-        output_widget.update("🖥️ Getting process information...")
+        _show(output_widget, "🖥️ Getting process information...")
         
-        success, result = run_command(["ps", "aux", "--sort=-%cpu"])
+        if not _process_sampler.has_sample:
+            # CPU usage is measured between two samples
+            _process_sampler.top()
+            time.sleep(0.5)
         
-        if success:
-            lines = result.split('\n')
-            if len(lines) > 1:
-                output_text = "🖥️ Top Processes (by CPU usage):\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                # Show header and top 5 processes
-                header = lines[0]
-                output_text += f"{header[:60]}...\n"
-                output_text += "─" * 60 + "\n"
-                
-                for i, line in enumerate(lines[1:6]):
-                    if line.strip():
-                        parts = line.split(None, 10)
-                        if len(parts) >= 11:
-                            cpu = parts[2]
-                            mem = parts[3]
-                            command = parts[10][:30]
-                            output_text += f"CPU: {cpu:>5}% | MEM: {mem:>5}% | {command}...\n"
-                
-                output_widget.update(output_text)
-            else:
-                output_widget.update("❌ Unable to read process information")
-        else:
-            output_widget.update("❌ Error getting process information")
\ No newline at end of file
+        try:
+            processes = _process_sampler.top(5)
+        except OSError:
+            _show(output_widget, "❌ Error getting process information")
+            return
+        
+        if not processes:
+            _show(output_widget, "❌ Unable to read process information")
+            return
+        
+        output_text = "🖥️ Top Processes (by CPU usage):\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        for process in processes:
+            output_text += f"CPU: {process.cpu:>5.1f}% | MEM: {process.memory:>5.1f}% | {process.user[:10]:<10} | {process.command[:30]}\n"
+        _show(output_widget, output_text)
@@ -0,0 +1,100 @@
+"""
+Screen cache for BigHelp.
+
+Building a screen means composing and laying out its whole widget tree.
+This module keeps recently visited screens alive, so going back to a
+command shows the screen that was already built.
+"""
+
+from collections import OrderedDict
+from typing import Hashable, Tuple, Type
+
+from textual.app import App, ScreenStackError
+from textual.screen import Screen
+
+
+class ScreenCache:
+    """
+    Least recently used cache of screens.
+
+    Screens are keyed by their type and the arguments used to create them.
+    The cache is limited both by the number of screens and by their
+    estimated size, counted in widgets.
+    """
+
+    def __init__(self, app: App, max_screens: int = 32, max_widgets: int = 3000) -> None:
+        """
+        Args:
+            app: The application whose screens are cached
+            max_screens: Maximum number of screens to keep
+            max_widgets: Maximum number of widgets across all kept screens
+        """
+        self.app = app
+        self.max_screens = max_screens
+        self.max_widgets = max_widgets
+        self._screens: "OrderedDict[str, Screen]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._screens)
+
+    @staticmethod
+    def _name(key: Tuple[Hashable, ...]) -> str:
+        return "cached:" + "/".join(str(part) for part in key)
+
+    def push(self, screen_type: Type[Screen], *args: Hashable) -> Screen:
+        """
+        Show a screen, reusing the cached one if there is one.
+
+        Args:
+            screen_type: The screen class
+            *args: Arguments for the screen class, also used as the cache key
+
+        Returns:
+            The screen that was pushed
+        """
+        name = self._name((screen_type.__name__, *args))
+        screen = self._screens.get(name)
+        if screen is not None and screen in self.app.screen_stack:
+            # A screen can only be on the stack once, so show a fresh copy
+            screen = screen_type(*args)
+            self.app.push_screen(screen)
+            return screen
+        if screen is not None and self.app.is_screen_installed(name):
+            self._screens.move_to_end(name)
+            self.hits += 1
+        else:
+            screen = screen_type(*args)
+            self.app.install_screen(screen, name)
+            self._screens[name] = screen
+            self.misses += 1
+        self.app.push_screen(name)
+        self._evict()
+        return screen
+
+    def size(self) -> int:
+        """Estimate the size of the cached screens, in widgets."""
+        return sum(len(screen.walk_children()) for screen in self._screens.values())
+
+    def clear(self) -> None:
+        """Drop every cached screen that is not being shown."""
+        for name in list(self._screens):
+            self._drop(name)
+
+    def _evict(self) -> None:
+        """Drop the least recently used screens until the cache fits."""
+        for name in list(self._screens):
+            if len(self._screens) <= self.max_screens and self.size() <= self.max_widgets:
+                break
+            self._drop(name)
+
+    def _drop(self, name: str) -> None:
+        """Drop a cached screen, unless it is on the screen stack."""
+        try:
+            self.app.uninstall_screen(name)
+        except ScreenStackError:
+            return
+        screen = self._screens.pop(name)
+        if screen.is_attached:
+            screen.remove()
@@ -0,0 +1,48 @@
+"""
+Main menu for BigHelp.
+
+This module only holds the first menu shown at startup, so the app can
+draw its first frame before the other screens are imported.
+"""
+
+from textual.widgets import Button, Static
+from textual.containers import Vertical
+from textual.app import ComposeResult
+
+
+class MainMenu(Vertical):
+    """Main menu with all the available options."""
+    
+    def compose(self) -> ComposeResult:
+        """Create the main menu layout."""
+        yield Static("🚀 What would you like to do today?", classes="menu-title")
+        yield Button("📚 Learn Terminal Commands", id="learn-commands", variant="primary")
+        yield Button("🔎 Search Commands", id="search-commands")
+        yield Button("🌐 Connect to Internet", id="connect-internet") 
+        yield Button("📦 Manage Packages", id="manage-packages")
+        yield Button("⚙️ System Settings", id="system-settings")
+        yield Button("ℹ️ About BigHelp", id="about", variant="success")
+        yield Button("👋 Exit", id="exit", variant="warning")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press events."""
+        # The other screens are only loaded once they are needed
+        from app.menu import (
+            TutorialMenu, SearchScreen, NetworkActionsScreen,
+            PackageActionsScreen, SystemActionsScreen, AboutScreen
+        )
+        
+        if event.button.id == "learn-commands":
+            self.app.push_screen(TutorialMenu())
+        elif event.button.id == "search-commands":
+            self.app.push_screen(SearchScreen())
+        elif event.button.id == "connect-internet":
+            self.app.push_screen(NetworkActionsScreen())
+        elif event.button.id == "manage-packages":
+            self.app.push_screen(PackageActionsScreen())
+        elif event.button.id == "system-settings":
+            self.app.push_screen(SystemActionsScreen())
+        elif event.button.id == "about":
+            self.app.push_screen(AboutScreen())
+        elif event.button.id == "exit":
+            self.app.exit()
@@ -4,45 +4,19 @@ Menu components for BigHelp application.
 This module contains all the menu interfaces used in the application.
 """
 
-from textual.widgets import Button, Static
+from textual.widgets import Button, Input, OptionList, Static
+from textual.widgets.option_list import Option
 from textual.containers import Container, Vertical, Horizontal, VerticalScroll
 from textual.binding import Binding
 from textual.screen import Screen
 from textual.app import ComposeResult
 from textual import events
+from rich.text import Text
 from typing import Optional
 
-from tutorials import ALL_TUTORIALS
-from app.actions import AppActions
-
-
-class MainMenu(Vertical):
-    """Main menu with all the available options."""
-    
-    def compose(self) -> ComposeResult:
-        """Create the main menu layout."""
-        yield Static("🚀 What would you like to do today?", classes="menu-title")
-        yield Button("📚 Learn Terminal Commands", id="learn-commands", variant="primary")
-        yield Button("🌐 Connect to Internet", id="connect-internet") 
-        yield Button("📦 Manage Packages", id="manage-packages")
-        yield Button("⚙️ System Settings", id="system-settings")
-        yield Button("ℹ️ About BigHelp", id="about", variant="success")
-        yield Button("👋 Exit", id="exit", variant="warning")
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press events."""
-        if event.button.id == "learn-commands":
-            self.app.push_screen(TutorialMenu())
-        elif event.button.id == "connect-internet":
-            self.app.push_screen(NetworkActionsScreen())
-        elif event.button.id == "manage-packages":
-            self.app.push_screen(PackageActionsScreen())
-        elif event.button.id == "system-settings":
-            self.app.push_screen(SystemActionsScreen())
-        elif event.button.id == "about":
-            self.app.push_screen(AboutScreen())
-        elif event.button.id == "exit":
-            self.app.exit()
+from tutorials import ALL_TUTORIALS, CATEGORIES
+from app.main_menu import MainMenu  # noqa: F401 - kept importable from here
+from app.widgets import CommandList, MetricsPanel, StreamOutput, render_command
 
 
 class TutorialMenu(Screen):
@@ -63,9 +37,18 @@ class TutorialMenu(Screen):
             Button("📁 Basic Commands (ls, cd, mkdir...)", id="basic", variant="primary"),
             Button("🌐 Network Commands (ping, wget...)", id="network"),
             Button("⚙️ System Commands (ps, df, date...)", id="system"),
+            *[Button(ALL_TUTORIALS.title(category), id=f"category-{category}")
+              for category in ALL_TUTORIALS if category not in CATEGORIES],
             Button("🔙 Back to Main Menu", id="back", variant="warning"),
             classes="tutorial-menu"
         )
+        pack_errors = ALL_TUTORIALS.pack_errors
+        if pack_errors:
+            yield Static(
+                Text("⚠️ Some tutorial packs have problems:\n" + "\n".join(pack_errors)),
+                id="pack-errors",
+                classes="result-display"
+            )
     
     def on_mount(self) -> None:
         """Set focus when screen mounts."""
@@ -78,7 +61,9 @@ class TutorialMenu(Screen):
         if event.button.id == "back":
             self.app.pop_screen()
         elif event.button.id in ["basic", "network", "system"]:
-            self.app.push_screen(CommandListScreen(event.button.id))
+            self.app.screen_cache.push(CommandListScreen, event.button.id)
+        elif event.button.id.startswith("category-"):
+            self.app.screen_cache.push(CommandListScreen, event.button.id.replace("category-", "", 1))
     
     def action_back(self) -> None:
         """Go back to the previous screen."""
@@ -109,36 +94,25 @@ class CommandListScreen(Screen):
     
     def compose(self) -> ComposeResult:
         """Create the command list layout."""
-        category_title = {
-            "basic": "📁 Basic Commands",
-            "network": "🌐 Network Commands", 
-            "system": "⚙️ System Commands"
-        }
-        
         yield Container(
-            Static(category_title[self.category], classes="menu-title"),
-            VerticalScroll(
-                *[Button(f"{cmd['name']} - {cmd['description']}", 
-                        id=f"cmd-{name}", variant="default")
-                  for name, cmd in self.commands.items()],
-                Button("🔙 Back", id="back", variant="warning"),
-                classes="command-list"
-            )
+            Static(ALL_TUTORIALS.title(self.category), classes="menu-title"),
+            CommandList(self.commands, id="command-list"),
+            Button("🔙 Back", id="back", variant="warning"),
+            classes="command-list"
         )
     
     def on_mount(self) -> None:
         """Set focus when screen mounts."""
-        buttons = self.query("Button")
-        if buttons:
-            buttons[0].focus()
+        self.query_one("#command-list", CommandList).focus()
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle command selection."""
+        """Handle the back button."""
         if event.button.id == "back":
             self.app.pop_screen()
-        elif event.button.id.startswith("cmd-"):
-            command_name = event.button.id.replace("cmd-", "")
-            self.app.push_screen(CommandDetailView(self.category, command_name))
+    
+    def on_command_list_selected(self, event: CommandList.Selected) -> None:
+        """Open the selected command."""
+        self.app.screen_cache.push(CommandDetailView, self.category, event.command)
     
     def action_back(self) -> None:
         """Go back to the previous screen."""
@@ -171,39 +145,9 @@ class CommandDetailView(Screen):
     
     def compose(self) -> ComposeResult:
         """Create the command detail layout."""
-        # Build content using Rich markup instead of Markdown
-        content_widgets = [
-            Static(f"[bold blue]🚀 {self.command_info['name']}[/bold blue]", classes="command-title"),
-            Static("", classes="spacer"),
-            Static("[bold green]Description:[/bold green]", classes="section-title"),
-            Static(self.command_info['description'], classes="description"),
-            Static("", classes="spacer"),
-            Static("[bold green]What does it do?[/bold green]", classes="section-title"),
-            Static(self.command_info['explanation'], classes="explanation"),
-            Static("", classes="spacer"),
-            Static("[bold green]Examples:[/bold green]", classes="section-title"),
-        ]
-        
-        # Add examples
-        for example in self.command_info['examples']:
-            content_widgets.extend([
-                Static(f"[bold yellow]`{example['command']}`[/bold yellow]", classes="example-command"),
-                Static(example['explanation'], classes="example-explanation"),
-                Static("", classes="spacer"),
-            ])
-        
-        # Add tip and safety note
-        content_widgets.extend([
-            Static("[bold blue]💡 Tip:[/bold blue]", classes="section-title"),
-            Static(self.command_info['tip'], classes="tip"),
-            Static("", classes="spacer"),
-            Static("[bold red]⚠️ Safety Note:[/bold red]", classes="section-title"),
-            Static(self.command_info['safety'], classes="safety"),
-        ])
-        
         yield Container(
             VerticalScroll(
-                *content_widgets,
+                Static(render_command(self.command_info), classes="command-content"),
                 classes="command-detail"
             ),
             Horizontal(
@@ -241,6 +185,62 @@ class CommandDetailView(Screen):
             focused[0].press()
 
 
+class SearchScreen(Screen):
+    """Screen for finding a command by typing part of its name or description."""
+    
+    BINDINGS = [
+        Binding("escape", "back", "Back"),
+        Binding("down", "focus_next", "Next", show=False),
+        Binding("up", "focus_previous", "Previous", show=False),
+    ]
+    
+    def compose(self) -> ComposeResult:
+        """Create the search layout."""
+        yield Container(
+            Static("🔎 Search Commands", classes="menu-title"),
+            Input(placeholder="Type what you want to do, like 'copy files' or 'disk'", id="search-input"),
+            OptionList(id="search-results"),
+            classes="search-container"
+        )
+    
+    def on_mount(self) -> None:
+        """Set focus when screen mounts."""
+        self.query_one("#search-input", Input).focus()
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Update the results on every keystroke."""
+        from search import get_index
+        
+        results = get_index().search(event.value) if event.value.strip() else []
+        option_list = self.query_one("#search-results", OptionList)
+        option_list.clear_options()
+        option_list.add_options([
+            Option(f"{result.command} - {result.description}", id=f"{result.category}/{result.command}")
+            for result in results
+        ])
+        if results:
+            option_list.highlighted = 0
+    
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Open the best match when Enter is pressed in the search box."""
+        option_list = self.query_one("#search-results", OptionList)
+        if option_list.option_count:
+            self.open_command(option_list.get_option_at_index(0).id)
+    
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        """Open the selected command."""
+        self.open_command(event.option.id)
+    
+    def open_command(self, option_id: str) -> None:
+        """Show the details of a search result."""
+        category, command = option_id.split("/", 1)
+        self.app.screen_cache.push(CommandDetailView, category, command)
+    
+    def action_back(self) -> None:
+        """Go back to the previous screen."""
+        self.app.pop_screen()
+
+
 class InteractiveTerminal(Screen):
     """Interactive terminal for trying commands safely."""
     
@@ -253,8 +253,16 @@ class InteractiveTerminal(Screen):
     ]
     
     def __init__(self, command_info: dict) -> None:
+        from sandbox import HOME, get_shell
+        
         super().__init__()
         self.command_info = command_info
+        self.shell = get_shell()
+        # Every lesson starts in the home folder, where its example files
+        # are, even if an earlier lesson ran cd
+        self.shell.fs.cwd = HOME
+        # The sandbox as it was when the lesson started, for "Reset Lesson"
+        self.lesson_start = self.shell.fs.snapshot()
     
     def compose(self) -> ComposeResult:
         """Create the interactive terminal layout."""
@@ -265,6 +273,7 @@ class InteractiveTerminal(Screen):
                 *[Button(f"Run: {example['command']}", 
                         id=f"run-{i}", variant="default")
                   for i, example in enumerate(self.command_info['examples'])],
+                Button("🔄 Reset Lesson", id="reset"),
                 Button("📖 Read More About This Command", id="info", variant="success"),
                 Button("🔙 Back", id="back", variant="warning"),
                 classes="example-list"
@@ -285,6 +294,9 @@ class InteractiveTerminal(Screen):
         elif event.button.id == "info":
             # Go back to the command detail view
             self.app.pop_screen()
+        elif event.button.id == "reset":
+            self.shell.fs.restore(self.lesson_start)
+            self.query_one("#output", Static).update("🔄 Everything is back to how it was when the lesson started")
         elif event.button.id.startswith("run-"):
             example_index = int(event.button.id.replace("run-", ""))
             self.run_example(example_index)
@@ -294,23 +306,31 @@ class InteractiveTerminal(Screen):
         example = self.command_info['examples'][index]
         command = example['command']
         
-        # For safety, we'll simulate some commands instead of actually running them
+        # Commands are never really run: the sandbox shell runs the ones it
+        # knows on a pretend filesystem that only exists in memory
         output_widget = self.query_one("#output", Static)
         
-        if command.startswith(('rm', 'sudo', 'reboot', 'shutdown')):
-            output_widget.update(f"🚫 For safety, '{command}' is not executed in demo mode")
+        from safety import CAUTION, classify
+        verdict = classify(command)
+        # A tutorial pack may have an example with an empty command
+        words = command.split()
+        
+        if not verdict.allowed:
+            output_widget.update(Text(
+                f"🚫 For safety, '{command}' is not executed in demo mode\n"
+                f"'{verdict.command}': {verdict.reason}"
+            ))
+        elif words and self.shell.supports(words[0]):
+            prompt = self.shell.prompt
+            success, output = self.shell.run(command)
+            lines = [f"{prompt} {command}"]
+            if output:
+                lines.append(output if success else f"❌ {output}")
+            output_widget.update(Text("\n".join(lines)))
+        elif verdict.level == CAUTION:
+            output_widget.update(Text(f"⚠️ Command '{command}' would run here, but be careful: {verdict.reason}"))
         else:
-            # Simulate safe commands
-            if command == "whoami":
-                output_widget.update("student")
-            elif command == "pwd":
-                output_widget.update("/home/student")
-            elif command.startswith("ls"):
-                output_widget.update("Documents  Pictures  Music  Videos  Downloads")
-            elif command == "date":
-                output_widget.update("Mon Dec 25 10:30:00 EST 2023")
-            else:
-                output_widget.update(f"✅ Command '{command}' would run here safely")
+            output_widget.update(Text(f"✅ Command '{command}' would run here safely"))
     
     def action_back(self) -> None:
         """Go back to the previous screen."""
@@ -328,6 +348,7 @@ class NetworkActionsScreen(Screen):
     
     BINDINGS = [
         Binding("escape", "back", "Back"),
+        Binding("x", "cancel_action", "Cancel"),
         Binding("up", "focus_previous", "Previous", show=False),
         Binding("down", "focus_next", "Next", show=False),
         Binding("enter", "select", "Select", show=False),
@@ -352,14 +373,23 @@ class NetworkActionsScreen(Screen):
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle network action buttons."""
+        from app.actions import AppActions
+        
+        result = self.query_one("#result", Static)
         if event.button.id == "back":
             self.app.pop_screen()
         elif event.button.id == "check-internet":
-            AppActions.check_internet_connection(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.check_internet_connection, result)
         elif event.button.id == "test-website":
-            AppActions.test_website_connection(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.test_website_connection, result)
         elif event.button.id == "network-info":
-            AppActions.show_network_info(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.show_network_info, result)
+    
+    def action_cancel_action(self) -> None:
+        """Cancel the action that is still running."""
+        from app.actions import AppActions
+        
+        AppActions.cancel(self, self.query_one("#result", Static))
     
     def action_back(self) -> None:
         """Go back to the previous screen."""
@@ -377,6 +407,7 @@ class PackageActionsScreen(Screen):
     
     BINDINGS = [
         Binding("escape", "back", "Back"),
+        Binding("x", "cancel_action", "Cancel"),
         Binding("up", "focus_previous", "Previous", show=False),
         Binding("down", "focus_next", "Next", show=False),
         Binding("enter", "select", "Select", show=False),
@@ -390,8 +421,10 @@ class PackageActionsScreen(Screen):
             Button("🔄 Update Package List", id="update-packages"),
             Button("🆕 Upgrade Packages", id="upgrade-packages"),
             Button("🔍 Search for Package", id="search-package"),
+            Button("📋 Installed Package Info", id="package-info"),
             Button("🔙 Back", id="back", variant="warning"),
-            Static("", id="result", classes="result-display")
+            Static("", id="result", classes="result-display"),
+            StreamOutput(id="update-output")
         )
     
     def on_mount(self) -> None:
@@ -402,14 +435,26 @@ class PackageActionsScreen(Screen):
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle package management buttons."""
+        from app.actions import AppActions
+        
+        result = self.query_one("#result", Static)
         if event.button.id == "back":
             self.app.pop_screen()
         elif event.button.id == "update-packages":
-            AppActions.update_package_list(self.query_one("#result", Static))
+            output = self.query_one("#update-output", StreamOutput)
+            AppActions.run_in_background(self, AppActions.update_package_list, output)
         elif event.button.id == "upgrade-packages":
-            AppActions.upgrade_packages(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.upgrade_packages, result)
         elif event.button.id == "search-package":
-            AppActions.search_package(self.query_one("#result", Static))
+            self.app.push_screen(PackageSearchScreen())
+        elif event.button.id == "package-info":
+            self.app.push_screen(PackageInfoScreen())
+    
+    def action_cancel_action(self) -> None:
+        """Cancel the action that is still running."""
+        from app.actions import AppActions
+        
+        AppActions.cancel(self, self.query_one("#result", Static))
     
     def action_back(self) -> None:
         """Go back to the previous screen."""
@@ -422,11 +467,206 @@ class PackageActionsScreen(Screen):
             focused[0].press()
 
 
+class PackageSearchScreen(Screen):
+    """Screen for searching the repositories for a package, offline."""
+    
+    BINDINGS = [
+        Binding("escape", "back", "Back"),
+        Binding("down", "focus_next", "Next", show=False),
+        Binding("up", "focus_previous", "Previous", show=False),
+    ]
+    
+    def compose(self) -> ComposeResult:
+        """Create the package search layout."""
+        yield Container(
+            Static("🔍 Search for Package", classes="menu-title"),
+            Input(placeholder="Loading the package lists...", id="package-input", disabled=True),
+            OptionList(id="package-results"),
+            Static("", id="package-details", classes="result-display"),
+            classes="search-container"
+        )
+    
+    def on_mount(self) -> None:
+        """Read the package lists without blocking the interface."""
+        from pacman import get_sync_index
+        
+        index = get_sync_index()
+        if not index.exists:
+            from app.actions import AppActions
+            AppActions.run_in_background(
+                self, AppActions.search_package, self.query_one("#package-details", Static)
+            )
+            return
+        self.run_worker(self._load_index, thread=True, group="sync-index", exclusive=True)
+    
+    def _load_index(self) -> None:
+        """Read the repository databases that changed, in a worker thread."""
+        from pacman import get_sync_index
+        
+        index = get_sync_index()
+        index.refresh()
+        self.app.call_from_thread(self._index_ready, len(index), index.errors)
+    
+    def _index_ready(self, count: int, errors: list) -> None:
+        """Enable the search box once the package lists are read."""
+        package_input = self.query_one("#package-input", Input)
+        package_input.placeholder = f"Search {count} packages by name or description, like 'browser'"
+        package_input.disabled = False
+        package_input.focus()
+        if errors:
+            self.query_one("#package-details", Static).update(
+                "⚠️ Some package lists couldn't be read:\n" + "\n".join(errors)
+            )
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Update the matching packages on every keystroke."""
+        from pacman import get_sync_index
+        
+        packages = get_sync_index().search(event.value)
+        option_list = self.query_one("#package-results", OptionList)
+        option_list.clear_options()
+        option_list.add_options([
+            Option(
+                f"{package.repo}/{package.name} {package.version} - {package.description}",
+                id=f"{package.repo}/{package.name}"
+            )
+            for package in packages
+        ])
+        if packages:
+            option_list.highlighted = 0
+    
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Show the best match when Enter is pressed in the search box."""
+        option_list = self.query_one("#package-results", OptionList)
+        if option_list.option_count:
+            self.show_package(option_list.get_option_at_index(0).id)
+    
+    def on_option_list_option_highlighted(self, event: OptionList.OptionHighlighted) -> None:
+        """Show the highlighted package."""
+        self.show_package(event.option.id)
+    
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        """Show the selected package."""
+        self.show_package(event.option.id)
+    
+    def show_package(self, option_id: str) -> None:
+        """Show a package and how to install it."""
+        from pacman import get_local_database
+        
+        repo, name = option_id.split("/", 1)
+        details = self.query_one("#package-details", Static)
+        installed = get_local_database().get(name)
+        if installed is not None:
+            status = f"✅ Installed ({installed.version})"
+            hint = f"💡 See more in Installed Package Info, or remove it with: sudo pacman -R {name}"
+        else:
+            status = "⬜ Not installed"
+            hint = f"💡 Install it with: sudo pacman -S {repo}/{name}"
+        details.update(f"📦 {repo}/{name}\n{status}\n{hint}")
+    
+    def action_back(self) -> None:
+        """Go back to the previous screen."""
+        self.app.pop_screen()
+
+
+class PackageInfoScreen(Screen):
+    """Screen for looking up installed packages in the pacman database."""
+    
+    BINDINGS = [
+        Binding("escape", "back", "Back"),
+        Binding("down", "focus_next", "Next", show=False),
+        Binding("up", "focus_previous", "Previous", show=False),
+    ]
+    
+    def compose(self) -> ComposeResult:
+        """Create the package lookup layout."""
+        yield Container(
+            Static("📋 Installed Package Info", classes="menu-title"),
+            Input(placeholder="Type part of a package name, like 'fire'", id="package-input"),
+            OptionList(id="package-results"),
+            Static("", id="package-details", classes="result-display"),
+            classes="search-container"
+        )
+    
+    def on_mount(self) -> None:
+        """Set focus when screen mounts."""
+        from pacman import get_local_database
+        
+        package_input = self.query_one("#package-input", Input)
+        if not get_local_database().exists:
+            package_input.disabled = True
+            self.query_one("#package-details", Static).update(
+                "❌ No pacman database found. This only works on Arch-based systems."
+            )
+            return
+        package_input.focus()
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Update the matching packages on every keystroke."""
+        from pacman import get_local_database
+        
+        packages = get_local_database().search(event.value)
+        option_list = self.query_one("#package-results", OptionList)
+        option_list.clear_options()
+        option_list.add_options([
+            Option(f"{package.name} {package.version} - {package.description}", id=package.name)
+            for package in packages
+        ])
+        if packages:
+            option_list.highlighted = 0
+    
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Show the best match when Enter is pressed in the search box."""
+        option_list = self.query_one("#package-results", OptionList)
+        if option_list.option_count:
+            self.show_package(option_list.get_option_at_index(0).id)
+    
+    def on_option_list_option_highlighted(self, event: OptionList.OptionHighlighted) -> None:
+        """Show the highlighted package."""
+        self.show_package(event.option.id)
+    
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        """Show the selected package."""
+        self.show_package(event.option.id)
+    
+    def show_package(self, name: str) -> None:
+        """Show the details of an installed package."""
+        import time
+        from pacman import dependency_name, get_local_database
+        from utils import format_size
+        
+        database = get_local_database()
+        package = database.get(name)
+        details = self.query_one("#package-details", Static)
+        if package is None:
+            details.update(f"❌ {name} is not installed")
+            return
+        
+        depends = ", ".join(dependency_name(dependency) for dependency in package.depends)
+        required_by = ", ".join(database.required_by(package.name))
+        installed = time.strftime("%Y-%m-%d %H:%M", time.localtime(package.install_date))
+        reason = "you installed it" if package.explicit else "needed by another package"
+        details.update(
+            f"📦 {package.name} {package.version}\n"
+            f"📝 {package.description}\n"
+            f"🌐 {package.url or 'No website'}\n"
+            f"💾 Size: {format_size(package.size)}\n"
+            f"📅 Installed: {installed} ({reason})\n"
+            f"🔗 Needs: {depends or 'nothing'}\n"
+            f"🤝 Needed by: {required_by or 'nothing'}"
+        )
+    
+    def action_back(self) -> None:
+        """Go back to the previous screen."""
+        self.app.pop_screen()
+
+
 class SystemActionsScreen(Screen):
     """Screen for system-related actions."""
     
     BINDINGS = [
         Binding("escape", "back", "Back"),
+        Binding("x", "cancel_action", "Cancel"),
         Binding("up", "focus_previous", "Previous", show=False),
         Binding("down", "focus_next", "Next", show=False),
         Binding("enter", "select", "Select", show=False),
@@ -436,6 +676,7 @@ class SystemActionsScreen(Screen):
         """Create system actions layout.""" 
         yield Container(
             Static("⚙️ System Tools", classes="menu-title"),
+            MetricsPanel(),
             Button("📊 Show System Information", id="system-info"),
             Button("💾 Check Disk Space", id="disk-space"),
             Button("🖥️ Show Running Processes", id="processes"),
@@ -451,14 +692,23 @@ class SystemActionsScreen(Screen):
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle system action buttons."""
+        from app.actions import AppActions
+        
+        result = self.query_one("#result", Static)
         if event.button.id == "back":
             self.app.pop_screen()
         elif event.button.id == "system-info":
-            AppActions.show_system_info(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.show_system_info, result)
         elif event.button.id == "disk-space":
-            AppActions.show_disk_space(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.show_disk_space, result)
         elif event.button.id == "processes":
-            AppActions.show_processes(self.query_one("#result", Static))
+            AppActions.run_in_background(self, AppActions.show_processes, result)
+    
+    def action_cancel_action(self) -> None:
+        """Cancel the action that is still running."""
+        from app.actions import AppActions
+        
+        AppActions.cancel(self, self.query_one("#result", Static))
     
     def action_back(self) -> None:
         """Go back to the previous screen."""
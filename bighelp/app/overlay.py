@@ -0,0 +1,144 @@
+"""
+Performance overlay for BigHelp.
+
+Shows how long frames take to draw and what is running in the background,
+so reports of a sluggish BigHelp can be looked into on the machine where
+it happens, without a profiler.
+"""
+
+import time
+from typing import Dict, Optional
+
+from rich.text import Text
+from textual.screen import Screen
+from textual.widgets import Static
+
+from metrics import RingBuffer, process_rss
+from utils import format_size, running_commands
+
+
+class FrameTimer:
+    """
+    Times every frame drawn by any screen.
+
+    A frame is one screen update: the layout, if it changed, and drawing
+    the widgets that need it. Timing costs two clock reads per frame.
+
+    Textual has no public hook for this, so the timer wraps the private
+    Screen._on_timer_update. If a Textual version doesn't have it, frames
+    simply aren't timed.
+    """
+
+    def __init__(self, size: int = 240) -> None:
+        """
+        Args:
+            size: How many of the latest frame times to keep
+        """
+        self.times = RingBuffer(size)
+        # How many frames were drawn since the timer was installed
+        self.frames = 0
+        # Whether frames can be timed with this version of Textual
+        self.available = callable(getattr(Screen, "_on_timer_update", None))
+        self._installed = False
+
+    def install(self) -> None:
+        """Start timing frames; later calls do nothing."""
+        if self._installed or not self.available:
+            return
+        self._installed = True
+        draw = Screen._on_timer_update
+        timer = self
+
+        def timed_draw(screen: Screen, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return draw(screen, *args, **kwargs)
+            finally:
+                timer.times.append((time.perf_counter() - start) * 1000)
+                timer.frames += 1
+
+        Screen._on_timer_update = timed_draw
+
+    def percentiles(self) -> Optional[Dict[str, float]]:
+        """
+        Get the median, 95th and 99th percentile and worst frame time.
+
+        Returns:
+            Milliseconds by name ("p50", "p95", "p99", "max"), or None if
+            no frame was drawn yet
+        """
+        times = sorted(self.times)
+        if not times:
+            return None
+        last = len(times) - 1
+        return {
+            "p50": times[last // 2],
+            "p95": times[int(last * 0.95)],
+            "p99": times[int(last * 0.99)],
+            "max": times[last],
+        }
+
+
+_frame_timer: Optional[FrameTimer] = None
+
+
+def get_frame_timer() -> FrameTimer:
+    """Get the frame timer shared by the whole app."""
+    global _frame_timer
+    if _frame_timer is None:
+        _frame_timer = FrameTimer()
+    return _frame_timer
+
+
+class PerfOverlay(Static):
+    """Panel with frame times, queued messages, running work and memory."""
+
+    # Seconds between refreshes
+    INTERVAL = 0.5
+    WIDTH = 52
+
+    def __init__(self) -> None:
+        super().__init__(classes="perf-overlay")
+        self.styles.width = self.WIDTH
+
+    def on_mount(self) -> None:
+        """Show the numbers right away."""
+        self.refresh_stats()
+
+    def refresh_stats(self) -> None:
+        """Sample everything again and redraw the panel."""
+        from app.actions import SLOW_ACTION_SECONDS, slow_actions
+
+        app = self.app
+        # Keep to the top right corner, below the header, as the terminal resizes
+        self.styles.offset = (max(app.size.width - self.WIDTH - 1, 0), 3)
+
+        text = Text()
+        text.append("⏱️ Performance", style="bold")
+        text.append(f" ({app.screen.__class__.__name__})\n", style="dim")
+
+        frame_timer = get_frame_timer()
+        frames = frame_timer.percentiles()
+        if not frame_timer.available:
+            text.append("Frames: unavailable with this Textual version\n")
+        elif frames is None:
+            text.append("Frames: none drawn yet\n")
+        else:
+            text.append(
+                f"Frames: p50 {frames['p50']:.1f} · p95 {frames['p95']:.1f} · "
+                f"p99 {frames['p99']:.1f} · max {frames['max']:.1f} ms\n"
+            )
+
+        text.append(f"Messages queued: app {app.message_queue_size}, screen {app.screen.message_queue_size}\n")
+        workers = sum(1 for worker in app.workers if worker.is_running)
+        text.append(f"Running: {running_commands()} commands, {workers} workers\n")
+        rss = process_rss()
+        text.append(f"Memory: {format_size(rss) if rss is not None else 'unknown'}\n")
+
+        slow = slow_actions()
+        text.append(f"Actions over {SLOW_ACTION_SECONDS * 1000:.0f} ms:", style="bold")
+        if not slow:
+            text.append(" none")
+        for name, seconds in reversed(slow):
+            text.append(f"\n  {name} {seconds * 1000:.0f} ms")
+        self.update(text)
@@ -0,0 +1,353 @@
+"""
+Reusable widgets for BigHelp.
+
+This module contains widgets shared by the application screens.
+"""
+
+import json
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, Iterable, List, Mapping, Optional
+
+from rich.segment import Segment
+from rich.text import Text
+from textual import events
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Horizontal, Vertical
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Log, ProgressBar, Sparkline, Static
+
+from metrics import MetricsSampler
+from utils import format_size
+
+
+@lru_cache(maxsize=256)
+def _render_command(content: str) -> Text:
+    """Render a command's tutorial, given as JSON so it can be memoized."""
+    info = json.loads(content)
+    text = Text()
+    text.append(f"🚀 {info['name']}\n\n", style="bold blue")
+    text.append("Description:\n", style="bold green")
+    text.append(f"{info['description']}\n\n")
+    text.append("What does it do?\n", style="bold green")
+    text.append(f"{info['explanation']}\n\n")
+    text.append("Examples:\n", style="bold green")
+    for example in info["examples"]:
+        text.append(f"`{example['command']}`\n", style="bold yellow")
+        text.append(f"{example['explanation']}\n\n")
+    text.append("💡 Tip:\n", style="bold blue")
+    text.append(f"{info['tip']}\n\n")
+    text.append("⚠️ Safety Note:\n", style="bold red")
+    text.append(info["safety"])
+    return text
+
+
+def render_command(info: dict) -> Text:
+    """
+    Render a command's tutorial as a single block of rich text.
+    
+    The result is memoized by the tutorial's content, so opening the same
+    command again costs a dictionary lookup.
+    
+    Args:
+        info: The command's tutorial
+        
+    Returns:
+        The rendered tutorial
+    """
+    return _render_command(json.dumps(info, sort_keys=True))
+
+
+# Shared by every panel so the history survives leaving the screen
+_sampler = MetricsSampler()
+
+
+class MetricsPanel(Vertical):
+    """
+    Live sparklines of CPU, memory, load and network usage.
+
+    /proc is read in a worker thread, so a slow read never holds up the
+    interface, and only the labels and sparklines whose values changed
+    are redrawn.
+    """
+
+    METRICS = [
+        ("cpu", "🧠 CPU", lambda value: f"{value:.0f}%"),
+        ("memory", "💾 Memory", lambda value: f"{value:.0f}%"),
+        ("load", "⚖️ Load", lambda value: f"{value:.2f}"),
+        ("network", "🌐 Network", lambda value: f"{format_size(value)}/s"),
+    ]
+
+    def __init__(self, interval: float = 1.0, sampler: Optional[MetricsSampler] = None) -> None:
+        super().__init__(classes="metrics-panel")
+        self.interval = interval
+        self.sampler = sampler or _sampler
+        self._labels: Dict[str, str] = {}
+        self._data: Dict[str, List[float]] = {}
+        self._sampling = False
+
+    def compose(self) -> ComposeResult:
+        """Create a label and a sparkline for each metric."""
+        for name, _, _ in self.METRICS:
+            yield Horizontal(
+                Static("", id=f"{name}-label", classes="metric-label"),
+                Sparkline([], id=f"{name}-sparkline", classes="metric-sparkline"),
+                classes="metric-row"
+            )
+
+    def on_mount(self) -> None:
+        """Start sampling when the panel is shown."""
+        self.start_sample()
+        self.set_interval(self.interval, self.start_sample)
+
+    def start_sample(self) -> None:
+        """Take a sample in a worker, unless the previous one is still running."""
+        if self._sampling:
+            return
+        self._sampling = True
+        self.run_worker(self._sample, thread=True, group="metrics", exit_on_error=False)
+
+    def _sample(self) -> None:
+        """Read /proc and hand the histories to the UI thread."""
+        try:
+            self.sampler.sample()
+            histories = {name: self.sampler.values(name) for name, _, _ in self.METRICS}
+        finally:
+            self._sampling = False
+        self.app.call_from_thread(self.show_metrics, histories)
+
+    def show_metrics(self, histories: Dict[str, List[float]]) -> None:
+        """Update the widgets whose metric changed."""
+        for name, title, formatter in self.METRICS:
+            history = histories[name]
+            label = f"{title}: {formatter(history[-1]) if history else '...'}"
+            if self._labels.get(name) != label:
+                self._labels[name] = label
+                self.query_one(f"#{name}-label", Static).update(label)
+            if self._data.get(name) != history:
+                self._data[name] = history
+                self.query_one(f"#{name}-sparkline", Sparkline).data = history
+
+
+# Progress as printed by package managers: "45%" (apt) or "(3/10)" (pacman)
+_PERCENT = re.compile(r"(\d{1,3})%")
+_COUNTER = re.compile(r"\((\d+)/(\d+)\)")
+
+
+def parse_progress(line: str) -> Optional[float]:
+    """
+    Find the progress reported by a line of output.
+    
+    Returns:
+        The progress as a percentage, or None if the line has none
+    """
+    match = _COUNTER.search(line)
+    if match and int(match.group(2)):
+        return min(100.0, 100.0 * int(match.group(1)) / int(match.group(2)))
+    match = _PERCENT.search(line)
+    if match:
+        return min(100.0, float(match.group(1)))
+    return None
+
+
+class StreamOutput(Vertical):
+    """
+    Live output of a long-running command, with a progress bar.
+    
+    Lines and status updates may come from any thread. They are collected
+    and drawn at most FPS times a second, however fast they arrive, and
+    only the last max_lines lines are kept.
+    """
+
+    FPS = 20
+
+    def __init__(self, max_lines: int = 2000, id: Optional[str] = None) -> None:
+        super().__init__(id=id, classes="stream-output")
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._pending: Deque[str] = deque(maxlen=max_lines)
+        self._status: Optional[str] = None
+        self._progress: Optional[float] = None
+        self._clear = False
+
+    def compose(self) -> ComposeResult:
+        """Create the status line, the progress bar and the log."""
+        yield Static("", classes="stream-status")
+        yield ProgressBar(total=100, show_eta=False)
+        yield Log(max_lines=self.max_lines, classes="stream-log")
+
+    def on_mount(self) -> None:
+        """Start drawing the collected output."""
+        self.display = False
+        self.set_interval(1 / self.FPS, self._flush)
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Add lines of output. Safe to call from any thread."""
+        lines = list(lines)
+        progress = None
+        for line in reversed(lines):
+            progress = parse_progress(line)
+            if progress is not None:
+                break
+        with self._lock:
+            self._pending.extend(lines)
+            if progress is not None:
+                self._progress = progress
+
+    def update(self, status: str) -> None:
+        """Show a status line above the output. Safe to call from any thread."""
+        with self._lock:
+            self._status = status
+
+    def clear(self) -> None:
+        """Forget the previous output. Safe to call from any thread."""
+        with self._lock:
+            self._pending.clear()
+            self._status = ""
+            self._progress = 0.0
+            self._clear = True
+
+    def _flush(self) -> None:
+        """Draw everything collected since the last frame."""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            status, self._status = self._status, None
+            progress, self._progress = self._progress, None
+            clear, self._clear = self._clear, False
+        if not (lines or clear or status is not None or progress is not None):
+            return
+
+        self.display = True
+        log = self.query_one(Log)
+        if clear:
+            log.clear()
+        if lines:
+            log.write_lines(lines)
+        if status is not None:
+            self.query_one(".stream-status", Static).update(status)
+        if progress is not None:
+            self.query_one(ProgressBar).update(progress=progress)
+
+
+class CommandList(ScrollView, can_focus=True):
+    """
+    List of commands that only renders the rows on screen.
+    
+    Mounting it costs the same with ten commands or ten thousand. Up,
+    down, page up, page down, home and end move the highlight, enter
+    selects, and typing a letter jumps to the next command starting
+    with it.
+    """
+
+    BINDINGS = [
+        Binding("up", "move(-1)", "Up", show=False),
+        Binding("down", "move(1)", "Down", show=False),
+        Binding("pageup", "page(-1)", "Page Up", show=False),
+        Binding("pagedown", "page(1)", "Page Down", show=False),
+        Binding("home", "jump(0)", "First", show=False),
+        Binding("end", "jump(-1)", "Last", show=False),
+        Binding("enter", "select", "Select", show=False),
+    ]
+
+    COMPONENT_CLASSES = {"command-list--highlight"}
+
+    DEFAULT_CSS = """
+    CommandList > .command-list--highlight {
+        background: #3182ce;
+        color: #ffffff;
+        text-style: bold;
+    }
+    """
+
+    highlighted = reactive(0)
+
+    class Selected(Message):
+        """Sent when a command is chosen."""
+
+        def __init__(self, command: str) -> None:
+            super().__init__()
+            self.command = command
+
+    def __init__(self, commands: Mapping[str, dict], id: Optional[str] = None) -> None:
+        """
+        Args:
+            commands: Command name -> tutorial, like one ALL_TUTORIALS category
+            id: The widget id
+        """
+        super().__init__(id=id)
+        self.names = list(commands)
+        self.rows = [f" {name} - {info['description']}" for name, info in commands.items()]
+        self._by_letter: Dict[str, List[int]] = {}
+        for index, name in enumerate(self.names):
+            self._by_letter.setdefault(name[:1].lower(), []).append(index)
+        self.virtual_size = Size(0, len(self.rows))
+
+    def render_line(self, y: int) -> Strip:
+        """Render one visible row."""
+        index = int(self.scroll_offset.y) + y
+        width = self.scrollable_content_region.width
+        if index >= len(self.rows):
+            return Strip.blank(width, self.rich_style)
+        if index == self.highlighted and self.has_focus:
+            style = self.get_component_rich_style("command-list--highlight")
+        else:
+            style = self.rich_style
+        return Strip([Segment(self.rows[index], style)]).adjust_cell_length(width, style)
+
+    def watch_highlighted(self, highlighted: int) -> None:
+        """Keep the highlighted row on screen."""
+        height = self.scrollable_content_region.height
+        if highlighted < self.scroll_offset.y:
+            self.scroll_to(y=highlighted, animate=False)
+        elif height and highlighted >= self.scroll_offset.y + height:
+            self.scroll_to(y=highlighted - height + 1, animate=False)
+        self.refresh()
+
+    def validate_highlighted(self, highlighted: int) -> int:
+        return max(0, min(highlighted, len(self.rows) - 1))
+
+    def on_focus(self) -> None:
+        self.refresh()
+
+    def on_blur(self) -> None:
+        self.refresh()
+
+    def on_click(self, event: events.Click) -> None:
+        """Select the clicked command."""
+        index = int(self.scroll_offset.y) + event.y
+        if 0 <= index < len(self.rows):
+            self.highlighted = index
+            self.action_select()
+
+    def on_key(self, event: events.Key) -> None:
+        """Jump to the next command starting with the typed letter."""
+        if not event.is_printable or not event.character:
+            return
+        indices = self._by_letter.get(event.character.lower())
+        if not indices:
+            return
+        # The first match after the current one, wrapping around
+        self.highlighted = next((i for i in indices if i > self.highlighted), indices[0])
+        event.stop()
+        event.prevent_default()
+
+    def action_move(self, delta: int) -> None:
+        self.highlighted += delta
+
+    def action_page(self, direction: int) -> None:
+        self.highlighted += direction * max(self.scrollable_content_region.height - 1, 1)
+
+    def action_jump(self, index: int) -> None:
+        self.highlighted = index if index >= 0 else len(self.rows) - 1
+
+    def action_select(self) -> None:
+        if self.rows:
+            self.post_message(self.Selected(self.names[self.highlighted]))
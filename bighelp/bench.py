@@ -0,0 +1,1432 @@
+"""
+Headless benchmarks for BigHelp.
+
+The app is driven with Textual's Pilot without a terminal, and every
+measurement is compared with a threshold so slowdowns and leaks show up
+as failures in the report. Actions run with their subprocess and network
+calls replaced by instant stand-ins, so only BigHelp's own work is timed.
+"""
+
+import asyncio
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+from textual.app import ComposeResult
+from textual.pilot import Pilot
+from textual.screen import Screen
+from textual.widgets import Button, Static
+
+from profiling import time_to_first_frame
+
+
+# Limits checked by check(); the timings are medians, in milliseconds
+THRESHOLDS: Dict[str, float] = {
+    "first_frame_ms": 1000.0,
+    "push_ms": 250.0,
+    "pop_ms": 120.0,
+    "action_ms": 50.0,
+    "navigation_peak_kb": 32768.0,
+    "navigation_retained_kb": 1024.0,
+    # Component benchmarks: "<benchmark>_<measurement>", see COMPONENTS
+    # and HEADLESS_COMPONENTS
+    "path_index_lookups_ms": 5.0,
+    "path_index_warm_start_ms": 10.0,
+    "search_keystroke_max_ms": 5.0,
+    "tutorial_store_start_growth": 1.5,
+    "tutorial_store_memory_growth_kb": 16.0,
+    "tutorial_store_errors": 0.0,
+    "processes_top_cpu_ms": 250.0,
+    "processes_peak_kb": 4096.0,
+    "metrics_cpu_percent": 1.0,
+    "metrics_hour_growth_kb": 16.0,
+    "pacman_local_cached_start_ms": 20.0,
+    "pacman_local_search_ms": 5.0,
+    "pacman_local_errors": 0.0,
+    "sync_index_cached_start_ms": 100.0,
+    "sync_index_search_ms": 10.0,
+    "sync_index_stream_peak_kb": 512.0,
+    "sync_index_errors": 0.0,
+    "sandbox_command_us": 100.0,
+    "sandbox_errors": 0.0,
+    "safety_line_us": 250.0,
+    "safety_mismatches": 0.0,
+    "screen_cache_warm_push_ms": 100.0,
+    "command_list_mount_growth": 1.5,
+    "detail_view_widgets": 8.0,
+    "detail_view_mount_ratio": 0.8,
+    "stream_seconds": 10.0,
+    "stream_redraws_per_second": 25.0,
+    "stream_errors": 0.0,
+    "input_latency_p95_ms": 100.0,
+    # The probes time out after 200 ms
+    "netprobe_sites_ms": 400.0,
+    "netprobe_deadline_ms": 400.0,
+    "netprobe_race_ms": 100.0,
+    "netprobe_cancel_ms": 50.0,
+    "netprobe_errors": 0.0,
+    "disks_read_ms": 10.0,
+    # The hung mount times out after 200 ms
+    "disks_timeout_ms": 400.0,
+    "disks_errors": 0.0,
+}
+
+# Navigation runs in blocks of this many cycles before the memory
+# baseline, until a block grows memory by less than _WARM_GROWTH_KB: then
+# Textual's caches are full. A leak never gets there, so at most
+# _MAX_WARMUP_CYCLES are run.
+_WARMUP_BLOCK = 100
+_WARM_GROWTH_KB = 512
+_MAX_WARMUP_CYCLES = 2000
+
+_SCREEN_SIZE = (100, 40)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    """Summarize timings in seconds as milliseconds."""
+    values = [value * 1000 for value in values]
+    return {
+        "median_ms": round(statistics.median(values), 3),
+        "p95_ms": round(_percentile(values, 0.95), 3),
+        "max_ms": round(max(values), 3),
+    }
+
+
+def _screens() -> List[Tuple[type, tuple]]:
+    """Every screen of the menu module, with arguments to create it."""
+    from app import menu
+    from tutorials import ALL_TUTORIALS
+
+    return [
+        (menu.TutorialMenu, ()),
+        (menu.CommandListScreen, ("basic",)),
+        (menu.CommandDetailView, ("basic", "ls")),
+        (menu.SearchScreen, ()),
+        (menu.InteractiveTerminal, (ALL_TUTORIALS["basic"]["ls"],)),
+        (menu.NetworkActionsScreen, ()),
+        (menu.PackageActionsScreen, ()),
+        (menu.PackageSearchScreen, ()),
+        (menu.PackageInfoScreen, ()),
+        (menu.SystemActionsScreen, ()),
+        (menu.AboutScreen, ()),
+    ]
+
+
+def _actions() -> List[Callable]:
+    """Every action of AppActions that a button can start."""
+    from app.actions import AppActions
+
+    return [
+        AppActions.check_internet_connection,
+        AppActions.test_website_connection,
+        AppActions.show_network_info,
+        AppActions.update_package_list,
+        AppActions.upgrade_packages,
+        AppActions.search_package,
+        AppActions.show_system_info,
+        AppActions.show_disk_space,
+        AppActions.show_processes,
+    ]
+
+
+@contextmanager
+def _stubbed_actions() -> Iterator[None]:
+    """Replace the commands and network checks used by the actions."""
+    from netprobe import Connectivity, ProbeResult
+
+    def stream_command(command, on_lines, idle_timeout=60, cancelled=None):
+        for start in range(0, 200, 50):
+            on_lines([f"Get:{number} https://mirror.example/repo" for number in range(start, start + 50)])
+        return True, ""
+
+    def check_sites(sites, on_result=None, **kwargs):
+        results = [ProbeResult(site, True, 0.02) for site in sites]
+        for result in results:
+            if on_result is not None:
+                on_result(result)
+        return results
+
+    with mock.patch.multiple(
+        "app.actions",
+        stream_command=stream_command,
+        check_sites=check_sites,
+        check_connectivity=lambda *args, **kwargs: Connectivity(True, True, 0.02, "stub:443"),
+        is_command_available=lambda name: name == "pacman",
+    ):
+        yield
+
+
+class _ActionScreen(Screen):
+    """A screen with the output widgets the actions write to."""
+
+    def compose(self) -> ComposeResult:
+        from app.widgets import StreamOutput
+
+        yield Static(id="output")
+        yield StreamOutput(id="stream-output")
+
+
+def _push(app, screen_type: type, args: tuple) -> None:
+    """Open a screen the way the app does: cached when it can be."""
+    try:
+        hash(args)
+    except TypeError:
+        app.push_screen(screen_type(*args))
+    else:
+        app.screen_cache.push(screen_type, *args)
+
+
+async def _measure_screens(pilot: Pilot, repeat: int) -> Dict[str, dict]:
+    """
+    Time opening and closing each screen, created fresh every time.
+
+    This is the CPU time until the app is idle again, drawing included:
+    Pilot.pause sleeps while it waits for idle, which wall time would count.
+    """
+    app = pilot.app
+    results = {}
+    for screen_type, args in _screens():
+        pushes, pops = [], []
+        for _ in range(repeat + 1):
+            start = time.process_time()
+            await app.push_screen(screen_type(*args))
+            await pilot.pause()
+            pushed = time.process_time()
+            await app.pop_screen()
+            await pilot.pause()
+            pushes.append(pushed - start)
+            pops.append(time.process_time() - pushed)
+        # The first round loads modules and fills caches
+        results[screen_type.__name__] = {"push": _summary(pushes[1:]), "pop": _summary(pops[1:])}
+    return results
+
+
+async def _measure_actions(pilot: Pilot, repeat: int) -> Dict[str, dict]:
+    """Time each action from start to its last update, in a worker."""
+    from app.actions import AppActions
+    from app.widgets import StreamOutput
+
+    app = pilot.app
+    screen = _ActionScreen()
+    await app.push_screen(screen)
+    await pilot.pause()
+    results = {}
+    with _stubbed_actions():
+        for action in _actions():
+            stream = action is AppActions.update_package_list
+            output = screen.query_one("#stream-output" if stream else "#output",
+                                      StreamOutput if stream else Static)
+            times = []
+            for _ in range(repeat + 1):
+                start = time.perf_counter()
+                worker = AppActions.run_in_background(screen, action, output)
+                await worker.wait()
+                times.append(time.perf_counter() - start)
+                await pilot.pause()
+            results[action.__name__] = _summary(times[1:])
+    await app.pop_screen()
+    await pilot.pause()
+    return results
+
+
+async def _navigate(pilot: Pilot, cycles: int) -> None:
+    """Open and close screens in turn, one screen per cycle."""
+    screens = _screens()
+    for cycle in range(cycles):
+        screen_type, args = screens[cycle % len(screens)]
+        _push(pilot.app, screen_type, args)
+        await pilot.pause()
+        await pilot.app.pop_screen()
+        await pilot.pause()
+
+
+async def _measure_memory(pilot: Pilot, cycles: int) -> dict:
+    """
+    Measure the memory used by navigating and what stays allocated.
+
+    Textual's caches keep growing until they are full, which takes several
+    hundred cycles, so the cycles measured start once a warm-up block no
+    longer grows memory much. What is retained is then measured over the
+    second half of the cycles only: a leak keeps growing there, caches don't.
+    """
+    # Tracing goes on for the whole measurement: memory allocated before it
+    # started is never counted as freed, so the caches evicting old entries
+    # would look like growth
+    tracemalloc.start()
+    try:
+        warmup = 0
+        gc.collect()
+        previous = tracemalloc.get_traced_memory()[0]
+        while warmup < _MAX_WARMUP_CYCLES:
+            await _navigate(pilot, _WARMUP_BLOCK)
+            warmup += _WARMUP_BLOCK
+            gc.collect()
+            current = tracemalloc.get_traced_memory()[0]
+            if current - previous < _WARM_GROWTH_KB * 1024:
+                break
+            previous = current
+
+        # Python 3.8 can't reset the peak, so there it includes the warm-up
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        await _navigate(pilot, cycles // 2)
+        gc.collect()
+        middle = tracemalloc.get_traced_memory()[0]
+        before = tracemalloc.take_snapshot()
+        await _navigate(pilot, cycles - cycles // 2)
+        gc.collect()
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    growth = [
+        f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size_diff / 1024:+.1f} KB"
+        for stat in after.compare_to(before, "lineno")[:5]
+        if stat.size_diff > 0
+    ]
+    return {
+        "warmup_cycles": warmup,
+        "cycles": cycles,
+        "seconds": round(elapsed, 3),
+        "peak_kb": round((peak - baseline) / 1024, 1),
+        "first_half_kb": round((middle - baseline) / 1024, 1),
+        "retained_kb": round((current - middle) / 1024, 1),
+        "top_growth": growth,
+    }
+
+
+async def _bench_screen_cache(pilot: Pilot, repeat: int) -> Dict[str, float]:
+    """Time showing command screens through the screen cache, built and reused."""
+    from app.menu import CommandDetailView, CommandListScreen
+
+    app = pilot.app
+    screens = [(CommandListScreen, ("basic",)), (CommandDetailView, ("basic", "ls"))]
+    cold, warm, pops = [], [], []
+    for _ in range(repeat + 1):
+        for screen_type, args in screens:
+            app.screen_cache.clear()
+            for times in (cold, warm):
+                start = time.process_time()
+                app.screen_cache.push(screen_type, *args)
+                await pilot.pause()
+                pushed = time.process_time()
+                await app.pop_screen()
+                await pilot.pause()
+                times.append(pushed - start)
+                pops.append(time.process_time() - pushed)
+    # The first round loads modules and fills caches
+    skip = len(screens)
+    return {
+        "cold_push_ms": _summary(cold[skip:])["median_ms"],
+        "warm_push_ms": _summary(warm[skip:])["median_ms"],
+        "pop_ms": _summary(pops[2 * skip:])["median_ms"],
+    }
+
+
+class _CommandListScreen(Screen):
+    """A screen with nothing but a command list."""
+
+    def __init__(self, commands: Dict[str, dict]) -> None:
+        super().__init__()
+        self.commands = commands
+
+    def compose(self) -> ComposeResult:
+        from app.widgets import CommandList
+
+        yield CommandList(self.commands)
+
+
+async def _bench_command_list(pilot: Pilot, repeat: int) -> Dict[str, float]:
+    """Time mounting a command list of 10, 1,000 and 10,000 commands."""
+    app = pilot.app
+    results = {}
+    for count in (10, 1000, 10000):
+        commands = {
+            f"command{i}": {"description": f"What command {i} does"} for i in range(count)
+        }
+        times = []
+        for _ in range(repeat + 1):
+            start = time.process_time()
+            await app.push_screen(_CommandListScreen(commands))
+            await pilot.pause()
+            times.append(time.process_time() - start)
+            await app.pop_screen()
+            await pilot.pause()
+        results[f"mount_{count}_ms"] = _summary(times[1:])["median_ms"]
+    # Mounting should cost the same however many commands there are once
+    # they fill the screen; ten commands don't, so there is less to draw
+    results["mount_growth"] = round(results["mount_10000_ms"] / results["mount_1000_ms"], 2)
+    return results
+
+
+def _section_widgets(info: dict) -> List[Static]:
+    """The widgets CommandDetailView had before it drew one Text: one per section."""
+    widgets = [
+        Static(f"[bold blue]🚀 {info['name']}[/bold blue]", classes="command-title"),
+        Static("", classes="spacer"),
+        Static("[bold green]Description:[/bold green]", classes="section-title"),
+        Static(info["description"], classes="description"),
+        Static("", classes="spacer"),
+        Static("[bold green]What does it do?[/bold green]", classes="section-title"),
+        Static(info["explanation"], classes="explanation"),
+        Static("", classes="spacer"),
+        Static("[bold green]Examples:[/bold green]", classes="section-title"),
+    ]
+    for example in info["examples"]:
+        widgets += [
+            Static(f"[bold yellow]`{example['command']}`[/bold yellow]", classes="example-command"),
+            Static(example["explanation"], classes="example-explanation"),
+            Static("", classes="spacer"),
+        ]
+    return widgets + [
+        Static("[bold blue]💡 Tip:[/bold blue]", classes="section-title"),
+        Static(info["tip"], classes="tip"),
+        Static("", classes="spacer"),
+        Static("[bold red]⚠️ Safety Note:[/bold red]", classes="section-title"),
+        Static(info["safety"], classes="safety"),
+    ]
+
+
+async def _bench_detail_view(pilot: Pilot, repeat: int) -> Dict[str, float]:
+    """Open every basic command's page as one Text and as a widget per section."""
+    from textual.containers import Container, Horizontal, VerticalScroll
+
+    from app.menu import CommandDetailView
+    from tutorials import ALL_TUTORIALS
+
+    class SectionDetailView(CommandDetailView):
+        def compose(self) -> ComposeResult:
+            yield Container(
+                VerticalScroll(*_section_widgets(self.command_info), classes="command-detail"),
+                Horizontal(
+                    Button("🔧 Try This Command", id="try", variant="primary"),
+                    Button("🔙 Back", id="back", variant="warning"),
+                    classes="action-buttons"
+                )
+            )
+
+    app = pilot.app
+    results = {}
+    for name, screen_type in (("", CommandDetailView), ("sections_", SectionDetailView)):
+        times = []
+        widgets = []
+        for _ in range(repeat + 1):
+            for command in ALL_TUTORIALS["basic"]:
+                start = time.process_time()
+                screen = screen_type("basic", command)
+                await app.push_screen(screen)
+                await pilot.pause()
+                times.append(time.process_time() - start)
+                widgets.append(len(screen.query("*")))
+                await app.pop_screen()
+                await pilot.pause()
+        # The first round builds the Texts, later ones reuse them
+        times = times[len(ALL_TUTORIALS["basic"]):]
+        results[f"{name}mount_ms"] = _summary(times)["median_ms"]
+        results[f"{name}widgets"] = round(statistics.mean(widgets), 1)
+    results["mount_ratio"] = round(results["mount_ms"] / results["sections_mount_ms"], 2)
+    return results
+
+
+# Prints lines like a package manager as fast as it can, with a progress
+# line every thousand
+_STREAM_STUB = """
+import sys
+count = int(sys.argv[1])
+write = sys.stdout.write
+for i in range(count):
+    write(f"Get:{i} https://mirror.example/repo package-{i} ({i + 1}/{count})\\n")
+    if i % 1000 == 0:
+        write(f" downloading {i * 100 // count}%\\r")
+"""
+
+
+async def _bench_stream(pilot: Pilot, repeat: int) -> Dict[str, float]:
+    """Stream 100,000 lines from a real command into a StreamOutput."""
+    from textual.widgets import Log, ProgressBar
+    from utils import stream_command
+    from app.widgets import StreamOutput
+
+    app = pilot.app
+    screen = _ActionScreen()
+    await app.push_screen(screen)
+    await pilot.pause()
+    output = screen.query_one("#stream-output", StreamOutput)
+    log = output.query_one(Log)
+    redraws = 0
+    write_lines = log.write_lines
+
+    def counted_write_lines(*args, **kwargs):
+        nonlocal redraws
+        redraws += 1
+        return write_lines(*args, **kwargs)
+
+    log.write_lines = counted_write_lines
+    count = 100000
+    start = time.perf_counter()
+    # The command runs in a thread, like the actions' workers run it
+    success, _ = await asyncio.get_running_loop().run_in_executor(
+        None, stream_command, [sys.executable, "-c", _STREAM_STUB, str(count)], output.write_lines
+    )
+    elapsed = time.perf_counter() - start
+    await pilot.pause(2 / StreamOutput.FPS)
+
+    # Only the last lines are kept, and the progress ends at 100%
+    errors = int(not success)
+    errors += log.line_count != output.max_lines
+    last = count - 1
+    errors += log.lines[-1] != f"Get:{last} https://mirror.example/repo package-{last} ({count}/{count})"
+    errors += output.query_one(ProgressBar).progress != 100
+    await app.pop_screen()
+    await pilot.pause()
+    return {
+        "seconds": round(elapsed, 3),
+        "redraws_per_second": round(redraws / elapsed, 1),
+        "errors": errors,
+    }
+
+
+class _KeysScreen(_ActionScreen):
+    """An action screen with buttons to move the focus between."""
+
+    def compose(self) -> ComposeResult:
+        yield Button("One")
+        yield Button("Two")
+        yield from super().compose()
+
+
+def _endless_stream(command, on_lines, idle_timeout=60, cancelled=None):
+    """Stand-in for stream_command printing a line every 5 ms until cancelled."""
+    number = 0
+    while not (cancelled is not None and cancelled()):
+        on_lines([f"Get:{number} https://mirror.example/repo"])
+        number += 1
+        time.sleep(0.005)
+    return False, "Cancelled"
+
+
+async def _bench_input_latency(pilot: Pilot, repeat: int) -> Dict[str, float]:
+    """
+    Time from a key press to the frame showing its effect, during an action.
+
+    A package list update streams output the whole time, and tab moves the
+    focus between two buttons. The latency ends with the first frame drawn
+    after the focus moved.
+    """
+    from textual.worker import WorkerCancelled
+    from app.actions import AppActions
+    from app.overlay import get_frame_timer
+    from app.widgets import StreamOutput
+
+    timer = get_frame_timer()
+    if not timer.available:
+        return {}
+    timer.install()
+    app = pilot.app
+    screen = _KeysScreen()
+    await app.push_screen(screen)
+    await pilot.pause()
+    screen.query_one(Button).focus()
+    output = screen.query_one("#stream-output", StreamOutput)
+    latencies = []
+    with _stubbed_actions(), mock.patch("app.actions.stream_command", _endless_stream):
+        worker = AppActions.run_in_background(screen, AppActions.update_package_list, output)
+        await pilot.pause(0.1)
+        for _ in range(repeat * 5):
+            focused = app.focused
+            start = time.perf_counter()
+            app.simulate_key("tab")
+            while app.focused is focused:
+                await asyncio.sleep(0)
+            frames = timer.frames
+            while timer.frames == frames:
+                await asyncio.sleep(0)
+            latencies.append(time.perf_counter() - start)
+        worker.cancel()
+        try:
+            await worker.wait()
+        except WorkerCancelled:
+            pass
+    await app.pop_screen()
+    await pilot.pause()
+    summary = _summary(latencies)
+    return {"p50_ms": summary["median_ms"], "p95_ms": summary["p95_ms"], "max_ms": summary["max_ms"]}
+
+
+# Benchmarks that need the interface, run like COMPONENTS in the headless
+# app. They take the Pilot and the number of repeats.
+HEADLESS_COMPONENTS: Dict[str, Callable[[Pilot, int], Awaitable[Dict[str, float]]]] = {
+    "screen_cache": _bench_screen_cache,
+    "command_list": _bench_command_list,
+    "detail_view": _bench_detail_view,
+    "stream": _bench_stream,
+    "input_latency": _bench_input_latency,
+}
+
+
+async def _run_headless(cycles: int, repeat: int) -> dict:
+    from ui import BigHelpApp
+
+    app = BigHelpApp()
+    async with app.run_test(size=_SCREEN_SIZE) as pilot:
+        await pilot.pause()
+        screens = await _measure_screens(pilot, repeat)
+        actions = await _measure_actions(pilot, repeat)
+        components = {}
+        for name, bench in HEADLESS_COMPONENTS.items():
+            components[name] = await bench(pilot, repeat)
+        memory = await _measure_memory(pilot, cycles)
+    return {"screens": screens, "actions": actions, "components": components, "memory": memory}
+
+
+def _median_time(function: Callable[[], object], repeat: int) -> float:
+    """Run a function repeat times and return its median time in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def _bench_path_index(repeat: int) -> Dict[str, float]:
+    """Look up 1,000 command names, half of them missing, and start from the cache."""
+    from utils import PathIndex
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_file = os.path.join(cache_dir, "path-index.json")
+        # The first index scans PATH and saves the cache the others start from
+        index = PathIndex(cache_file=cache_file)
+        warm_start = _median_time(lambda: PathIndex(cache_file=cache_file), repeat)
+
+    present = sorted({
+        name
+        for directory in index.path.split(os.pathsep) if os.path.isdir(directory)
+        for name in os.listdir(directory)
+    })[:500]
+    names = present + [f"bighelp-missing-{i}" for i in range(1000 - len(present))]
+    lookups = _median_time(lambda: [index.which(name) for name in names], repeat)
+    return {"lookups_ms": lookups, "warm_start_ms": warm_start, "commands_found": len(present)}
+
+
+# Searches typed one key at a time, typos included
+_SEARCHES = [
+    "copy files", "show disk space", "list directory contents", "delete an empty folder",
+    "change directory", "network interfaces", "mkdr", "shutdwn", "coppy fles", "dsk spce usage",
+]
+
+
+def _synthetic_catalog(size: int, seed: int = 1) -> Dict[str, Dict[str, dict]]:
+    """Tutorials for size made-up commands, written with the words of the real ones."""
+    from search import tokenize
+    from tutorials import ALL_TUTORIALS
+
+    words = sorted({
+        word
+        for category in ALL_TUTORIALS
+        for info in ALL_TUTORIALS[category].values()
+        for word in tokenize(f"{info['description']} {info['explanation']} {info['tip']}")
+    })
+    rng = random.Random(seed)
+
+    def text(count: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(count))
+
+    catalog: Dict[str, Dict[str, dict]] = {}
+    for i in range(size):
+        name = f"{rng.choice(words)}{i}"
+        catalog.setdefault(f"category{i % 20}", {})[name] = {
+            "name": name,
+            "description": text(8),
+            "explanation": text(40),
+            "examples": [{"command": f"{name} {text(2)}", "explanation": text(8)} for _ in range(3)],
+            "tip": text(12),
+            "safety": text(10),
+        }
+    return catalog
+
+
+def _bench_search(repeat: int) -> Dict[str, float]:
+    """Search a 5,000-command catalog after every keystroke of a few searches."""
+    from search import SearchIndex
+
+    start = time.perf_counter()
+    index = SearchIndex(_synthetic_catalog(5000))
+    build = time.perf_counter() - start
+    # Each keystroke's time is the median of repeat searches, so a busy
+    # machine doesn't make a single search look slow
+    times = [
+        _median_time(lambda: index.search(query[:end]), repeat)
+        for query in _SEARCHES
+        for end in range(1, len(query) + 1)
+    ]
+    return {
+        "index_build_ms": round(build * 1000, 1),
+        "keystrokes": len(times),
+        "keystroke_median_ms": round(statistics.median(times), 3),
+        "keystroke_max_ms": max(times),
+    }
+
+
+def _bench_tutorial_store(repeat: int) -> Dict[str, float]:
+    """Start the tutorial store with packs of 20, 1,000 and 5,000 commands."""
+    import json
+
+    from tutorials.schema import normalize_command
+    from tutorials.store import TutorialStore
+
+    results: Dict[str, float] = {}
+    errors = 0
+    for count in (20, 1000, 5000):
+        catalog = _synthetic_catalog(count)
+        with tempfile.TemporaryDirectory() as root:
+            pack_dir = os.path.join(root, "packs")
+            os.mkdir(pack_dir)
+            for category, commands in catalog.items():
+                with open(os.path.join(pack_dir, f"{category}.json"), "w") as f:
+                    json.dump({"category": category, "commands": commands}, f)
+            cache_dir = os.path.join(root, "cache")
+
+            def start() -> TutorialStore:
+                # What the tutorial menu needs: every category and its title
+                store = TutorialStore({}, cache_dir, [pack_dir])
+                for category in store:
+                    store.title(category)
+                return store
+
+            cold = time.perf_counter()
+            start()
+            cold = time.perf_counter() - cold
+            # Starting takes a fraction of a millisecond, so time 20 at once
+            warm = _median_time(lambda: [start() for _ in range(20)], repeat * 2) / 20
+            gc.collect()
+            tracemalloc.start()
+            try:
+                store = start()
+                retained = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+            errors += sorted(store) != sorted(catalog) or store.pack_errors != []
+            errors += store["category0"] != {
+                name: normalize_command(info) for name, info in catalog["category0"].items()
+            }
+            # A changed pack is read again, cache or not
+            command = next(iter(catalog["category0"].values()))
+            with open(os.path.join(pack_dir, "category1.json"), "w") as f:
+                json.dump({"category": "category1", "commands": {"new": command}}, f)
+            errors += list(TutorialStore({}, cache_dir, [pack_dir])["category1"]) != ["new"]
+
+        results[f"start_{count}_ms"] = round(warm, 3)
+        results[f"start_{count}_kb"] = round(retained / 1024, 1)
+        results[f"first_start_{count}_ms"] = round(cold * 1000, 1)
+
+    # Starting reads no commands, so it takes as long however many there are
+    results["start_growth"] = round(results["start_5000_ms"] / results["start_20_ms"], 2)
+    results["memory_growth_kb"] = round(results["start_5000_kb"] - results["start_20_kb"], 1)
+    results["errors"] = errors
+    return results
+
+
+def _fake_proc(root: str, count: int, seed: int = 1) -> None:
+    """Write a /proc tree with count processes under root."""
+    rng = random.Random(seed)
+    with open(os.path.join(root, "meminfo"), "w") as f:
+        f.write("MemTotal:       16318048 kB\n")
+    for pid in range(1, count + 1):
+        directory = os.path.join(root, str(pid))
+        os.mkdir(directory)
+        fields = ["S", "1", str(pid), str(pid), "0", "-1", "4194560"] + ["0"] * 4
+        fields += [str(rng.randrange(100000)), str(rng.randrange(10000))] + ["0"] * 8
+        fields += [str(rng.randrange(1, 100000))] + ["0"] * 30
+        with open(os.path.join(directory, "stat"), "w") as f:
+            f.write(f"{pid} (worker {pid}) {' '.join(fields)}\n")
+        with open(os.path.join(directory, "status"), "w") as f:
+            f.write(f"Name:\tworker\nUid:\t{rng.choice((0, 1000))}\t0\t0\t0\n")
+        with open(os.path.join(directory, "cmdline"), "wb") as f:
+            f.write(b"/usr/bin/worker\0--id\0" + str(pid).encode())
+
+
+def _bench_processes(repeat: int) -> Dict[str, float]:
+    """Sample a /proc tree with 10,000 processes for the top 5."""
+    from processes import ProcessSampler
+
+    with tempfile.TemporaryDirectory() as proc_root:
+        _fake_proc(proc_root, 10000)
+        sampler = ProcessSampler(proc_root)
+        sampler.top(5)
+        top_cpu = _median_time(lambda: sampler.top(5), repeat)
+        top_memory = _median_time(lambda: sampler.top(5, sort_by="memory"), repeat)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            sampler.top(5)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"top_cpu_ms": top_cpu, "top_memory_ms": top_memory, "peak_kb": round(peak / 1024, 1)}
+
+
+def _bench_metrics(repeat: int) -> Dict[str, float]:
+    """Run the metrics sampler for an hour's worth of 1 Hz samples."""
+    from metrics import HISTORY_SIZE, MetricsSampler
+
+    sampler = MetricsSampler()
+
+    def tick() -> None:
+        # What the metrics panel's worker does every second
+        sampler.sample()
+        for name in MetricsSampler.METRICS:
+            sampler.values(name)
+
+    # Fill the histories first, so what is measured is the steady state
+    for _ in range(HISTORY_SIZE):
+        tick()
+    start = time.process_time()
+    for _ in range(3600):
+        tick()
+    cpu = time.process_time() - start
+
+    # Tracing slows everything down, so memory is measured over another hour
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(3600):
+            tick()
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "sample_us": round(cpu / 3600 * 1e6, 1),
+        # The share of one CPU used at one sample per second
+        "cpu_percent": round(cpu / 3600 * 100, 4),
+        "hour_growth_kb": round(growth / 1024, 1),
+    }
+
+
+def _fake_pacman_db(root: str, count: int, seed: int = 1) -> Dict[str, tuple]:
+    """
+    Write a pacman database with count installed packages under root.
+
+    Returns:
+        Package name -> the fields LocalDatabase should read for it
+    """
+    from pacman import LOCAL_DB
+
+    rng = random.Random(seed)
+    path = os.path.join(root, LOCAL_DB)
+    os.makedirs(path)
+    with open(os.path.join(path, "ALPM_DB_VERSION"), "w") as f:
+        f.write("9\n")
+    names = [f"pkg{i:04d}" for i in range(count)]
+    expected = {}
+    for i, name in enumerate(names):
+        package = (
+            name, f"1.{i}-1", f"Package number {i}", f"https://example.org/{name}",
+            rng.randrange(1000, 10 ** 8), 1700000000 + i, rng.random() < 0.3,
+            tuple(f"{dependency}>=1" for dependency in rng.sample(names[:i], min(i, 5))),
+        )
+        expected[name] = package
+        fields = [
+            ("NAME", [name]), ("VERSION", [package[1]]), ("DESC", [package[2]]),
+            ("URL", [package[3]]), ("ARCH", ["x86_64"]), ("SIZE", [str(package[4])]),
+            ("INSTALLDATE", [str(package[5])]), ("REASON", ["0" if package[6] else "1"]),
+            ("DEPENDS", list(package[7])),
+        ]
+        directory = os.path.join(path, f"{name}-{package[1]}")
+        os.mkdir(directory)
+        with open(os.path.join(directory, "desc"), "w") as f:
+            for field, values in fields:
+                if values:
+                    f.write(f"%{field}%\n" + "".join(f"{value}\n" for value in values) + "\n")
+    return expected
+
+
+def _bench_pacman_local(repeat: int) -> Dict[str, float]:
+    """Read a pacman database with 2,000 packages and check what is read."""
+    from pacman import LOCAL_DB, LocalDatabase, dependency_name
+
+    with tempfile.TemporaryDirectory() as root:
+        fs = os.path.join(root, "fs")
+        expected = _fake_pacman_db(fs, 2000)
+        cache_file = os.path.join(root, "cache", "local.marshal")
+
+        start = time.perf_counter()
+        database = LocalDatabase(fs, cache_file=cache_file)
+        database.refresh()
+        first_read = time.perf_counter() - start
+        cached_start = _median_time(lambda: LocalDatabase(fs, cache_file=cache_file).refresh(), repeat)
+        search = _median_time(lambda: database.search("pkg1"), repeat)
+
+        # Every difference from what was written counts as an error
+        packages = database.packages
+        errors = len(packages.keys() ^ expected.keys())
+        errors += sum(tuple(packages[name]) != package
+                      for name, package in expected.items() if name in packages)
+        required_by: Dict[str, List[str]] = {}
+        for name, package in expected.items():
+            for dependency in package[-1]:
+                required_by.setdefault(dependency_name(dependency), []).append(name)
+        errors += sum(database.required_by(name) != sorted(required_by.get(name, []))
+                      for name in expected)
+        errors += [package.name for package in database.search("pkg199")] != [
+            f"pkg199{i}" for i in range(10)
+        ]
+
+        # Installing a package must make a new index read it, cache or not
+        os.rename(os.path.join(fs, LOCAL_DB, "pkg0000-1.0-1"), os.path.join(fs, LOCAL_DB, "new-1-1"))
+        with open(os.path.join(fs, LOCAL_DB, "new-1-1", "desc"), "w") as f:
+            f.write("%NAME%\nnew\n\n%VERSION%\n1-1\n\n")
+        reread = LocalDatabase(fs, cache_file=cache_file)
+        errors += "new" not in reread or "pkg0000" in reread
+
+    return {
+        "first_read_ms": round(first_read * 1000, 1),
+        "cached_start_ms": cached_start,
+        "search_ms": search,
+        "errors": errors,
+    }
+
+
+def _fake_sync_dbs(root: str, seed: int = 1) -> Tuple[Dict[str, tuple], List[str]]:
+    """
+    Write repository databases under root, each compressed its own way,
+    and a few broken ones.
+
+    Returns:
+        Package name -> (repo, version, description) of every package
+        SyncIndex should read, and the names of the broken databases
+    """
+    import bz2
+    import gzip
+    import io
+    import lzma
+    import tarfile
+
+    from pacman import SYNC_DB, zstandard
+
+    words = ("library tool editor browser font python rust audio video network "
+             "git terminal shell daemon kernel driver ünïcode").split()
+    rng = random.Random(seed)
+    path = os.path.join(root, SYNC_DB)
+    os.makedirs(path)
+    expected: Dict[str, tuple] = {}
+
+    def archive(repo: str, count: int, tar_format: int, extra: Tuple[str, ...] = ()) -> bytes:
+        data = io.BytesIO()
+        with tarfile.open(fileobj=data, mode="w", format=tar_format) as tar:
+            names = [f"{repo}-{rng.choice(words)}-{i}" for i in range(count)] + list(extra)
+            # Names too long for a plain tar header
+            names[0] += "-" + "x" * 120
+            for i, name in enumerate(names):
+                version = f"1.{i}-1"
+                description = f"A {rng.choice(words)} {rng.choice(words)} for {rng.choice(words)} users"
+                expected[name] = (repo, version, description)
+                directory = tarfile.TarInfo(f"{name}-{version}")
+                directory.type = tarfile.DIRTYPE
+                tar.addfile(directory)
+                desc = (f"%FILENAME%\n{name}-{version}-x86_64.pkg.tar.zst\n\n%NAME%\n{name}\n\n"
+                        f"%VERSION%\n{version}\n\n%DESC%\n{description}\n\n"
+                        f"%PGPSIG%\n{'A' * 400}\n\n%DEPENDS%\nglibc\n\n").encode()
+                member = tarfile.TarInfo(f"{name}-{version}/desc")
+                member.size = len(desc)
+                tar.addfile(member, io.BytesIO(desc))
+        return data.getvalue()
+
+    databases = {
+        "core": lzma.compress(archive("core", 300, tarfile.GNU_FORMAT)),
+        "extra": gzip.compress(archive("extra", 5000, tarfile.PAX_FORMAT, ("firefox",))),
+        "multilib": bz2.compress(archive("multilib", 300, tarfile.USTAR_FORMAT)),
+        # Not compressed at all, which pacman accepts too
+        "testing": archive("testing", 100, tarfile.GNU_FORMAT),
+    }
+    zstd_data = archive("community", 300, tarfile.PAX_FORMAT)
+    if zstandard is not None:
+        databases["community"] = zstandard.ZstdCompressor().compress(zstd_data)
+    else:
+        # Without zstandard it can't be read and must be reported instead
+        for name in list(expected):
+            if expected[name][0] == "community":
+                del expected[name]
+        databases["community"] = b"\x28\xb5\x2f\xfd" + zstd_data
+    broken = {
+        "garbage": b"not a database" * 100,
+        "truncated": databases["extra"][:len(databases["extra"]) // 2],
+        "bad-gzip": b"\x1f\x8b" + bytes(rng.randrange(256) for _ in range(1000)),
+        "bad-xz": lzma.compress(b"\0" * 512)[:20],
+    }
+    if zstandard is None:
+        broken["community"] = databases.pop("community")
+    for repo, data in {**databases, **broken}.items():
+        with open(os.path.join(path, f"{repo}.db"), "wb") as f:
+            f.write(data)
+    return expected, sorted(broken)
+
+
+def _bench_sync_index(repeat: int) -> Dict[str, float]:
+    """Read and search repository databases compressed every way pacman allows."""
+    import pacman
+    from pacman import SYNC_DB, SyncIndex, iter_tar
+
+    with tempfile.TemporaryDirectory() as root:
+        fs = os.path.join(root, "fs")
+        expected, broken = _fake_sync_dbs(fs)
+        cache_file = os.path.join(root, "cache", "sync.marshal")
+
+        start = time.perf_counter()
+        index = SyncIndex(fs, cache_file=cache_file)
+        index.refresh()
+        first_read = time.perf_counter() - start
+
+        # Every package read must be one that was written, and the other way round
+        read = {package.name: (package.repo, package.version, package.description) for package in index.packages}
+        errors = len(index.packages) != len(expected) or read != expected
+        errors += sorted(os.path.basename(error.split(":")[0])[:-len(".db")] for error in index.errors) != broken
+        errors += not any(error.endswith("garbage.db: not a tar archive") for error in index.errors)
+        errors += index.search("firefox")[0].name != "firefox"
+        errors += index.search("firefx")[0].name != "firefox"
+        long_name = next(name for name in expected if len(name) > 100 and name.startswith("extra"))
+        errors += index.search(long_name)[0].name != long_name
+        # Every word must be in the name or the description
+        query = ["editor", "ünïcode"]
+        found = {package.name for package in index.search(" ".join(query), limit=len(expected))}
+        errors += found != {
+            name for name, (_, _, description) in expected.items()
+            if all(word in f"{name} {description}".lower() for word in query)
+        }
+
+        # Nothing is read again from the cache until a database changes
+        with mock.patch("pacman.read_sync_db", side_effect=pacman.read_sync_db) as read_sync_db:
+            cached_start = _median_time(lambda: SyncIndex(fs, cache_file=cache_file).refresh(), repeat)
+            errors += read_sync_db.call_count
+            os.utime(os.path.join(fs, SYNC_DB, "multilib.db"), ns=(0, 0))
+            reread = SyncIndex(fs, cache_file=cache_file)
+            reread.refresh()
+            errors += [call.args[0] for call in read_sync_db.call_args_list] != [
+                os.path.join(fs, SYNC_DB, "multilib.db")
+            ]
+            errors += len(reread) != len(expected) or reread.errors != index.errors
+        search = _median_time(lambda: index.search("python"), repeat)
+
+        # Reading the biggest database, about 10 MB once decompressed,
+        # holds one member at a time
+        import gzip
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            with gzip.open(os.path.join(fs, SYNC_DB, "extra.db")) as stream:
+                members = sum(1 for _ in iter_tar(stream, lambda name: name.endswith("/desc")))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        errors += members != sum(repo == "extra" for repo, _, _ in expected.values())
+
+    return {
+        "first_read_ms": round(first_read * 1000, 1),
+        "cached_start_ms": cached_start,
+        "search_ms": search,
+        "stream_peak_kb": round(peak / 1024, 1),
+        "errors": errors,
+    }
+
+
+# A lesson in the sandbox, with what each line must print
+_SANDBOX_SCRIPT: List[Tuple[str, bool, str]] = [
+    ("pwd", True, "/home/student"),
+    ("mkdir -p Projects/Robots", True, ""),
+    ("cd Projects", True, ""),
+    ("touch plan.txt", True, ""),
+    ("ls", True, "plan.txt  Robots"),
+    ("cp ../story.txt Robots/", True, ""),
+    ("mv plan.txt Robots/notes.txt", True, ""),
+    ("ls Robots", True, "notes.txt  story.txt"),
+    ("cat Robots/story.txt", True, "Once upon a time, a penguin learned to use the terminal."),
+    ("rmdir Robots", False, "rmdir: failed to remove 'Robots': Directory not empty"),
+    ("cd ..", True, ""),
+    ("ls -a EmptyFolder", True, ".  .."),
+    ("cat nothing.txt", False, "cat: nothing.txt: No such file or directory"),
+    ("rm story.txt", False, "rm: command not found"),
+    ("cd ~/Documents", True, ""),
+    ("pwd", True, "/home/student/Documents"),
+]
+
+
+def _bench_sandbox(repeat: int) -> Dict[str, float]:
+    """Run a lesson in the sandbox shell over and over, resetting it each time."""
+    from sandbox import Shell, VirtualFS, lesson_filesystem
+
+    shell = Shell(VirtualFS(lesson_filesystem()))
+    start_state = shell.fs.snapshot()
+    # The sandbox must not start processes or touch the disk
+    escapes = mock.Mock(side_effect=OSError("the sandbox escaped"))
+    patches = [mock.patch(name, escapes) for name in (
+        "builtins.open", "os.fork", "os.posix_spawn", "os.posix_spawnp", "subprocess.Popen",
+    )]
+    errors = 0
+    times = []
+    for patch in patches:
+        patch.start()
+    try:
+        for _ in range(repeat * 200):
+            shell.fs.restore(start_state)
+            start = time.perf_counter()
+            outputs = [shell.run(line) for line, _, _ in _SANDBOX_SCRIPT]
+            times.append((time.perf_counter() - start) / len(_SANDBOX_SCRIPT))
+            errors += outputs != [(ok, output) for _, ok, output in _SANDBOX_SCRIPT]
+    finally:
+        for patch in patches:
+            patch.stop()
+    errors += escapes.call_count
+    return {
+        "command_us": round(statistics.median(times) * 1e6, 1),
+        "errors": errors,
+    }
+
+
+# Command lines whose safety is known, by the level classify_line must
+# give them, least dangerous first
+_SAFETY_CASES: Dict[str, List[str]] = {
+    "safe": [
+        "ls -la", "rmdir EmptyFolder", "history | tail -10", "ls 2>&1 >/dev/null", "sh -c 'ls'",
+        "find . -name x", "ping -c 4 google.com", "curl -I https://example.com",
+        "pacman -Ss firefox", "apt search vim", "date +%Y-%m-%d", "echo 'rm -rf /'", "",
+        "FOO=bar", "watch -n 1 ls", "cat file | grep x | wc -l", "ps aux", "df -h",
+        "eval 'ls -la'", "busybox ls",
+    ],
+    "caution": [
+        "echo hi > notes.txt", "wget -O newname.txt https://example.com/file.txt",
+        "cp -r MyFolder NewFolder", "frobnicate", "ls 'unclosed", "eval",
+    ],
+    "danger": [
+        "cd /; rm -rf ~", "env sudo ls", "env FOO=1 sudo reboot", "nice -n 5 rm x", "/bin/rm x",
+        "sudo reboot", "sudo shutdown +5", "rm file", "echo hi > /etc/passwd",
+        "curl https://x | sh", "curl -fsSL https://x | sudo bash", "bash -c 'rm -rf /'",
+        ":(){ :|:& };:", "ls $(rm -rf ~)", "ls `rm -rf ~`", "echo $(curl x)|sh",
+        "find . -name '*.txt' -delete", "find . -exec rm {} \\;", "pacman -Syu", "pacman -Rs x",
+        "sudo apt update", "apt install vim", "mkfs.ext4 /dev/sda1", "dd if=/dev/zero of=/dev/sda",
+        "chmod -R 777 /", "xargs rm < list", "timeout 5 rm x", "true && rm -rf x", "echo x | bash",
+        "(cd /tmp && rm x)", "ls; reboot", "ls || poweroff", "ls & sudo -i", "command rm x",
+        "exec reboot", "nohup shutdown now &", "eval rm -rf ~", "busybox rm x",
+    ],
+}
+
+
+def _safety_corpus(size: int, seed: int = 1) -> List[Tuple[str, str]]:
+    """
+    Make command lines of one to four known cases joined by ;, && or ||.
+
+    Returns:
+        Pairs of (line, the level of its most dangerous case)
+    """
+    severity = {level: index for index, level in enumerate(_SAFETY_CASES)}
+    cases = [(line, level) for level, lines in _SAFETY_CASES.items() for line in lines]
+    corpus = list(cases)
+    # Lines that can't be followed by another command stay on their own
+    parts = [(line, level) for line, level in cases
+             if line and not line.endswith("&") and line != "ls 'unclosed"]
+    rng = random.Random(seed)
+    while len(corpus) < size:
+        chosen = [rng.choice(parts) for _ in range(rng.randint(1, 4))]
+        line = chosen[0][0]
+        for part, _ in chosen[1:]:
+            line += rng.choice(("; ", " && ", " || ")) + part
+        corpus.append((line, max((level for _, level in chosen), key=severity.__getitem__)))
+    return corpus
+
+
+def _bench_safety(repeat: int) -> Dict[str, float]:
+    """Classify 100,000 command lines whose level is known."""
+    from safety import classify_line
+
+    corpus = _safety_corpus(100000)
+    start = time.perf_counter()
+    mismatches = sum(classify_line(line).level != level for line, level in corpus)
+    elapsed = time.perf_counter() - start
+    return {
+        "line_us": round(elapsed / len(corpus) * 1e6, 1),
+        "mismatches": mismatches,
+    }
+
+
+@contextmanager
+def _loopback_sites() -> Iterator[Tuple[str, str, str]]:
+    """
+    Listen on 127.0.0.1 for network probes.
+
+    Yields:
+        Sites (open, hung, refused): the first accepts connections, the
+        second has a full backlog so connecting to it hangs, and nothing
+        listens on the third
+    """
+    import socket
+
+    sockets = []
+    try:
+        ports = []
+        for backlog in (16, 0):
+            listener = socket.socket()
+            sockets.append(listener)
+            listener.bind(("127.0.0.1", 0))
+            listener.listen(backlog)
+            ports.append(listener.getsockname()[1])
+        # Connections nobody accepts fill the backlog, then SYNs are dropped
+        for _ in range(3):
+            client = socket.socket()
+            sockets.append(client)
+            client.setblocking(False)
+            client.connect_ex(("127.0.0.1", ports[1]))
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            ports.append(closed.getsockname()[1])
+        time.sleep(0.05)
+        yield tuple(f"127.0.0.1:{port}" for port in ports)
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+# Time each probe of the netprobe benchmark may take
+_PROBE_TIMEOUT = 0.2
+
+
+def _bench_netprobe(repeat: int) -> Dict[str, float]:
+    """Probe loopback listeners that answer, hang and refuse."""
+    from netprobe import check_connectivity, check_sites, probe_sites, race_connectivity
+
+    with _loopback_sites() as (open_site, hung, refused):
+        errors = 0
+
+        # Three hung hosts take one timeout, not three
+        sites = [hung, open_site, hung, refused, hung]
+        arrived = []
+        start = time.perf_counter()
+        results = check_sites(sites, timeout=_PROBE_TIMEOUT, deadline=5.0, on_result=arrived.append)
+        sites_time = time.perf_counter() - start
+        by_site = {result.site: result for result in results}
+        errors += sorted(result.site for result in results) != sorted(sites)
+        errors += arrived != results
+        errors += not by_site[open_site].ok or by_site[open_site].rtt is None
+        errors += by_site[refused].ok or by_site[refused].error == "timed out"
+        errors += sum(result.ok or result.error != "timed out" for result in results if result.site == hung)
+        # The answers come in before the hosts that time out
+        errors += {result.site for result in results[:2]} != {open_site, refused}
+
+        # The deadline cuts short hosts that have time left
+        start = time.perf_counter()
+        results = check_sites([hung, open_site], timeout=5.0, deadline=_PROBE_TIMEOUT)
+        deadline_time = time.perf_counter() - start
+        errors += [(result.site, result.ok) for result in results] != [(open_site, True), (hung, False)]
+
+        # The open listener wins the race without waiting for the others
+        endpoints = [hung, refused, open_site]
+        verdict = check_connectivity(endpoints, ["localhost"], timeout=5.0)
+        errors += verdict[:2] != (True, True) or verdict.endpoint != open_site
+        race = _median_time(lambda: check_connectivity(endpoints, ["localhost"], timeout=5.0), repeat)
+        verdict = check_connectivity([hung, refused], ["localhost"], timeout=_PROBE_TIMEOUT)
+        errors += verdict != (True, False, None, "")
+
+        async def cancel(coroutine) -> float:
+            nonlocal errors
+            task = asyncio.ensure_future(coroutine)
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            elapsed = time.perf_counter() - start
+            # Cancelling must not leave probes behind
+            errors += not task.cancelled() or len(asyncio.all_tasks()) > 1
+            return elapsed
+
+        cancel_time = max(
+            asyncio.run(cancel(probe_sites([hung, hung], timeout=5.0, deadline=5.0))),
+            asyncio.run(cancel(race_connectivity([hung, hung], [], timeout=5.0))),
+        )
+
+    return {
+        "sites_ms": round(sites_time * 1000, 1),
+        "deadline_ms": round(deadline_time * 1000, 1),
+        "race_ms": race,
+        "cancel_ms": round(cancel_time * 1000, 1),
+        "errors": errors,
+    }
+
+
+def _fake_mountinfo(path: str, root: str) -> List[str]:
+    """
+    Write a mountinfo file with real and pseudo filesystems under root.
+
+    Returns:
+        The mount points read_mounts must list, in order
+    """
+    disks = [os.path.join(root, name) for name in ("home", "my files", "layer")]
+    for disk in disks:
+        os.mkdir(disk)
+    home, spaced, layer = (disk.replace(" ", "\\040") for disk in disks)
+    lines = [
+        "20 1 0:21 / /proc rw,nosuid shared:5 - proc proc rw",
+        "21 1 0:5 / /dev rw,nosuid shared:2 - devtmpfs devtmpfs rw,size=8k",
+        "22 1 0:19 / /run rw shared:6 - tmpfs tmpfs rw,mode=755",
+        "23 0 0:30 / / rw,relatime - overlay overlay rw,lowerdir=/l,upperdir=/u",
+        f"24 23 8:2 / {home} rw,relatime shared:1 master:3 - ext4 /dev/sda2 rw",
+        f"25 23 8:3 / {spaced} rw - btrfs /dev/disk\\040one rw",
+        f"26 23 0:31 / {layer} rw - overlay overlay rw,lowerdir=/l2",
+        # A bind mount of a device already listed, and a broken line
+        f"27 23 8:2 /sub {home}/sub rw - ext4 /dev/sda2 rw",
+        "28 23 8:4 / /broken rw",
+    ]
+    # Many more pseudo filesystems, like on a host running containers
+    lines += [f"{100 + i} 23 0:{100 + i} / /run/user/{i} rw - tmpfs tmpfs rw" for i in range(1000)]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return ["/", disks[0], disks[1]]
+
+
+def _bench_disks(repeat: int) -> Dict[str, float]:
+    """Read a made-up mountinfo and check every mount, one of them hung."""
+    import threading
+
+    from disks import Mount, disk_usage, read_mounts
+
+    with tempfile.TemporaryDirectory() as root:
+        mountinfo = os.path.join(root, "mountinfo")
+        expected = _fake_mountinfo(mountinfo, root)
+        mounts = read_mounts(mountinfo)
+        errors = [mount.mountpoint for mount in mounts] != expected
+        errors += mounts[2] != Mount(expected[2], "/dev/disk one", "btrfs")
+        errors += len(read_mounts(mountinfo, include_pseudo=True)) != 1007
+        read = _median_time(lambda: read_mounts(mountinfo), repeat)
+
+        usages = disk_usage(mounts=mounts)
+        for usage in usages:
+            st = os.statvfs(usage.mount.mountpoint)
+            errors += bool(usage.error) or usage.status == "unavailable"
+            errors += usage.total != st.f_blocks * st.f_frsize or usage.inodes_total != st.f_files
+
+        # A mount that never answers is reported once the timeout is over
+        hung = os.path.join(root, "layer")
+        release = threading.Event()
+        statvfs = os.statvfs
+
+        def hanging_statvfs(path):
+            if path == hung:
+                release.wait()
+            return statvfs(path)
+
+        try:
+            with mock.patch("os.statvfs", hanging_statvfs):
+                start = time.perf_counter()
+                usages = disk_usage(mounts=mounts + [Mount(hung, "overlay", "overlay")], timeout=0.2)
+                timeout = time.perf_counter() - start
+        finally:
+            release.set()
+        errors += [usage.error for usage in usages] != ["", "", "", "not responding"]
+
+    return {
+        "read_ms": read,
+        "timeout_ms": round(timeout * 1000, 1),
+        "errors": errors,
+    }
+
+
+# Benchmarks of single parts of BigHelp, run without the interface. Each
+# takes the number of repeats and returns its measurements by name; a
+# measurement is checked against the threshold "<benchmark>_<measurement>"
+# if there is one.
+COMPONENTS: Dict[str, Callable[[int], Dict[str, float]]] = {
+    "path_index": _bench_path_index,
+    "search": _bench_search,
+    "tutorial_store": _bench_tutorial_store,
+    "processes": _bench_processes,
+    "metrics": _bench_metrics,
+    "pacman_local": _bench_pacman_local,
+    "sync_index": _bench_sync_index,
+    "sandbox": _bench_sandbox,
+    "safety": _bench_safety,
+    "netprobe": _bench_netprobe,
+    "disks": _bench_disks,
+}
+
+
+def check(results: dict, thresholds: Dict[str, float]) -> List[str]:
+    """
+    Compare benchmark results with their thresholds.
+
+    Args:
+        results: The results of run_benchmarks
+        thresholds: Limits like THRESHOLDS
+
+    Returns:
+        A message for every measurement over its threshold
+    """
+    failures = []
+
+    def over(name: str, value: Optional[float], key: str) -> None:
+        limit = thresholds.get(key)
+        if value is None:
+            failures.append(f"{name}: no measurement")
+        elif limit is not None and value > limit:
+            failures.append(f"{name}: {value:.1f} is over the {key} threshold of {limit:.1f}")
+
+    over("first frame", results["first_frame_ms"], "first_frame_ms")
+    for name, timings in results["screens"].items():
+        over(f"{name} push", timings["push"]["median_ms"], "push_ms")
+        over(f"{name} pop", timings["pop"]["median_ms"], "pop_ms")
+    for name, timings in results["actions"].items():
+        over(f"AppActions.{name}", timings["median_ms"], "action_ms")
+    over("navigation peak memory", results["memory"]["peak_kb"], "navigation_peak_kb")
+    over("navigation retained memory", results["memory"]["retained_kb"], "navigation_retained_kb")
+    for component, measurements in results["components"].items():
+        for name, value in measurements.items():
+            if f"{component}_{name}" in thresholds:
+                over(f"{component} {name}", value, f"{component}_{name}")
+    return failures
+
+
+def run_benchmarks(
+    cycles: int = 1000,
+    repeat: int = 20,
+    thresholds: Optional[Dict[str, float]] = None
+) -> dict:
+    """
+    Run every benchmark and check the results.
+
+    Args:
+        cycles: Navigation cycles measured for memory use
+        repeat: Measurements per screen and per action
+        thresholds: Limits overriding THRESHOLDS
+
+    Returns:
+        A report with the results, the thresholds and the failures
+    """
+    limits = dict(THRESHOLDS)
+    limits.update(thresholds or {})
+
+    # The first frame is measured in a fresh interpreter, before anything
+    # here has been imported
+    frames = [time_to_first_frame() for _ in range(3)]
+    results = {"first_frame_ms": None if None in frames else round(statistics.median(frames), 1)}
+    components = {name: bench(repeat) for name, bench in COMPONENTS.items()}
+    results.update(asyncio.run(_run_headless(cycles, repeat)))
+    results["components"] = {**components, **results["components"]}
+
+    return {"results": results, "thresholds": limits, "failures": check(results, limits)}
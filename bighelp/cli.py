@@ -0,0 +1,195 @@
+"""
+Command line subcommands for BigHelp.
+
+These print straight to the terminal without starting the interface, so
+they can be used from shell aliases, prompts and scripts. Nothing here
+imports Textual.
+"""
+
+import argparse
+import json
+import sys
+from typing import Optional, Tuple
+
+
+def find_command(name: str) -> Optional[Tuple[str, dict]]:
+    """
+    Find a command's tutorial in any category.
+
+    Args:
+        name: The command name, like "ls"
+
+    Returns:
+        The category and the tutorial, or None if there is no such command
+    """
+    from tutorials import ALL_TUTORIALS
+
+    for category in ALL_TUTORIALS:
+        info = ALL_TUTORIALS[category].get(name)
+        if info is not None:
+            return category, info
+    return None
+
+
+def format_command(info: dict) -> str:
+    """Format a command's tutorial as plain text, like the detail screen."""
+    lines = [
+        f"🚀 {info['name']}",
+        "",
+        "Description:",
+        info["description"],
+        "",
+        "What does it do?",
+        info["explanation"],
+        "",
+        "Examples:",
+    ]
+    for example in info["examples"]:
+        lines += [f"  $ {example['command']}", f"    {example['explanation']}"]
+    lines += ["", "💡 Tip:", info["tip"], "", "⚠️ Safety Note:", info["safety"]]
+    return "\n".join(lines)
+
+
+def _print_json(data: object) -> None:
+    json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+
+def cmd_show(args: argparse.Namespace) -> int:
+    """Print one command's tutorial."""
+    found = find_command(args.command)
+    if found is None:
+        from search import search
+        suggestions = [result.command for result in search(args.command, limit=5)]
+        print(f"❌ No tutorial for '{args.command}'", file=sys.stderr)
+        if suggestions:
+            print(f"💡 Did you mean: {', '.join(suggestions)}", file=sys.stderr)
+        return 1
+
+    category, info = found
+    if args.json:
+        _print_json({"category": category, **info})
+    else:
+        print(format_command(info))
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Print the commands matching a search."""
+    from search import search
+
+    results = search(" ".join(args.terms), limit=args.limit)
+    if args.json:
+        _print_json([result._asdict() for result in results])
+    elif not results:
+        print("No matching commands. Try other words!", file=sys.stderr)
+    else:
+        width = max(len(result.command) for result in results)
+        for result in results:
+            print(f"{result.command:<{width}}  {result.description}")
+    return 0 if results else 1
+
+
+def cmd_sysinfo(args: argparse.Namespace) -> int:
+    """Print basic system information."""
+    from utils import get_system_info
+
+    info = get_system_info()
+    if args.json:
+        _print_json(info)
+    else:
+        print(f"🖥️ Operating System: {info['os']}")
+        print(f"🐧 Distribution: {info['distribution']}")
+        print(f"📟 Terminal: {info['terminal']}")
+        print(f"🔢 Kernel: {info['release']}")
+    return 0
+
+
+def cmd_net(args: argparse.Namespace) -> int:
+    """Print the network interfaces and, optionally, check the connection."""
+    from netinfo import format_interfaces, network_interfaces
+
+    interfaces = network_interfaces()
+    connectivity = None
+    if args.check:
+        # asyncio is slow to import, so only load the probe when asked to
+        from netprobe import check_connectivity
+        connectivity = check_connectivity()
+
+    if args.json:
+        data = {"interfaces": [interface._asdict() for interface in interfaces]}
+        if connectivity is not None:
+            data["connectivity"] = connectivity._asdict()
+        _print_json(data)
+    else:
+        print(format_interfaces(interfaces))
+        if connectivity is not None:
+            from netprobe import describe_connectivity
+            print(describe_connectivity(connectivity))
+
+    if connectivity is not None and not connectivity.tcp_ok:
+        return 1
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Run the headless benchmarks and report the ones over threshold."""
+    from bench import run_benchmarks
+
+    thresholds = None
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as f:
+            thresholds = json.load(f)
+
+    report = run_benchmarks(cycles=args.cycles, repeat=args.repeat, thresholds=thresholds)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    else:
+        _print_json(report)
+
+    for failure in report["failures"]:
+        print(f"❌ {failure}", file=sys.stderr)
+    if not report["failures"]:
+        print("✅ All benchmarks are within their thresholds", file=sys.stderr)
+    return 1 if report["failures"] else 0
+
+
+def add_subcommands(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the subcommands to the main argument parser.
+
+    Each subcommand stores its handler in the `handler` attribute.
+
+    Args:
+        parser: The bighelp argument parser
+    """
+    subparsers = parser.add_subparsers(dest="subcommand", metavar="COMMAND")
+
+    show = subparsers.add_parser("show", help="show the tutorial of a command")
+    show.add_argument("command", help="the command to explain, like 'ls'")
+    show.add_argument("--json", action="store_true", help="print JSON")
+    show.set_defaults(handler=cmd_show)
+
+    search = subparsers.add_parser("search", help="find commands by what they do")
+    search.add_argument("terms", nargs="+", help="what you want to do, like 'copy files'")
+    search.add_argument("--limit", type=int, default=10, help="maximum number of results")
+    search.add_argument("--json", action="store_true", help="print JSON")
+    search.set_defaults(handler=cmd_search)
+
+    sysinfo = subparsers.add_parser("sysinfo", help="show system information")
+    sysinfo.add_argument("--json", action="store_true", help="print JSON")
+    sysinfo.set_defaults(handler=cmd_sysinfo)
+
+    net = subparsers.add_parser("net", help="show network interfaces")
+    net.add_argument("--check", action="store_true", help="also check the internet connection")
+    net.add_argument("--json", action="store_true", help="print JSON")
+    net.set_defaults(handler=cmd_net)
+
+    bench = subparsers.add_parser("bench", help="benchmark the interface headlessly")
+    bench.add_argument("--output", metavar="FILE", help="write the JSON report to FILE")
+    bench.add_argument("--thresholds", metavar="FILE", help="JSON file with thresholds to override")
+    bench.add_argument("--cycles", type=int, default=1000, help="navigation cycles for the memory check")
+    bench.add_argument("--repeat", type=int, default=20, help="measurements per screen and action")
+    bench.set_defaults(handler=cmd_bench)
@@ -0,0 +1,189 @@
+"""
+Disk usage information for BigHelp.
+
+This module lists the mounted filesystems from /proc/self/mountinfo and
+asks the kernel for their usage with statvfs, so `df` is not needed.
+"""
+
+import os
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+# Filesystems that don't hold user files
+PSEUDO_FILESYSTEMS = {
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs",
+    "debugfs", "devpts", "devtmpfs", "efivarfs", "fusectl", "hugetlbfs",
+    "mqueue", "nsfs", "proc", "pstore", "ramfs", "rpc_pipefs",
+    "securityfs", "squashfs", "sysfs", "tmpfs", "tracefs",
+}
+
+# Filesystems that hold user files when mounted on / (like the root of a
+# container) but are container image layers anywhere else
+ROOT_ONLY_FILESYSTEMS = {"overlay"}
+
+WARNING_PERCENT = 85
+CRITICAL_PERCENT = 95
+
+
+class Mount(NamedTuple):
+    """A mounted filesystem."""
+
+    mountpoint: str
+    device: str
+    fstype: str
+
+
+class DiskUsage(NamedTuple):
+    """Usage of a mounted filesystem."""
+
+    mount: Mount
+    total: int = 0
+    used: int = 0
+    available: int = 0
+    inodes_total: int = 0
+    inodes_used: int = 0
+    status: str = "unavailable"
+    error: str = ""
+
+    @property
+    def percent(self) -> float:
+        """Used space in percent of the space usable by normal users."""
+        usable = self.used + self.available
+        return 100.0 * self.used / usable if usable else 0.0
+
+    @property
+    def inodes_percent(self) -> float:
+        """Used inodes in percent."""
+        return 100.0 * self.inodes_used / self.inodes_total if self.inodes_total else 0.0
+
+
+def _unescape(path: str) -> str:
+    """Decode the octal escapes (like \\040 for a space) used in mountinfo."""
+    if "\\" not in path:
+        return path
+    return path.encode().decode("unicode_escape").encode("latin-1").decode(errors="replace")
+
+
+def read_mounts(mountinfo: str = MOUNTINFO, include_pseudo: bool = False) -> List[Mount]:
+    """
+    List the mounted filesystems.
+
+    Args:
+        mountinfo: Path of the mountinfo file to read
+        include_pseudo: Also list filesystems like proc and tmpfs, and
+            overlays that are not the root filesystem
+
+    Returns:
+        The mounts, skipping repeated mounts of the same device
+    """
+    mounts = []
+    seen = set()
+    with open(mountinfo, "r") as f:
+        for line in f:
+            # Optional fields end with a lone "-"
+            before, sep, after = line.partition(" - ")
+            fields = before.split()
+            extra = after.split()
+            if not sep or len(fields) < 5 or len(extra) < 2:
+                continue
+            device_id, mountpoint = fields[2], _unescape(fields[4])
+            fstype, device = extra[0], _unescape(extra[1])
+            if not include_pseudo and (
+                fstype in PSEUDO_FILESYSTEMS
+                or (fstype in ROOT_ONLY_FILESYSTEMS and mountpoint != "/")
+            ):
+                continue
+            if device_id in seen:
+                continue
+            seen.add(device_id)
+            mounts.append(Mount(mountpoint, device, fstype))
+    return mounts
+
+
+def _status(usage: DiskUsage) -> str:
+    """Rate how full a filesystem is."""
+    percent = max(usage.percent, usage.inodes_percent)
+    if percent >= CRITICAL_PERCENT:
+        return "critical"
+    if percent >= WARNING_PERCENT:
+        return "warning"
+    return "ok"
+
+
+def statvfs_usage(mount: Mount) -> DiskUsage:
+    """
+    Get the usage of one mount.
+
+    Args:
+        mount: The mount to check
+
+    Returns:
+        The usage, with exact byte and inode counts
+    """
+    try:
+        st = os.statvfs(mount.mountpoint)
+    except OSError as e:
+        return DiskUsage(mount, error=e.strerror or str(e))
+    usage = DiskUsage(
+        mount,
+        total=st.f_blocks * st.f_frsize,
+        used=(st.f_blocks - st.f_bfree) * st.f_frsize,
+        available=st.f_bavail * st.f_frsize,
+        inodes_total=st.f_files,
+        inodes_used=st.f_files - st.f_ffree,
+    )
+    return usage._replace(status=_status(usage))
+
+
+def disk_usage(
+    mountinfo: str = MOUNTINFO,
+    timeout: float = 2.0,
+    include_pseudo: bool = False,
+    mounts: Optional[List[Mount]] = None
+) -> List[DiskUsage]:
+    """
+    Get the usage of every mounted filesystem.
+
+    All mounts are checked at the same time. A mount that doesn't answer
+    within the timeout (like a hung network share) is reported as not
+    responding instead of blocking the others.
+
+    Args:
+        mountinfo: Path of the mountinfo file to read
+        timeout: Maximum time to wait for each mount
+        include_pseudo: Also check filesystems like proc and tmpfs
+        mounts: Mounts to check instead of reading mountinfo
+
+    Returns:
+        The usage of each mount, in mount order
+    """
+    if mounts is None:
+        mounts = read_mounts(mountinfo, include_pseudo)
+    if not mounts:
+        return []
+
+    results: List[Optional[DiskUsage]] = [None] * len(mounts)
+
+    def check(index: int, mount: Mount) -> None:
+        results[index] = statvfs_usage(mount)
+
+    # One daemon thread per mount: a hung mount can't delay the others,
+    # and a thread stuck on it can't keep the application from exiting
+    threads = [
+        threading.Thread(target=check, args=(i, mount), daemon=True, name="bighelp-statvfs")
+        for i, mount in enumerate(mounts)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
+
+    return [
+        result if result is not None else DiskUsage(mount, error="not responding")
+        for mount, result in zip(mounts, results)
+    ]
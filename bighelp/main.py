@@ -3,24 +3,95 @@
 Main entry point for the BigHelp application.
 """
 
+import argparse
+import os
 import sys
-from ui import BigHelpApp
 
+from cli import add_subcommands
 
-def main():
+
+def parse_args(argv=None):
+    """
+    Parse the command line.
+
+    Args:
+        argv: The arguments, defaulting to sys.argv
+
+    Returns:
+        The parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="bighelp",
+        description="A friendly terminal helper for kids"
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="show what slows down startup and check the time to first frame"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="time to first frame allowed by --startup-profile (default: 1000)"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="profile the session with cProfile and save the stats to FILE"
+    )
+    add_subcommands(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Main function to start the BigHelp application.
     """
+    args = parse_args(argv)
+    if args.subcommand:
+        try:
+            sys.exit(args.handler(args))
+        except BrokenPipeError:
+            # The output was piped into something like head, which exited
+            sys.stderr.close()
+            sys.exit(0)
+    if args.startup_profile:
+        from profiling import DEFAULT_BUDGET_MS, startup_profile
+        budget = args.budget if args.budget is not None else DEFAULT_BUDGET_MS
+        sys.exit(startup_profile(budget))
+
+    # Imported here so the command line is parsed without loading Textual
+    from ui import BigHelpApp
+
+    if os.environ.get("BIGHELP_TRACE"):
+        from tracing import install
+        install()
+
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+
     try:
         app = BigHelpApp()
-        app.run()
+        if profiler is not None:
+            # Only the main thread is profiled; actions run in worker threads
+            profiler.runcall(app.run)
+        else:
+            app.run()
     except KeyboardInterrupt:
         print("\nGoodbye! Hope you learned something new today!")
         sys.exit(0)
     except Exception as e:
         print(f"Oops! Something went wrong: {e}")
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(args.profile)
+            print(f"Profile saved to {args.profile} (read it with: python -m pstats {args.profile})")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
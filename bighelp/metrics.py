@@ -0,0 +1,176 @@
+"""
+Live system metrics for BigHelp.
+
+This module samples CPU, memory, load and network usage from /proc and
+keeps a short history of each metric in fixed-size ring buffers.
+"""
+
+import os
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+HISTORY_SIZE = 120
+
+
+class RingBuffer:
+    """
+    Fixed-size history of numbers.
+
+    The storage is allocated once, so keeping the history for hours uses
+    the same memory as keeping it for a minute.
+    """
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        self.size = size
+        self._data = array("d", bytes(8 * size))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[float]:
+        """Iterate from the oldest value to the newest one."""
+        for i in range(self._count):
+            yield self._data[(self._start + i) % self.size]
+
+    def append(self, value: float) -> None:
+        """Add a value, dropping the oldest one when the buffer is full."""
+        if self._count < self.size:
+            self._data[(self._start + self._count) % self.size] = value
+            self._count += 1
+        else:
+            self._data[self._start] = value
+            self._start = (self._start + 1) % self.size
+
+    @property
+    def latest(self) -> Optional[float]:
+        """The newest value, or None if the buffer is empty."""
+        if not self._count:
+            return None
+        return self._data[(self._start + self._count - 1) % self.size]
+
+
+class MetricsSampler:
+    """
+    Sample system metrics from /proc.
+
+    Each call to sample() adds one value to the history of every metric:
+    CPU and memory usage in percent, the 1 minute load average and the
+    network traffic in bytes per second.
+    """
+
+    METRICS = ("cpu", "memory", "load", "network")
+
+    def __init__(self, proc_root: str = "/proc", history_size: int = HISTORY_SIZE) -> None:
+        """
+        Args:
+            proc_root: Where procfs is mounted (tests can point it elsewhere)
+            history_size: How many samples to keep for each metric
+        """
+        self.proc_root = proc_root
+        self.history: Dict[str, RingBuffer] = {
+            name: RingBuffer(history_size) for name in self.METRICS
+        }
+        self._cpu: Optional[Tuple[int, int]] = None
+        self._network: Optional[Tuple[int, float]] = None
+
+    def sample(self) -> None:
+        """Read the current metrics and add them to the history."""
+        cpu = self._read_cpu()
+        if cpu is not None:
+            self.history["cpu"].append(cpu)
+        memory = self._read_memory()
+        if memory is not None:
+            self.history["memory"].append(memory)
+        load = self._read_load()
+        if load is not None:
+            self.history["load"].append(load)
+        network = self._read_network()
+        if network is not None:
+            self.history["network"].append(network)
+
+    def values(self, name: str) -> List[float]:
+        """Get the history of a metric, oldest value first."""
+        return list(self.history[name])
+
+    def _read(self, name: str) -> str:
+        with open(os.path.join(self.proc_root, name), "r") as f:
+            return f.read()
+
+    def _read_cpu(self) -> Optional[float]:
+        """CPU usage in percent since the previous sample."""
+        try:
+            fields = self._read("stat").split("\n", 1)[0].split()[1:]
+            ticks = [int(field) for field in fields]
+            # idle + iowait count as idle time
+            idle = ticks[3] + (ticks[4] if len(ticks) > 4 else 0)
+        except (OSError, ValueError, IndexError):
+            return None
+        total = sum(ticks[:8])
+        previous, self._cpu = self._cpu, (total, idle)
+        if previous is None or total == previous[0]:
+            return None
+        return 100.0 * (1 - (idle - previous[1]) / (total - previous[0]))
+
+    def _read_memory(self) -> Optional[float]:
+        """Memory usage in percent."""
+        values = {}
+        try:
+            for line in self._read("meminfo").splitlines():
+                key, _, rest = line.partition(":")
+                if key in ("MemTotal", "MemAvailable"):
+                    values[key] = int(rest.split()[0])
+                    if len(values) == 2:
+                        break
+        except (OSError, ValueError, IndexError):
+            return None
+        if len(values) < 2 or not values["MemTotal"]:
+            return None
+        return 100.0 * (1 - values["MemAvailable"] / values["MemTotal"])
+
+    def _read_load(self) -> Optional[float]:
+        """The 1 minute load average."""
+        try:
+            return float(self._read("loadavg").split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _read_network(self) -> Optional[float]:
+        """Bytes received and sent per second since the previous sample."""
+        total = 0
+        try:
+            # The first two lines are headers
+            for line in self._read("net/dev").splitlines()[2:]:
+                interface, _, counters = line.partition(":")
+                if interface.strip() == "lo":
+                    continue
+                fields = counters.split()
+                total += int(fields[0]) + int(fields[8])
+        except (OSError, ValueError, IndexError):
+            return None
+        now = time.monotonic()
+        previous, self._network = self._network, (total, now)
+        if previous is None or now == previous[1]:
+            return None
+        return max(total - previous[0], 0) / (now - previous[1])
+
+
+def process_rss(proc_root: str = "/proc") -> Optional[int]:
+    """
+    Memory used by the BigHelp process itself.
+
+    Args:
+        proc_root: Where procfs is mounted
+
+    Returns:
+        The resident set size in bytes, or None if it can't be read
+    """
+    try:
+        with open(os.path.join(proc_root, "self", "statm"), "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
@@ -0,0 +1,208 @@
+"""
+Network interface information for BigHelp.
+
+This module reads interface details from /sys/class/net and lists their
+addresses with getifaddrs, so tools like `ip` or `ifconfig` are not needed.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import socket
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from utils import format_size
+
+
+SYS_CLASS_NET = "/sys/class/net"
+
+# Hardware type reported in /sys/class/net/*/type for loopback devices
+ARPHRD_LOOPBACK = "772"
+
+
+class Interface(NamedTuple):
+    """A network interface."""
+
+    name: str
+    state: str
+    mtu: int
+    mac: str
+    speed: Optional[int]
+    rx_bytes: int
+    tx_bytes: int
+    addresses: Tuple[str, ...]
+
+
+class _Sockaddr(ctypes.Structure):
+    _fields_ = [("sa_family", ctypes.c_ushort), ("sa_data", ctypes.c_ubyte * 14)]
+
+
+class _SockaddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_ubyte * 4),
+        ("sin_zero", ctypes.c_ubyte * 8),
+    ]
+
+
+class _SockaddrIn6(ctypes.Structure):
+    _fields_ = [
+        ("sin6_family", ctypes.c_ushort),
+        ("sin6_port", ctypes.c_uint16),
+        ("sin6_flowinfo", ctypes.c_uint32),
+        ("sin6_addr", ctypes.c_ubyte * 16),
+        ("sin6_scope_id", ctypes.c_uint32),
+    ]
+
+
+class _Ifaddrs(ctypes.Structure):
+    pass
+
+
+_Ifaddrs._fields_ = [
+    ("ifa_next", ctypes.POINTER(_Ifaddrs)),
+    ("ifa_name", ctypes.c_char_p),
+    ("ifa_flags", ctypes.c_uint),
+    ("ifa_addr", ctypes.POINTER(_Sockaddr)),
+    ("ifa_netmask", ctypes.POINTER(_Sockaddr)),
+    ("ifa_ifu", ctypes.POINTER(_Sockaddr)),
+    ("ifa_data", ctypes.c_void_p),
+]
+
+_libc = None
+
+
+def _get_libc() -> Optional[ctypes.CDLL]:
+    """Load the C library the first time it's needed."""
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            _libc.getifaddrs.argtypes = [ctypes.POINTER(ctypes.POINTER(_Ifaddrs))]
+            _libc.freeifaddrs.argtypes = [ctypes.POINTER(_Ifaddrs)]
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc or None
+
+
+def _decode_address(sockaddr: "ctypes._Pointer") -> Optional[Tuple[int, bytes]]:
+    """Get the family and raw address bytes of an IPv4 or IPv6 sockaddr."""
+    if not sockaddr:
+        return None
+    family = sockaddr.contents.sa_family
+    if family == socket.AF_INET:
+        return family, bytes(ctypes.cast(sockaddr, ctypes.POINTER(_SockaddrIn)).contents.sin_addr)
+    if family == socket.AF_INET6:
+        return family, bytes(ctypes.cast(sockaddr, ctypes.POINTER(_SockaddrIn6)).contents.sin6_addr)
+    return None
+
+
+def interface_addresses() -> Dict[str, List[str]]:
+    """
+    List the IPv4 and IPv6 addresses of every interface.
+
+    Returns:
+        A dictionary from interface name to addresses in CIDR notation
+    """
+    libc = _get_libc()
+    if libc is None:
+        return {}
+    head = ctypes.POINTER(_Ifaddrs)()
+    if libc.getifaddrs(ctypes.byref(head)) != 0:
+        return {}
+    addresses: Dict[str, List[str]] = {}
+    try:
+        entry = head
+        while entry:
+            ifa = entry.contents
+            entry = ifa.ifa_next
+            address = _decode_address(ifa.ifa_addr)
+            if address is None:
+                continue
+            family, raw = address
+            netmask = _decode_address(ifa.ifa_netmask)
+            prefix = sum(bin(byte).count("1") for byte in netmask[1]) if netmask else len(raw) * 8
+            name = ifa.ifa_name.decode(errors="replace")
+            addresses.setdefault(name, []).append(f"{socket.inet_ntop(family, raw)}/{prefix}")
+    finally:
+        libc.freeifaddrs(head)
+    return addresses
+
+
+def _read(path: str, default: str = "") -> str:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        return int(_read(path))
+    except ValueError:
+        # Missing file, or "Invalid argument" when the link is down
+        return None
+
+
+def network_interfaces(sys_root: str = SYS_CLASS_NET, include_loopback: bool = False) -> List[Interface]:
+    """
+    Collect information about the network interfaces.
+
+    Args:
+        sys_root: Where the interfaces are listed (tests can point it elsewhere)
+        include_loopback: Also include the loopback interface
+
+    Returns:
+        One record per interface, sorted by name
+    """
+    addresses = interface_addresses()
+    interfaces = []
+    try:
+        names = sorted(os.listdir(sys_root))
+    except OSError:
+        return []
+    for name in names:
+        base = os.path.join(sys_root, name)
+        if not include_loopback and _read(os.path.join(base, "type")) == ARPHRD_LOOPBACK:
+            continue
+        speed = _read_int(os.path.join(base, "speed"))
+        interfaces.append(Interface(
+            name=name,
+            state=_read(os.path.join(base, "operstate"), "unknown"),
+            mtu=_read_int(os.path.join(base, "mtu")) or 0,
+            mac=_read(os.path.join(base, "address")),
+            speed=speed if speed is not None and speed > 0 else None,
+            rx_bytes=_read_int(os.path.join(base, "statistics", "rx_bytes")) or 0,
+            tx_bytes=_read_int(os.path.join(base, "statistics", "tx_bytes")) or 0,
+            addresses=tuple(addresses.get(name, ())),
+        ))
+    return interfaces
+
+
+def format_interfaces(interfaces: List[Interface]) -> str:
+    """
+    Describe network interfaces for people, one block per interface.
+
+    Used by both the Network screen and `bighelp net`.
+
+    Args:
+        interfaces: The interfaces, as returned by network_interfaces
+
+    Returns:
+        The description, with no trailing newline
+    """
+    if not interfaces:
+        return "❌ No network interfaces found"
+    lines = []
+    for interface in interfaces:
+        status = "🟢" if interface.state == "up" else "🔴"
+        speed = f", {interface.speed} Mb/s" if interface.speed else ""
+        lines.append(f"{status} {interface.name} ({interface.state}{speed}, MTU {interface.mtu})")
+        if interface.mac:
+            lines.append(f"   🏷️ MAC: {interface.mac}")
+        for address in interface.addresses:
+            lines.append(f"   🌐 IP Address: {address}")
+        lines.append(f"   📊 Received {format_size(interface.rx_bytes)}, sent {format_size(interface.tx_bytes)}")
+    return "\n".join(lines)
@@ -0,0 +1,282 @@
+"""
+Network probes for BigHelp.
+
+This module checks several hosts at the same time using plain TCP
+connections, so no external tools like ping are needed.
+"""
+
+import asyncio
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+DEFAULT_PORT = 443
+
+# Endpoints raced by check_connectivity. IP literals need no DNS, so they
+# tell a broken resolver apart from a broken link.
+CONNECTIVITY_ENDPOINTS = ["1.1.1.1:443", "8.8.8.8:443", "9.9.9.9:443"]
+DNS_NAMES = ["google.com", "cloudflare.com", "archlinux.org"]
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of probing a single host."""
+
+    site: str
+    ok: bool
+    rtt: Optional[float] = None
+    error: str = ""
+
+
+class Connectivity(NamedTuple):
+    """Verdict of an internet connectivity check."""
+
+    dns_ok: bool
+    tcp_ok: bool
+    latency: Optional[float] = None
+    endpoint: str = ""
+
+
+def parse_site(site: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """
+    Split a site into host and port.
+
+    Args:
+        site: A host name, optionally followed by ":port"
+        default_port: Port used when the site has none
+
+    Returns:
+        A tuple (host, port)
+    """
+    host, sep, port = site.rpartition(":")
+    if sep and port.isdigit() and "]" not in port:
+        return host.strip("[]"), int(port)
+    return site.strip("[]"), default_port
+
+
+async def probe_site(
+    site: str,
+    timeout: float = 3.0,
+    default_port: int = DEFAULT_PORT
+) -> ProbeResult:
+    """
+    Open a TCP connection to a site and measure how long it takes.
+
+    Args:
+        site: A host name, optionally followed by ":port"
+        timeout: Maximum time to wait for this host
+        default_port: Port used when the site has none
+
+    Returns:
+        The probe result, with the round-trip time in seconds
+    """
+    host, port = parse_site(site, default_port)
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, happy_eyeballs_delay=0.25),
+            timeout
+        )
+    except asyncio.TimeoutError:
+        return ProbeResult(site, False, error="timed out")
+    except OSError as e:
+        return ProbeResult(site, False, error=e.strerror or str(e))
+    rtt = time.perf_counter() - start
+    writer.close()
+    return ProbeResult(site, True, rtt)
+
+
+async def probe_sites(
+    sites: Sequence[str],
+    timeout: float = 3.0,
+    deadline: float = 5.0,
+    on_result: Optional[Callable[[ProbeResult], None]] = None,
+    default_port: int = DEFAULT_PORT
+) -> List[ProbeResult]:
+    """
+    Probe all sites concurrently.
+
+    Every site gets its own timeout and the whole run is capped by the
+    deadline, so the total time is that of the slowest probe rather than
+    the sum of all of them.
+
+    Args:
+        sites: Sites to probe, as "host" or "host:port"
+        timeout: Maximum time to wait for each host
+        deadline: Maximum time for the whole run
+        on_result: Called with each result as soon as it arrives
+        default_port: Port used for sites without one
+
+    Returns:
+        The results, in the order they arrived
+    """
+    tasks = {
+        asyncio.ensure_future(probe_site(site, timeout, default_port)): site
+        for site in sites
+    }
+    results = []
+    pending = set(tasks)
+    end = time.monotonic() + deadline
+    try:
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                results.append(task.result())
+                if on_result is not None:
+                    on_result(results[-1])
+    finally:
+        await _cancel(pending)
+
+    for task in pending:
+        results.append(ProbeResult(tasks[task], False, error="timed out"))
+        if on_result is not None:
+            on_result(results[-1])
+    return results
+
+
+def check_sites(
+    sites: Sequence[str],
+    timeout: float = 3.0,
+    deadline: float = 5.0,
+    on_result: Optional[Callable[[ProbeResult], None]] = None,
+    default_port: int = DEFAULT_PORT
+) -> List[ProbeResult]:
+    """
+    Blocking wrapper around probe_sites for use from worker threads.
+
+    Takes the same arguments as probe_sites.
+    """
+    return _run_async(
+        probe_sites(sites, timeout, deadline, on_result, default_port)
+    )
+
+
+async def resolve_name(name: str, timeout: float = 3.0) -> bool:
+    """
+    Check whether a host name can be resolved.
+
+    Args:
+        name: The host name to look up
+        timeout: Maximum time to wait for the resolver
+
+    Returns:
+        True if the name resolved to at least one address
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        addresses = await asyncio.wait_for(
+            loop.getaddrinfo(name, None, type=socket.SOCK_STREAM), timeout
+        )
+    except (asyncio.TimeoutError, OSError):
+        return False
+    return bool(addresses)
+
+
+async def race_connectivity(
+    endpoints: Sequence[str] = CONNECTIVITY_ENDPOINTS,
+    dns_names: Sequence[str] = DNS_NAMES,
+    timeout: float = 3.0
+) -> Connectivity:
+    """
+    Race TCP connections and DNS lookups against several targets.
+
+    The first successful connection and the first successful lookup win;
+    every other probe of the same kind is cancelled right away.
+
+    Args:
+        endpoints: Endpoints to connect to, as "host:port"
+        dns_names: Host names to resolve
+        timeout: Maximum time to wait for any single probe
+
+    Returns:
+        The connectivity verdict, with the winning endpoint and its latency
+    """
+    tcp = {asyncio.ensure_future(probe_site(e, timeout)) for e in endpoints}
+    dns = {asyncio.ensure_future(resolve_name(n, timeout)) for n in dns_names}
+    tcp_probes = set(tcp)
+    winner = None
+    dns_ok = False
+    try:
+        while (tcp and winner is None) or (dns and not dns_ok):
+            done, _ = await asyncio.wait(
+                tcp | dns, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task in tcp_probes:
+                    tcp.discard(task)
+                    if task.result().ok and winner is None:
+                        winner = task.result()
+                        await _cancel(tcp)
+                        tcp.clear()
+                else:
+                    dns.discard(task)
+                    if task.result() and not dns_ok:
+                        dns_ok = True
+                        await _cancel(dns)
+                        dns.clear()
+    finally:
+        await _cancel(tcp | dns)
+
+    if winner is None:
+        return Connectivity(dns_ok, False)
+    return Connectivity(dns_ok, True, winner.rtt, winner.site)
+
+
+def describe_connectivity(verdict: Connectivity) -> str:
+    """
+    Describe the result of a connectivity check for people.
+
+    Used by both the Network screen and `bighelp net --check`.
+    """
+    if verdict.tcp_ok and verdict.dns_ok:
+        return f"✅ Internet connection is working! ({verdict.latency * 1000:.0f} ms)"
+    if verdict.tcp_ok:
+        return "⚠️ Internet is reachable, but website names can't be looked up (DNS problem)"
+    if verdict.dns_ok:
+        return "⚠️ Website names can be looked up, but no server could be reached"
+    return "❌ No internet connection detected"
+
+
+def check_connectivity(
+    endpoints: Sequence[str] = CONNECTIVITY_ENDPOINTS,
+    dns_names: Sequence[str] = DNS_NAMES,
+    timeout: float = 3.0
+) -> Connectivity:
+    """
+    Blocking wrapper around race_connectivity for use from worker threads.
+
+    Takes the same arguments as race_connectivity.
+    """
+    return _run_async(race_connectivity(endpoints, dns_names, timeout))
+
+
+async def _cancel(tasks: Any) -> None:
+    """Cancel tasks and wait until they have finished unwinding."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _run_async(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine on a private event loop.
+
+    Lookups run on a throwaway executor that is shut down without waiting,
+    so a hung resolver cannot hold the caller past its deadline. Its
+    thread is still joined when the interpreter exits, so a lookup that
+    hangs forever delays exiting until the resolver gives up.
+    """
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(thread_name_prefix="bighelp-probe")
+    loop.set_default_executor(executor)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+        executor.shutdown(wait=False)
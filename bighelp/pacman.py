@@ -0,0 +1,638 @@
+"""
+Pacman package database reader for BigHelp.
+
+This module reads the installed packages straight from pacman's local
+database, /var/lib/pacman/local/<name>-<version>/desc, so questions
+about installed packages don't need to run `pacman -Q`. It also indexes
+the repository databases in /var/lib/pacman/sync, so packages can be
+searched offline without running `pacman -Ss`.
+"""
+
+import bz2
+import gzip
+import heapq
+import lzma
+import marshal
+import os
+import re
+import time
+import zlib
+from typing import IO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from search import MIN_FUZZY_LENGTH, MIN_SIMILARITY, trigrams
+from utils import get_cache_dir
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+LOCAL_DB = "var/lib/pacman/local"
+SYNC_DB = "var/lib/pacman/sync"
+
+# Separators between the parts of a package name, like "python-requests"
+_NAME_PARTS = re.compile(r"[-_.+]")
+
+# Magic bytes of the compression formats repo-add can produce
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# What reading a broken repository database can raise. bzip2 reports
+# corrupt data as OSError.
+_SYNC_DB_ERRORS: Tuple[type, ...] = (OSError, EOFError, ValueError, lzma.LZMAError, zlib.error)
+if zstandard is not None:
+    _SYNC_DB_ERRORS += (zstandard.ZstdError,)
+
+# Bump when the cached format changes
+FORMAT_VERSION = 1
+
+# Version constraints in dependencies, like "glibc>=2.38"
+_CONSTRAINT = re.compile(r"[<>=]")
+
+
+class Package(NamedTuple):
+    """An installed package."""
+
+    name: str
+    version: str
+    description: str
+    url: str
+    size: int
+    install_date: int
+    explicit: bool
+    depends: Tuple[str, ...]
+
+
+def dependency_name(dependency: str) -> str:
+    """Get the package name of a dependency, without its version constraint."""
+    return _CONSTRAINT.split(dependency, 1)[0]
+
+
+def _to_int(values: List[str]) -> int:
+    try:
+        return int(values[0])
+    except (IndexError, ValueError):
+        return 0
+
+
+def parse_fields(text: str) -> Dict[str, List[str]]:
+    """
+    Split a desc file into its fields.
+
+    The file is a list of sections separated by blank lines, each one a
+    %FIELD% header followed by one value per line.
+
+    Args:
+        text: The content of the desc file
+
+    Returns:
+        Field name -> values
+    """
+    fields: Dict[str, List[str]] = {}
+    for section in text.split("\n\n"):
+        lines = section.strip("\n").split("\n")
+        if len(lines[0]) > 2 and lines[0][0] == "%" and lines[0][-1] == "%":
+            fields[lines[0][1:-1]] = lines[1:]
+    return fields
+
+
+def parse_desc(text: str) -> Optional[Package]:
+    """
+    Parse an installed package's desc file.
+
+    Args:
+        text: The content of the desc file
+
+    Returns:
+        The package, or None if the file has no name or version
+    """
+    fields = parse_fields(text)
+    name = fields.get("NAME")
+    version = fields.get("VERSION")
+    if not name or not version:
+        return None
+    return Package(
+        name=name[0],
+        version=version[0],
+        description=" ".join(fields.get("DESC", [])),
+        url=" ".join(fields.get("URL", [])),
+        size=_to_int(fields.get("SIZE", [])),
+        install_date=_to_int(fields.get("INSTALLDATE", [])),
+        # REASON is 1 for packages installed only as a dependency
+        explicit=_to_int(fields.get("REASON", [])) != 1,
+        depends=tuple(fields.get("DEPENDS", [])),
+    )
+
+
+class LocalDatabase:
+    """
+    Index of the packages installed with pacman.
+
+    The desc files are parsed once and the index is saved in a cache file
+    stamped with the modification time of the database directory. Pacman
+    adds and removes a directory for every package it installs, upgrades
+    or removes, so the index is only rebuilt after such a change.
+    """
+
+    # Minimum number of seconds between two checks for a changed database
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, root: str = "/", cache_file: Optional[str] = None) -> None:
+        """
+        Args:
+            root: The root directory pacman manages, like pacman's --root
+            cache_file: Where the index is kept between runs
+        """
+        self.path = os.path.join(root, LOCAL_DB)
+        self.cache_file = cache_file
+        self._packages: Dict[str, Package] = {}
+        self._required_by: Optional[Dict[str, List[str]]] = None
+        self._stamp: Optional[list] = None
+        self._checked = float("-inf")
+
+    @property
+    def exists(self) -> bool:
+        """Whether there is a pacman database at all."""
+        return os.path.isdir(self.path)
+
+    @property
+    def packages(self) -> Dict[str, Package]:
+        """All installed packages, by name."""
+        if time.monotonic() - self._checked >= self.CHECK_INTERVAL:
+            self.refresh()
+        return self._packages
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.packages
+
+    def get(self, name: str) -> Optional[Package]:
+        """Get an installed package by name."""
+        return self.packages.get(name)
+
+    def search(self, text: str, limit: int = 50) -> List[Package]:
+        """
+        Find installed packages by name.
+
+        Args:
+            text: Part of the package name
+            limit: Maximum number of results
+
+        Returns:
+            The matching packages, those starting with the text first
+        """
+        text = text.strip().lower()
+        if not text:
+            return []
+        names = [name for name in self.packages if text in name]
+        names.sort(key=lambda name: (not name.startswith(text), name))
+        return [self._packages[name] for name in names[:limit]]
+
+    def required_by(self, name: str) -> List[str]:
+        """List the installed packages that depend on a package."""
+        packages = self.packages
+        if self._required_by is None:
+            required_by: Dict[str, List[str]] = {}
+            for package in packages.values():
+                for dependency in package.depends:
+                    required_by.setdefault(dependency_name(dependency), []).append(package.name)
+            self._required_by = required_by
+        return sorted(self._required_by.get(name, []))
+
+    def refresh(self) -> None:
+        """Rebuild the index if the database changed since it was read."""
+        self._checked = time.monotonic()
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._set([], None)
+            return
+        stamp = [FORMAT_VERSION, self.path, st.st_mtime_ns]
+        if stamp == self._stamp:
+            return
+        packages = self._load_cache(stamp)
+        if packages is None:
+            packages = self._read_all()
+            self._save_cache(stamp, packages)
+        self._set(packages, stamp)
+
+    def _set(self, packages: List[tuple], stamp: Optional[list]) -> None:
+        self._packages = {entry[0]: Package(*entry) for entry in packages}
+        self._required_by = None
+        self._stamp = stamp
+
+    def _read_all(self) -> List[tuple]:
+        """Parse every desc file in the database."""
+        packages = []
+        try:
+            entries = os.listdir(self.path)
+        except OSError:
+            return packages
+        for entry in entries:
+            try:
+                with open(os.path.join(self.path, entry, "desc"), "r", encoding="utf-8", errors="replace") as f:
+                    package = parse_desc(f.read())
+            except OSError:
+                continue
+            if package is not None:
+                packages.append(tuple(package))
+        return packages
+
+    def _load_cache(self, stamp: list) -> Optional[List[tuple]]:
+        if not self.cache_file:
+            return None
+        try:
+            # Reading the whole file first is much faster than marshal.load
+            with open(self.cache_file, "rb") as f:
+                cached_stamp, packages = marshal.loads(f.read())
+            if cached_stamp == stamp:
+                return packages
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        return None
+
+    def _save_cache(self, stamp: list, packages: List[tuple]) -> None:
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                marshal.dump([stamp, packages], f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+
+_local_database: Optional[LocalDatabase] = None
+
+
+def get_local_database() -> LocalDatabase:
+    """
+    Get the shared database of installed packages.
+
+    Returns:
+        The local database of the running system, cached under the
+        BigHelp cache directory
+    """
+    global _local_database
+    if _local_database is None:
+        _local_database = LocalDatabase(cache_file=os.path.join(get_cache_dir(), "pacman-local.marshal"))
+    return _local_database
+
+
+class SyncPackage(NamedTuple):
+    """A package available from a repository."""
+
+    repo: str
+    name: str
+    version: str
+    description: str
+
+
+def _open_stream(raw: IO[bytes]) -> IO[bytes]:
+    """Wrap a database file in a decompressing reader, based on its magic bytes."""
+    magic = raw.peek(6)[:6]
+    if magic.startswith(b"\x1f\x8b"):
+        return gzip.GzipFile(fileobj=raw)
+    if magic.startswith(b"\xfd7zXZ"):
+        return lzma.LZMAFile(raw)
+    if magic.startswith(b"BZh"):
+        return bz2.BZ2File(raw)
+    if magic.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd compressed, install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().stream_reader(raw)
+    return raw
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("truncated archive")
+    return data
+
+
+def _skip(stream: IO[bytes], size: int) -> None:
+    """Skip over data without holding more than a small chunk in memory."""
+    while size > 0:
+        size -= len(_read_exactly(stream, min(size, 65536)))
+
+
+def _pax_path(data: bytes) -> Optional[str]:
+    """Get the path from the records of a pax extended header."""
+    while data:
+        length, _, rest = data.partition(b" ")
+        record = rest[:int(length) - len(length) - 2]
+        key, _, value = record.partition(b"=")
+        if key == b"path":
+            return value.decode("utf-8", errors="replace")
+        data = data[int(length):]
+    return None
+
+
+def iter_tar(stream: IO[bytes], wanted: Callable[[str], bool]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the wanted regular files of a tar stream, in order.
+
+    Only the 512-byte headers are parsed, and the files that aren't
+    wanted are skipped in small chunks, so nothing but the current file
+    is ever held in memory. ustar, GNU long names and pax path headers
+    are understood, which covers what bsdtar writes for repo-add.
+
+    Args:
+        stream: The uncompressed tar data
+        wanted: Tells from a file's path whether to read it
+
+    Yields:
+        (path, content) of every wanted regular file
+    """
+    next_name = None
+    while True:
+        header = stream.read(512)
+        if not header or header.count(0) == 512:
+            return
+        if len(header) < 512:
+            raise EOFError("truncated archive")
+        checksum = header[148:156].strip(b"\0 ")
+        try:
+            valid = bool(checksum) and int(checksum, 8) == sum(header) - sum(header[148:156]) + 256
+        except ValueError:
+            valid = False
+        if not valid:
+            raise ValueError("not a tar archive")
+        size = int(header[124:136].strip(b"\0 ") or b"0", 8)
+        padding = -size % 512
+        kind = header[156:157]
+
+        if kind in (b"L", b"x"):
+            data = _read_exactly(stream, size)
+            _skip(stream, padding)
+            if kind == b"L":
+                next_name = data.rstrip(b"\0").decode("utf-8", errors="replace")
+            else:
+                next_name = _pax_path(data) or next_name
+            continue
+
+        if next_name is not None:
+            name, next_name = next_name, None
+        else:
+            name = header[:100].split(b"\0", 1)[0].decode("utf-8", errors="replace")
+            if header[257:262] == b"ustar" and header[345] != 0:
+                prefix = header[345:500].split(b"\0", 1)[0].decode("utf-8", errors="replace")
+                name = f"{prefix}/{name}"
+
+        if kind in (b"0", b"\0") and wanted(name):
+            data = _read_exactly(stream, size)
+            _skip(stream, padding)
+            yield name, data
+        else:
+            _skip(stream, size + padding)
+
+
+def _first_value(text: str, field: str) -> str:
+    """Get the first value of a field in a desc file that starts with a newline."""
+    header = f"\n%{field}%\n"
+    start = text.find(header)
+    if start < 0:
+        return ""
+    start += len(header)
+    end = text.find("\n", start)
+    return text[start:end] if end >= 0 else text[start:]
+
+
+def read_sync_db(path: str) -> List[Tuple[str, str, str]]:
+    """
+    Read the packages of a repository database.
+
+    The archive is decompressed as a stream, one member at a time, so it
+    is never extracted to disk and only a small buffer is kept in memory.
+
+    Args:
+        path: A .db file, a tar archive compressed with gzip, bzip2, xz or zstd
+
+    Returns:
+        (name, version, description) of every package
+
+    Raises:
+        OSError, EOFError, ValueError, lzma.LZMAError, zlib.error,
+        zstandard.ZstdError: if the database can't be read
+    """
+    packages = []
+    with open(path, "rb") as raw:
+        stream = _open_stream(raw)
+        for _, data in iter_tar(stream, lambda name: name.endswith("/desc")):
+            # Only three single-line fields are needed, so look them up
+            # directly instead of splitting the whole file with parse_fields
+            text = "\n" + data.decode("utf-8", errors="replace")
+            name = _first_value(text, "NAME")
+            version = _first_value(text, "VERSION")
+            if name and version:
+                packages.append((name, version, _first_value(text, "DESC")))
+    return packages
+
+
+class SyncIndex:
+    """
+    Search index over the packages of every repository pacman knows about.
+
+    Each repository database is read once and saved in a cache file
+    together with its modification time and size, so only databases
+    changed by `pacman -Sy` are read again. Nothing is read until
+    refresh() is called, which can take seconds the first time, so call
+    it from a worker thread; searching never reads the databases.
+    """
+
+    def __init__(self, root: str = "/", cache_file: Optional[str] = None) -> None:
+        """
+        Args:
+            root: The root directory pacman manages, like pacman's --root
+            cache_file: Where the index is kept between runs
+        """
+        self.path = os.path.join(root, SYNC_DB)
+        self.cache_file = cache_file
+        self.errors: List[str] = []
+        self._entries: Dict[str, tuple] = {}
+        self._packages: List[SyncPackage] = []
+        # Lowercase "name description" of every package, for substring search
+        self._texts: List[str] = []
+        self._name_parts: Dict[str, List[int]] = {}
+        self._trigrams: Dict[str, List[str]] = {}
+
+    @property
+    def exists(self) -> bool:
+        """Whether there are repository databases to search."""
+        return bool(self._find_files())
+
+    @property
+    def packages(self) -> List[SyncPackage]:
+        """All packages, in repository order, as of the last refresh()."""
+        return self._packages
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def search(self, text: str, limit: int = 50) -> List[SyncPackage]:
+        """
+        Find packages by name or description.
+
+        Every word must appear in the name or the description. Exact and
+        prefix matches on the name come first. When nothing matches, names
+        similar to the query are returned, so small typos still work.
+
+        Args:
+            text: Words typed by the user
+            limit: Maximum number of results
+
+        Returns:
+            The matching packages, best first
+        """
+        words = text.lower().split()
+        if not words:
+            return []
+        packages = self.packages
+        texts = self._texts
+        matches = [i for i, line in enumerate(texts) if words[0] in line]
+        for word in words[1:]:
+            matches = [i for i in matches if word in texts[i]]
+        if matches:
+            query = " ".join(words)
+
+            def rank(i: int) -> tuple:
+                name = packages[i].name
+                if name == query:
+                    return (0, name)
+                if name.startswith(query):
+                    return (1, len(name), name)
+                if words[0] in name:
+                    return (2, len(name), name)
+                return (3, len(name), name)
+
+            return [packages[i] for i in heapq.nsmallest(limit, matches, key=rank)]
+        return self._fuzzy(words[0], limit)
+
+    def _fuzzy(self, word: str, limit: int) -> List[SyncPackage]:
+        """Find the packages with a name part similar to a word, like "firfox"."""
+        if len(word) < MIN_FUZZY_LENGTH:
+            return []
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for part in self._trigrams.get(gram, ()):
+                shared[part] = shared.get(part, 0) + 1
+        best: Dict[int, float] = {}
+        for part, common in shared.items():
+            similarity = common / (len(grams) + len(part) + 1 - common)
+            if similarity < MIN_SIMILARITY:
+                continue
+            for i in self._name_parts[part]:
+                if similarity > best.get(i, 0.0):
+                    best[i] = similarity
+        ranked = heapq.nsmallest(
+            limit, best, key=lambda i: (-best[i], len(self._packages[i].name), self._packages[i].name)
+        )
+        return [self._packages[i] for i in ranked]
+
+    def refresh(self) -> None:
+        """Read again the repository databases that changed."""
+        if not self._entries:
+            self._entries = self._load_cache()
+        entries: Dict[str, tuple] = {}
+        errors = []
+        changed = False
+        for path in self._find_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                # A broken database is remembered too, so it isn't read again
+                # until it changes
+                try:
+                    entry = (st.st_mtime_ns, st.st_size, read_sync_db(path), "")
+                except _SYNC_DB_ERRORS as e:
+                    entry = (st.st_mtime_ns, st.st_size, [], str(e) or type(e).__name__)
+                changed = True
+            entries[path] = entry
+            if entry[3]:
+                errors.append(f"{path}: {entry[3]}")
+
+        self.errors = errors
+        if not changed and entries.keys() == self._entries.keys() and self._packages:
+            return
+        if changed or entries.keys() != self._entries.keys():
+            self._save_cache(entries)
+        packages = [
+            SyncPackage(os.path.basename(path)[:-len(".db")], *package)
+            for path, entry in entries.items()
+            for package in entry[2]
+        ]
+
+        # Names like "python-requests" are matched part by part for typos
+        parts: Dict[str, List[int]] = {}
+        for i, package in enumerate(packages):
+            for part in _NAME_PARTS.split(package.name):
+                if part:
+                    parts.setdefault(part, []).append(i)
+        grams: Dict[str, List[str]] = {}
+        for part in parts:
+            for gram in trigrams(part):
+                grams.setdefault(gram, []).append(part)
+
+        self._entries = entries
+        self._packages = packages
+        self._texts = [f"{package.name} {package.description}".lower() for package in packages]
+        self._name_parts = parts
+        self._trigrams = grams
+
+    def _find_files(self) -> List[str]:
+        """List the repository databases, in name order."""
+        try:
+            names = sorted(os.listdir(self.path))
+        except OSError:
+            return []
+        return [os.path.join(self.path, name) for name in names if name.endswith(".db")]
+
+    def _load_cache(self) -> Dict[str, tuple]:
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, "rb") as f:
+                version, entries = marshal.loads(f.read())
+            if version == FORMAT_VERSION and isinstance(entries, dict):
+                return entries
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        return {}
+
+    def _save_cache(self, entries: Dict[str, tuple]) -> None:
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                marshal.dump((FORMAT_VERSION, entries), f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+
+_sync_index: Optional[SyncIndex] = None
+
+
+def get_sync_index() -> SyncIndex:
+    """
+    Get the shared index of the repository packages.
+
+    Returns:
+        The index of the running system's repositories, cached under the
+        BigHelp cache directory
+    """
+    global _sync_index
+    if _sync_index is None:
+        _sync_index = SyncIndex(cache_file=os.path.join(get_cache_dir(), "pacman-sync.marshal"))
+    return _sync_index
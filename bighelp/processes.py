@@ -0,0 +1,164 @@
+"""
+Process information for BigHelp.
+
+This module reads the process table straight from /proc, so showing the
+busiest processes doesn't need to run and parse `ps`.
+"""
+
+import heapq
+import os
+import pwd
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+SORT_KEYS = ("cpu", "memory")
+
+
+class ProcessInfo(NamedTuple):
+    """One row of the process table."""
+
+    pid: int
+    user: str
+    cpu: float
+    memory: float
+    rss: int
+    command: str
+
+
+class ProcessSampler:
+    """
+    Sample the process table and compute CPU usage between samples.
+
+    CPU usage is the share of one CPU a process used since the previous
+    sample, like `top` reports it. Only the ticks of each process are kept
+    between samples, so memory use stays small with many processes.
+    """
+
+    def __init__(self, proc_root: str = "/proc") -> None:
+        """
+        Args:
+            proc_root: Where procfs is mounted (tests can point it elsewhere)
+        """
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self._previous: Dict[int, int] = {}
+        self._previous_time: Optional[float] = None
+        self._users: Dict[int, str] = {}
+
+    @property
+    def has_sample(self) -> bool:
+        """Whether a previous sample exists to compute CPU usage from."""
+        return self._previous_time is not None
+
+    def top(
+        self,
+        count: int = 5,
+        sort_by: str = "cpu",
+        user: Optional[str] = None
+    ) -> List[ProcessInfo]:
+        """
+        Take a sample and return the busiest processes.
+
+        Args:
+            count: How many processes to return
+            sort_by: "cpu" or "memory"
+            user: Only include processes owned by this user
+
+        Returns:
+            The top processes, busiest first
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"sort_by must be one of {SORT_KEYS}, not {sort_by!r}")
+
+        now = time.monotonic()
+        elapsed = now - self._previous_time if self._previous_time is not None else 0.0
+        previous = self._previous
+        current = {}
+        rows = []
+        for pid, ticks, rss in self._read_stats():
+            current[pid] = ticks
+            if user is not None and self._user(pid) != user:
+                continue
+            delta = ticks - previous.get(pid, ticks)
+            rows.append((delta, rss, pid))
+        self._previous = current
+        self._previous_time = now
+
+        key_index = 0 if sort_by == "cpu" else 1
+        selected = heapq.nlargest(count, rows, key=lambda row: row[key_index])
+
+        total_memory = self._total_memory()
+        result = []
+        for delta, rss, pid in selected:
+            cpu = delta / self.clock_ticks / elapsed * 100 if elapsed else 0.0
+            memory = rss / total_memory * 100 if total_memory else 0.0
+            result.append(ProcessInfo(pid, self._user(pid), cpu, memory, rss, self._command(pid)))
+        return result
+
+    def _read_stats(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield (pid, cpu ticks, resident bytes) for every process."""
+        for name in os.listdir(self.proc_root):
+            if not name.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.proc_root, name, "stat"), "rb") as f:
+                    data = f.read()
+            except OSError:
+                # The process exited while we were looking
+                continue
+            # The command name may contain spaces and parentheses, so the
+            # fields are counted from the last closing parenthesis
+            fields = data[data.rfind(b")") + 2:].split()
+            try:
+                ticks = int(fields[11]) + int(fields[12])
+                rss = int(fields[21]) * self.page_size
+            except (IndexError, ValueError):
+                continue
+            yield int(name), ticks, rss
+
+    def _user(self, pid: int) -> str:
+        """Get the name of the user owning a process."""
+        uid = None
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "status"), "r") as f:
+                for line in f:
+                    if line.startswith("Uid:"):
+                        uid = int(line.split()[1])
+                        break
+        except (OSError, ValueError, IndexError):
+            pass
+        if uid is None:
+            return "?"
+        if uid not in self._users:
+            try:
+                self._users[uid] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                self._users[uid] = str(uid)
+        return self._users[uid]
+
+    def _command(self, pid: int) -> str:
+        """Get the command line of a process."""
+        base = os.path.join(self.proc_root, str(pid))
+        try:
+            with open(os.path.join(base, "cmdline"), "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").strip()
+            if cmdline:
+                return cmdline.decode(errors="replace")
+            # Kernel threads have no command line, show their name instead
+            with open(os.path.join(base, "comm"), "r") as f:
+                return f"[{f.read().strip()}]"
+        except OSError:
+            return "?"
+
+    def _total_memory(self) -> int:
+        """Get the total memory of the system in bytes."""
+        try:
+            with open(os.path.join(self.proc_root, "meminfo"), "r") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0
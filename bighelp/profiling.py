@@ -0,0 +1,124 @@
+"""
+Startup profiling for BigHelp.
+
+Both measurements run in a fresh interpreter, so modules already
+imported by the caller don't hide their cost.
+"""
+
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Time to first frame allowed by default, in milliseconds
+DEFAULT_BUDGET_MS = 1000.0
+
+_FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+from ui import BigHelpApp
+
+async def first_frame(pilot):
+    await pilot.pause()
+    print((time.perf_counter() - start) * 1000)
+    pilot.app.exit()
+
+BigHelpApp().run(headless=True, auto_pilot=first_frame)
+"""
+
+
+class ImportTime(NamedTuple):
+    """Time spent importing one module."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def _run_python(args: List[str], timeout: float = 60) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter with the package directory on the path."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PACKAGE_DIR, env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable] + args,
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=timeout
+    )
+
+
+def import_times(module: str = "ui") -> List[ImportTime]:
+    """
+    Measure how long each module takes to import, using -X importtime.
+
+    Args:
+        module: The module whose import is measured
+
+    Returns:
+        Every module imported along the way, in import order
+    """
+    result = _run_python(["-X", "importtime", "-c", f"import {module}"])
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        times.append(ImportTime(parts[2].strip(), int(parts[0]), int(parts[1])))
+    return times
+
+
+def time_to_first_frame() -> Optional[float]:
+    """
+    Measure how long the app takes to draw its first frame, headlessly.
+
+    Returns:
+        Milliseconds from the first import to the first frame, or None if
+        the app didn't start
+    """
+    try:
+        result = _run_python(["-c", _FIRST_FRAME_SCRIPT])
+        return float(result.stdout.strip().splitlines()[-1])
+    except (subprocess.TimeoutExpired, IndexError, ValueError):
+        return None
+
+
+def startup_profile(budget_ms: float = DEFAULT_BUDGET_MS, top: int = 20) -> int:
+    """
+    Print an import-time breakdown and check the time to first frame.
+
+    Args:
+        budget_ms: The allowed time to first frame, in milliseconds
+        top: How many of the slowest modules to list
+
+    Returns:
+        The exit status: 0 within budget, 1 over budget or failed to start
+    """
+    times = import_times()
+    total = sum(entry.self_us for entry in times)
+    print(f"Importing ui: {total / 1000:.1f} ms over {len(times)} modules\n")
+    print(f"{'self ms':>9} {'total ms':>9}  module")
+    for entry in sorted(times, key=lambda entry: entry.cumulative_us, reverse=True)[:top]:
+        print(f"{entry.self_us / 1000:9.1f} {entry.cumulative_us / 1000:9.1f}  {entry.module}")
+
+    # Show how much of the startup is BigHelp's own code
+    own = [
+        entry for entry in times
+        if os.path.exists(os.path.join(PACKAGE_DIR, entry.module.split(".")[0]))
+        or os.path.exists(os.path.join(PACKAGE_DIR, entry.module.split(".")[0] + ".py"))
+    ]
+    print(f"\nBigHelp modules: {', '.join(entry.module for entry in own) or 'none'}")
+    print(f"BigHelp import time: {sum(entry.self_us for entry in own) / 1000:.1f} ms")
+
+    elapsed = time_to_first_frame()
+    if elapsed is None:
+        print("\nTime to first frame: the app failed to start")
+        return 1
+    status = "within" if elapsed <= budget_ms else "OVER"
+    print(f"\nTime to first frame: {elapsed:.1f} ms ({status} the {budget_ms:.0f} ms budget)")
+    return 0 if elapsed <= budget_ms else 1
@@ -0,0 +1,374 @@
+"""
+Command safety checks for BigHelp.
+
+This module decides whether a command line typed in a tutorial is safe
+to try. The line is split into words with shlex, then into the commands
+of its pipelines, sequences (";", "&&", "||") and substitutions, and
+each command is checked against a table of rules. Wrappers like sudo,
+env or nice are looked through, so "env sudo reboot" is caught too.
+"""
+
+import re
+import shlex
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+
+SAFE = "safe"
+CAUTION = "caution"
+DANGER = "danger"
+
+_SEVERITY = {SAFE: 0, CAUTION: 1, DANGER: 2}
+
+
+class Verdict(NamedTuple):
+    """What BigHelp thinks of a command line."""
+
+    level: str
+    reason: str
+    # The command the verdict is about, like "rm -rf ~" in "cd /; rm -rf ~"
+    command: str = ""
+
+    @property
+    def allowed(self) -> bool:
+        """Whether the command line may be tried in a tutorial."""
+        return self.level != DANGER
+
+
+class FlagRule(NamedTuple):
+    """A verdict for a command used with some options or words."""
+
+    level: str
+    reason: str
+    # Matches when all the options of any one of these sets are given
+    flags: Tuple[FrozenSet[str], ...] = ()
+    words: FrozenSet[str] = frozenset()
+
+
+class Rule(NamedTuple):
+    """How safe a command is, by default and with specific options."""
+
+    level: str
+    reason: str
+    flag_rules: Tuple[FlagRule, ...] = ()
+
+
+def _rule(level: str, reason: str, *flag_rules: Tuple[str, str, str]) -> Rule:
+    """
+    Build a rule; each flag rule is (level, reason, "flags and words").
+
+    Options are written like on the command line and any of them matches:
+    "-r --recursive" matches -r, -rf or --recursive, while "-Ss" needs
+    both -S and -s. Plain words match subcommands like "install". The
+    first flag rule that matches wins.
+    """
+    compiled = []
+    for flag_level, flag_reason, spec in flag_rules:
+        flags = []
+        words = set()
+        for item in spec.split():
+            if item.startswith("--"):
+                flags.append(frozenset([item[2:]]))
+            elif item.startswith("-"):
+                flags.append(frozenset(item[1:]))
+            else:
+                words.add(item)
+        compiled.append(FlagRule(flag_level, flag_reason, tuple(flags), frozenset(words)))
+    return Rule(level, reason, tuple(compiled))
+
+
+_READS = "only looks at things, it doesn't change anything"
+
+RULES: Dict[str, Rule] = {
+    # Looking around
+    **{name: _rule(SAFE, _READS) for name in (
+        "ls", "pwd", "cd", "cat", "less", "more", "head", "tail", "echo", "printf",
+        "whoami", "id", "date", "cal", "uptime", "uname", "hostname", "ps", "top",
+        "htop", "df", "du", "free", "history", "grep", "wc", "sort", "uniq", "cut",
+        "tr", "which", "type", "man", "help", "file", "stat", "tree", "diff",
+        "ip", "ifconfig", "ping", "clear", "true", "false", "yes", "sleep", "lsblk",
+    )},
+    # find -delete and -exec are checked separately, its options are long
+    "find": _rule(SAFE, _READS),
+    "rmdir": _rule(SAFE, "rmdir only removes folders that are already empty"),
+    "mkdir": _rule(SAFE, "mkdir only creates new folders"),
+    "touch": _rule(SAFE, "touch only creates empty files or updates their time"),
+
+    # Changing files
+    "cp": _rule(CAUTION, "cp can replace a file that already exists"),
+    "mv": _rule(CAUTION, "mv can replace a file that already exists"),
+    "ln": _rule(CAUTION, "ln can replace a file that already exists"),
+    "rm": _rule(
+        DANGER, "rm deletes files for good, there is no trash can",
+        (DANGER, "rm -r deletes whole folders and everything inside, for good", "-r -R --recursive"),
+    ),
+    "shred": _rule(DANGER, "shred destroys files so they can never be recovered"),
+    "chmod": _rule(
+        CAUTION, "chmod changes who may read, change or run a file",
+        (DANGER, "chmod -R changes the permissions of everything inside a folder", "-R --recursive"),
+    ),
+    "chown": _rule(
+        CAUTION, "chown changes who owns a file",
+        (DANGER, "chown -R changes the owner of everything inside a folder", "-R --recursive"),
+    ),
+
+    # Downloads
+    "wget": _rule(CAUTION, "wget saves files from the internet"),
+    "curl": _rule(
+        SAFE, "curl only shows what a website sends back",
+        (CAUTION, "curl -o saves a file from the internet", "-o -O --output --remote-name"),
+    ),
+
+    # Programs and the computer itself
+    "kill": _rule(CAUTION, "kill stops a running program, which may lose its work"),
+    "pkill": _rule(CAUTION, "pkill stops running programs, which may lose their work"),
+    "killall": _rule(CAUTION, "killall stops running programs, which may lose their work"),
+    **{name: _rule(DANGER, f"{name} turns off or restarts the computer") for name in (
+        "shutdown", "reboot", "poweroff", "halt", "init",
+    )},
+    **{name: _rule(DANGER, f"{name} gives a command admin powers over the whole computer") for name in (
+        "sudo", "su", "doas", "pkexec",
+    )},
+    **{name: _rule(DANGER, f"{name} can erase a whole disk") for name in (
+        "dd", "fdisk", "parted", "wipefs", "mkfs", "mkswap",
+    )},
+
+    # Package managers
+    "pacman": _rule(
+        SAFE, "pacman -Q only looks up installed packages",
+        (SAFE, "pacman -Ss and -Si only look up packages", "-Ss -Si -Sl -Sg --search --info"),
+        (DANGER, "pacman -S, -R and -U install or remove programs for the whole computer",
+         "-S -R -U --sync --remove --upgrade"),
+    ),
+    "apt": _rule(
+        SAFE, "apt search and show only look up packages",
+        (DANGER, "apt changes the programs installed on the whole computer",
+         "install remove purge upgrade full-upgrade dist-upgrade autoremove update"),
+    ),
+}
+RULES["apt-get"] = RULES["apt"]
+RULES["yum"] = RULES["dnf"] = _rule(
+    SAFE, "searching and listing packages only looks things up",
+    (DANGER, "this changes the programs installed on the whole computer",
+     "install remove erase update upgrade reinstall downgrade"),
+)
+
+# Shells: "sh -c CODE" is checked as a command line, and piping anything
+# into them runs it as a script
+SHELLS = frozenset({"sh", "bash", "zsh", "dash", "fish", "ksh"})
+
+# Runs its arguments, joined together, as a command line
+EVAL = "eval"
+
+# Commands that run the command given after their own options
+_WRAPPERS = {
+    "env": re.compile(r"-|\w+="),
+    "nice": re.compile(r"-|\d+$"),
+    "nohup": None,
+    "time": re.compile(r"-"),
+    "command": re.compile(r"-"),
+    "exec": re.compile(r"-"),
+    "builtin": None,
+    "stdbuf": re.compile(r"-"),
+    "timeout": re.compile(r"-|\d+[smhd]?$"),
+    "xargs": re.compile(r"-"),
+    "watch": re.compile(r"-|\d+$"),
+    "busybox": re.compile(r"-"),
+}
+
+# Options of wrappers that take a value as the next word
+_WRAPPER_VALUES = {
+    "env": {"-u", "-C", "--unset", "--chdir"},
+    "nice": {"-n", "--adjustment"},
+    "timeout": {"-s", "-k", "--signal", "--kill-after"},
+    "xargs": {"-I", "-n", "-P", "-d", "-L", "-s", "-E", "-a"},
+    "watch": {"-n", "--interval"},
+}
+
+_SEPARATORS = {";", "&&", "||", "&", "|", "|&", "(", ")", "()", "\n"}
+_REDIRECTS = re.compile(r"\d*(>>?|>&|&>>?|<<?<?|<&|<>)")
+# shlex keeps a run of operator characters together, like ")|" in
+# "$(cmd)|sh", so such runs are split into the operators they hold
+_OPERATOR_CHARS = frozenset("();<>|&")
+_OPERATORS = re.compile(r"&&|\|\||\|&|&>>?|>>|>&|<<<|<<|<&|<>|[();&|<>]")
+_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+_FORK_BOMB = re.compile(r"([\w:]+)\s*\(\)\s*\{[^}]*\1\s*\|\s*\1")
+
+# Redirecting into these paths damages the system
+_PROTECTED_PATHS = re.compile(r"/(dev/(sd|nvme|hd|vd|mmcblk)|etc/|boot/|bin/|sbin/|usr/|lib)")
+
+
+def _words(line: str) -> List[str]:
+    """Split a command line into words and operators, like the shell does."""
+    # Backticks run a command too, so treat them like "$( )"
+    lexer = shlex.shlex(line.replace("`", " ( "), posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    words = []
+    for word in lexer:
+        if word in _SEPARATORS or not _OPERATOR_CHARS.issuperset(word) or _REDIRECTS.fullmatch(word):
+            words.append(word)
+        else:
+            words.extend(_OPERATORS.findall(word))
+    return words
+
+
+def _stages(words: List[str]) -> List[Tuple[List[str], bool]]:
+    """
+    Split words into the separate commands they run.
+
+    Returns:
+        Pairs of (words of one command, whether it reads from a pipe)
+    """
+    stages = []
+    current: List[str] = []
+    piped = False
+    for word in words:
+        if word in _SEPARATORS:
+            if current:
+                stages.append((current, piped))
+            current = []
+            piped = word in ("|", "|&")
+        elif word == "$" or word == "$(":
+            continue
+        else:
+            current.append(word)
+    if current:
+        stages.append((current, piped))
+    return stages
+
+
+def _options(args: List[str]) -> Tuple[set, set]:
+    """Collect the options and the plain words given to a command."""
+    flags = set()
+    words = set()
+    for arg in args:
+        if arg.startswith("--"):
+            flags.add(arg[2:].split("=", 1)[0])
+        elif arg.startswith("-") and len(arg) > 1:
+            flags.update(arg[1:])
+        else:
+            words.add(arg)
+    return flags, words
+
+
+def _unwrap(words: List[str]) -> List[str]:
+    """Skip variable assignments and wrappers like env, nice or nohup."""
+    i = 0
+    while i < len(words):
+        word = words[i]
+        name = word.rsplit("/", 1)[-1]
+        if _ASSIGNMENT.match(word):
+            i += 1
+        elif name in _WRAPPERS:
+            pattern = _WRAPPERS[name]
+            values = _WRAPPER_VALUES.get(name, ())
+            i += 1
+            while pattern is not None and i < len(words) and pattern.match(words[i]):
+                i += 2 if words[i] in values else 1
+        else:
+            break
+    return words[i:]
+
+
+def _check_stage(words: List[str], piped: bool, depth: int) -> Verdict:
+    """Check one command of a command line."""
+    text = " ".join(words)
+
+    # Redirections can write anywhere, whatever the command is
+    redirect_verdict = None
+    args: List[str] = []
+    i = 0
+    while i < len(words):
+        if _REDIRECTS.fullmatch(words[i]):
+            target = words[i + 1] if i + 1 < len(words) else ""
+            if ">" in words[i] and not target.startswith("&") and target not in ("/dev/null", "1", "2"):
+                if _PROTECTED_PATHS.match(target):
+                    return Verdict(DANGER, f"writing into {target} can break the computer", text)
+                redirect_verdict = Verdict(CAUTION, f"'>' replaces what was in {target}", text)
+            i += 2
+        else:
+            args.append(words[i])
+            i += 1
+
+    args = _unwrap(args)
+    if not args:
+        return redirect_verdict or Verdict(SAFE, "there is nothing to run", text)
+    name = args[0].rsplit("/", 1)[-1]
+
+    if name in SHELLS:
+        if piped:
+            return Verdict(DANGER, f"piping into {name} runs whatever came in as a script", text)
+        if "-c" in args[1:-1] and depth < 5:
+            inner = classify_line(args[args.index("-c") + 1], depth + 1)
+            return inner if inner.level != SAFE else Verdict(SAFE, inner.reason, text)
+        return Verdict(CAUTION, f"{name} runs a script, which could do anything", text)
+
+    if name == EVAL:
+        if len(args) > 1 and depth < 5:
+            inner = classify_line(" ".join(args[1:]), depth + 1)
+            return inner if inner.level != SAFE else Verdict(SAFE, inner.reason, text)
+        return Verdict(CAUTION, "eval runs text as a command, which could do anything", text)
+
+    if name == "find":
+        if "-delete" in args:
+            return Verdict(DANGER, "find -delete deletes every file it finds", text)
+        for flag in ("-exec", "-execdir", "-ok", "-okdir"):
+            if flag in args:
+                inner = _check_stage(args[args.index(flag) + 1:], False, depth + 1)
+                if inner.level != SAFE:
+                    return inner._replace(command=text)
+
+    rule = RULES.get(name)
+    if rule is None and name.startswith("mkfs."):
+        rule = RULES["mkfs"]
+    if rule is None:
+        verdict = Verdict(CAUTION, f"BigHelp doesn't know what {name} does", text)
+    else:
+        verdict = Verdict(rule.level, rule.reason, text)
+        if rule.flag_rules:
+            flags, plain = _options(args[1:])
+            for flag_rule in rule.flag_rules:
+                if any(required <= flags for required in flag_rule.flags) or plain & flag_rule.words:
+                    verdict = Verdict(flag_rule.level, flag_rule.reason, text)
+                    break
+
+    if redirect_verdict and _SEVERITY[redirect_verdict.level] > _SEVERITY[verdict.level]:
+        return redirect_verdict
+    return verdict
+
+
+def classify_line(line: str, depth: int = 0) -> Verdict:
+    """Classify a command line; see classify."""
+    if _FORK_BOMB.search(line):
+        return Verdict(DANGER, "this starts copies of itself until the computer freezes", line.strip())
+    try:
+        words = _words(line)
+    except ValueError as e:
+        return Verdict(CAUTION, f"the command can't be read: {e}", line.strip())
+
+    worst: Optional[Verdict] = None
+    for stage, piped in _stages(words):
+        verdict = _check_stage(stage, piped, depth)
+        if worst is None or _SEVERITY[verdict.level] > _SEVERITY[worst.level]:
+            worst = verdict
+            if verdict.level == DANGER:
+                break
+    return worst or Verdict(SAFE, "there is nothing to run")
+
+
+@lru_cache(maxsize=1024)
+def classify(line: str) -> Verdict:
+    """
+    Decide whether a command line is safe to try.
+
+    Every command in the line is checked, and the line gets the verdict of
+    the most dangerous one.
+
+    Args:
+        line: The command line, like "history | tail -10"
+
+    Returns:
+        The verdict, with the reason and the command it is about
+    """
+    return classify_line(line)
@@ -0,0 +1,498 @@
+"""
+Sandboxed shell for BigHelp.
+
+This module runs the tutorial commands (ls, cd, pwd, mkdir, rmdir, cp,
+mv, cat...) against a small filesystem that only exists in memory, so
+kids can try them and see real results without touching the disk or
+starting any process.
+
+Files and directories are immutable: every change builds new
+directories along the changed path and shares everything else. A
+snapshot is just a reference to the root, so resetting a lesson is
+instant no matter how much was changed.
+"""
+
+import shlex
+import time
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+
+USER = "student"
+HOME = ("home", USER)
+
+
+class File(NamedTuple):
+    """A file in the sandbox."""
+
+    content: str
+    mtime: float
+
+
+class Directory(NamedTuple):
+    """A directory in the sandbox. Its entries are never changed in place."""
+
+    entries: Mapping[str, Union[File, "Directory"]]
+    mtime: float
+
+
+Node = Union[File, Directory]
+Path = Tuple[str, ...]
+
+
+class Snapshot(NamedTuple):
+    """The state of a sandbox at some point, to go back to later."""
+
+    root: Directory
+    cwd: Path
+
+
+class SandboxError(Exception):
+    """A command failed; the message is what the real command would print."""
+
+
+def lesson_filesystem(now: Optional[float] = None) -> Directory:
+    """
+    Build the filesystem every lesson starts with.
+
+    It has the files and folders used by the tutorial examples. The
+    folders the mkdir examples create (MyFolder, Games, Pictures) are
+    left out, so those work first and the cp and mv examples that use
+    them work after them, in the order the tutorials teach.
+
+    Args:
+        now: The modification time to give everything
+
+    Returns:
+        The root directory
+    """
+    now = time.time() if now is None else now
+
+    def folder(**entries: Node) -> Directory:
+        return Directory(entries, now)
+
+    def text(content: str) -> File:
+        return File(content, now)
+
+    home = folder(**{
+        "Documents": folder(**{"homework.txt": text("Math: pages 10 to 12\n")}),
+        "Music": folder(),
+        "Videos": folder(),
+        "Downloads": folder(),
+        "EmptyFolder": folder(),
+        "NewLocation": folder(),
+        "myfile.txt": text("Hello! This is my first file.\n"),
+        "oldname.txt": text("This file wants a new name.\n"),
+        "story.txt": text("Once upon a time, a penguin learned to use the terminal.\n"),
+        "file1.txt": text("This is file one.\n"),
+        "file2.txt": text("This is file two.\n"),
+        "bigfile.txt": text("".join(f"Line {i} of a very long file\n" for i in range(1, 201))),
+        ".secret": text("You found the hidden file!\n"),
+    })
+    return folder(home=folder(**{USER: home}), tmp=folder())
+
+
+class VirtualFS:
+    """
+    A filesystem held entirely in memory.
+
+    Paths are handled like in the shell: relative to the current
+    directory, with ".", ".." and "~" understood.
+    """
+
+    def __init__(self, root: Optional[Directory] = None) -> None:
+        """
+        Args:
+            root: The root directory, defaulting to lesson_filesystem()
+        """
+        self.root = root if root is not None else lesson_filesystem()
+        self.cwd: Path = HOME
+
+    def snapshot(self) -> Snapshot:
+        """Remember the current state. Costs the same for any size."""
+        return Snapshot(self.root, self.cwd)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Go back to a remembered state. Costs the same for any size."""
+        self.root, self.cwd = snapshot
+
+    @property
+    def cwd_path(self) -> str:
+        """The current directory as a string, like "/home/student"."""
+        return "/" + "/".join(self.cwd)
+
+    def display_path(self, path: Path) -> str:
+        """Format a path like a prompt does, with ~ for the home directory."""
+        if path[:len(HOME)] == HOME:
+            return "~" + "".join("/" + part for part in path[len(HOME):])
+        return "/" + "/".join(path)
+
+    def resolve(self, path: str) -> Path:
+        """Turn a path typed by the user into an absolute path."""
+        if path == "~" or path.startswith("~/"):
+            parts = list(HOME)
+            path = path[1:]
+        elif path.startswith("/"):
+            parts = []
+        else:
+            parts = list(self.cwd)
+        for part in path.split("/"):
+            if part == "..":
+                if parts:
+                    parts.pop()
+            elif part and part != ".":
+                parts.append(part)
+        return tuple(parts)
+
+    def get(self, path: Path) -> Optional[Node]:
+        """Get the file or directory at an absolute path, or None."""
+        node: Node = self.root
+        for part in path:
+            if not isinstance(node, Directory):
+                return None
+            node = node.entries.get(part)
+            if node is None:
+                return None
+        return node
+
+    def set(self, path: Path, node: Optional[Node]) -> None:
+        """
+        Put a node at an absolute path, or remove what is there with None.
+
+        Only the directories along the path are rebuilt; everything else
+        is shared with the previous state.
+        """
+        now = time.time()
+
+        def update(directory: Directory, depth: int) -> Directory:
+            name = path[depth]
+            entries = dict(directory.entries)
+            if depth == len(path) - 1:
+                if node is None:
+                    entries.pop(name, None)
+                else:
+                    entries[name] = node
+                return Directory(entries, now)
+            entries[name] = update(directory.entries[name], depth + 1)
+            return Directory(entries, directory.mtime)
+
+        self.root = update(self.root, 0)
+
+
+class Shell:
+    """
+    Interpreter for the tutorial commands, running on a VirtualFS.
+
+    Command output and error messages follow the real commands, so what
+    kids see here is what they will see in a real terminal.
+    """
+
+    def __init__(self, fs: Optional[VirtualFS] = None) -> None:
+        """
+        Args:
+            fs: The filesystem to work on, a fresh lesson one by default
+        """
+        self.fs = fs or VirtualFS()
+        self.commands: Dict[str, Callable[[List[str]], str]] = {
+            "ls": self.ls,
+            "cd": self.cd,
+            "pwd": self.pwd,
+            "mkdir": self.mkdir,
+            "rmdir": self.rmdir,
+            "cp": self.cp,
+            "mv": self.mv,
+            "cat": self.cat,
+            "touch": self.touch,
+            "echo": self.echo,
+            "whoami": self.whoami,
+            "date": self.date,
+        }
+
+    def supports(self, name: str) -> bool:
+        """Check whether a command can run in the sandbox."""
+        return name in self.commands
+
+    @property
+    def prompt(self) -> str:
+        """The prompt a real shell would show, like "student@bighelp:~$"."""
+        return f"{USER}@bighelp:{self.fs.display_path(self.fs.cwd)}$"
+
+    def run(self, line: str) -> Tuple[bool, str]:
+        """
+        Run one command line.
+
+        Args:
+            line: The command, like "mkdir -p Documents/Projects"
+
+        Returns:
+            A tuple (success, output)
+        """
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            return False, f"bash: syntax error: {e}"
+        if not words:
+            return True, ""
+        command = self.commands.get(words[0])
+        if command is None:
+            return False, f"{words[0]}: command not found"
+        try:
+            return True, command(words[1:])
+        except SandboxError as e:
+            return False, str(e)
+
+    # Helpers
+
+    @staticmethod
+    def _options(name: str, args: List[str], allowed: str) -> Tuple[str, List[str]]:
+        """Split short options like "-la" from the other arguments."""
+        flags = ""
+        operands = []
+        for i, arg in enumerate(args):
+            if arg == "--":
+                operands.extend(args[i + 1:])
+                break
+            if arg.startswith("-") and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag not in allowed:
+                        raise SandboxError(f"{name}: invalid option -- '{flag}'")
+                    flags += flag
+            else:
+                operands.append(arg)
+        return flags, operands
+
+    def _existing(self, name: str, path: str, message: str = "cannot access") -> Tuple[Path, Node]:
+        resolved = self.fs.resolve(path)
+        node = self.fs.get(resolved)
+        if node is None:
+            raise SandboxError(f"{name}: {message} '{path}': No such file or directory")
+        return resolved, node
+
+    def _target(self, name: str, source: Path, destination: str, many: bool) -> Path:
+        """Work out where cp or mv put a source, like the real commands."""
+        resolved = self.fs.resolve(destination)
+        target = self.fs.get(resolved)
+        if isinstance(target, Directory):
+            return resolved + (source[-1],)
+        if many:
+            raise SandboxError(f"{name}: target '{destination}' is not a directory")
+        if not isinstance(self.fs.get(resolved[:-1]), Directory):
+            raise SandboxError(f"{name}: cannot create '{destination}': No such file or directory")
+        return resolved
+
+    # Commands
+
+    def ls(self, args: List[str]) -> str:
+        """List directory contents; supports -l and -a."""
+        flags, paths = self._options("ls", args, "la")
+        paths = paths or ["."]
+        blocks = []
+        for path in paths:
+            resolved, node = self._existing("ls", path)
+            if isinstance(node, File):
+                names = [(path, node)]
+            else:
+                names = sorted(
+                    (
+                        (name, child) for name, child in node.entries.items()
+                        if "a" in flags or not name.startswith(".")
+                    ),
+                    key=lambda item: item[0].lstrip(".").lower()
+                )
+                if "a" in flags:
+                    parent = self.fs.get(resolved[:-1]) or node
+                    names = [(".", node), ("..", parent)] + names
+            if "l" in flags:
+                lines = [self._long_line(name, child) for name, child in names]
+                if isinstance(node, Directory):
+                    lines.insert(0, f"total {4 * len(names)}")
+                text = "\n".join(lines)
+            else:
+                text = "  ".join(name for name, _ in names)
+            if len(paths) > 1 and isinstance(node, Directory):
+                text = f"{path}:\n{text}"
+            blocks.append(text)
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def _long_line(name: str, node: Node) -> str:
+        stamp = time.strftime("%b %d %H:%M", time.localtime(node.mtime))
+        if isinstance(node, Directory):
+            links = 2 + sum(isinstance(child, Directory) for child in node.entries.values())
+            return f"drwxr-xr-x {links:>2} {USER} {USER} {4096:>6} {stamp} {name}"
+        size = len(node.content.encode("utf-8"))
+        return f"-rw-r--r--  1 {USER} {USER} {size:>6} {stamp} {name}"
+
+    def cd(self, args: List[str]) -> str:
+        """Change the current directory; no argument goes home."""
+        if len(args) > 1:
+            raise SandboxError("bash: cd: too many arguments")
+        path = args[0] if args else "~"
+        resolved = self.fs.resolve(path)
+        node = self.fs.get(resolved)
+        if node is None:
+            raise SandboxError(f"bash: cd: {path}: No such file or directory")
+        if not isinstance(node, Directory):
+            raise SandboxError(f"bash: cd: {path}: Not a directory")
+        self.fs.cwd = resolved
+        return ""
+
+    def pwd(self, args: List[str]) -> str:
+        """Print the current directory."""
+        return self.fs.cwd_path
+
+    def mkdir(self, args: List[str]) -> str:
+        """Create directories; -p creates missing parents and ignores existing ones."""
+        flags, paths = self._options("mkdir", args, "p")
+        if not paths:
+            raise SandboxError("mkdir: missing operand")
+        errors = []
+        for path in paths:
+            resolved = self.fs.resolve(path)
+            if not resolved:
+                continue
+            if "p" in flags:
+                for depth in range(1, len(resolved) + 1):
+                    node = self.fs.get(resolved[:depth])
+                    if node is None:
+                        self.fs.set(resolved[:depth], Directory({}, time.time()))
+                    elif not isinstance(node, Directory):
+                        errors.append(f"mkdir: cannot create directory '{path}': Not a directory")
+                        break
+                continue
+            if self.fs.get(resolved) is not None:
+                errors.append(f"mkdir: cannot create directory '{path}': File exists")
+            elif not isinstance(self.fs.get(resolved[:-1]), Directory):
+                errors.append(f"mkdir: cannot create directory '{path}': No such file or directory")
+            else:
+                self.fs.set(resolved, Directory({}, time.time()))
+        if errors:
+            raise SandboxError("\n".join(errors))
+        return ""
+
+    def rmdir(self, args: List[str]) -> str:
+        """Remove empty directories."""
+        _, paths = self._options("rmdir", args, "")
+        if not paths:
+            raise SandboxError("rmdir: missing operand")
+        errors = []
+        for path in paths:
+            resolved = self.fs.resolve(path)
+            node = self.fs.get(resolved)
+            if node is None:
+                errors.append(f"rmdir: failed to remove '{path}': No such file or directory")
+            elif not isinstance(node, Directory):
+                errors.append(f"rmdir: failed to remove '{path}': Not a directory")
+            elif node.entries:
+                errors.append(f"rmdir: failed to remove '{path}': Directory not empty")
+            elif not resolved or self.fs.cwd[:len(resolved)] == resolved:
+                errors.append(f"rmdir: failed to remove '{path}': Device or resource busy")
+            else:
+                self.fs.set(resolved, None)
+        if errors:
+            raise SandboxError("\n".join(errors))
+        return ""
+
+    def _copy_or_move(self, name: str, args: List[str], allowed: str) -> List[Tuple[Path, Node, Path]]:
+        """Check the arguments of cp or mv and work out what goes where."""
+        flags, paths = self._options(name, args, allowed)
+        if len(paths) < 2:
+            raise SandboxError(f"{name}: missing destination file operand after '{paths[0]}'"
+                               if paths else f"{name}: missing file operand")
+        *sources, destination = paths
+        moves = []
+        for source in sources:
+            resolved, node = self._existing(name, source, "cannot stat")
+            if isinstance(node, Directory) and name == "cp" and "r" not in flags:
+                raise SandboxError(f"cp: -r not specified; omitting directory '{source}'")
+            target = self._target(name, resolved, destination, len(sources) > 1)
+            if target == resolved:
+                raise SandboxError(f"{name}: '{source}' and '{destination}' are the same file")
+            if isinstance(node, Directory) and target[:len(resolved)] == resolved:
+                verb = "copy" if name == "cp" else "move"
+                raise SandboxError(f"{name}: cannot {verb} '{source}' to a subdirectory of itself")
+            if isinstance(self.fs.get(target), Directory) and not isinstance(node, Directory):
+                raise SandboxError(f"{name}: cannot overwrite directory '{destination}' with non-directory")
+            moves.append((resolved, node, target))
+        return moves
+
+    def cp(self, args: List[str]) -> str:
+        """Copy files; -r copies directories too."""
+        for _, node, target in self._copy_or_move("cp", args, "rR"):
+            # Nodes are immutable, so a copy can share the original
+            self.fs.set(target, node)
+        return ""
+
+    def mv(self, args: List[str]) -> str:
+        """Move or rename files and directories."""
+        for source, node, target in self._copy_or_move("mv", args, ""):
+            self.fs.set(source, None)
+            self.fs.set(target, node)
+            if self.fs.cwd[:len(source)] == source:
+                self.fs.cwd = target + self.fs.cwd[len(source):]
+        return ""
+
+    def cat(self, args: List[str]) -> str:
+        """Print the content of files, one after the other."""
+        _, paths = self._options("cat", args, "")
+        if not paths:
+            raise SandboxError("cat: reading from the keyboard isn't possible here")
+        output = []
+        errors = []
+        for path in paths:
+            node = self.fs.get(self.fs.resolve(path))
+            if node is None:
+                errors.append(f"cat: {path}: No such file or directory")
+            elif isinstance(node, Directory):
+                errors.append(f"cat: {path}: Is a directory")
+            else:
+                output.append(node.content)
+        text = "".join(output).rstrip("\n")
+        if errors:
+            raise SandboxError("\n".join(filter(None, [text] + errors)))
+        return text
+
+    def touch(self, args: List[str]) -> str:
+        """Create empty files, or update the time of existing ones."""
+        _, paths = self._options("touch", args, "")
+        if not paths:
+            raise SandboxError("touch: missing file operand")
+        for path in paths:
+            resolved = self.fs.resolve(path)
+            node = self.fs.get(resolved)
+            if not isinstance(self.fs.get(resolved[:-1]), Directory):
+                raise SandboxError(f"touch: cannot touch '{path}': No such file or directory")
+            if isinstance(node, Directory):
+                self.fs.set(resolved, Directory(node.entries, time.time()))
+            else:
+                self.fs.set(resolved, File(node.content if node else "", time.time()))
+        return ""
+
+    def echo(self, args: List[str]) -> str:
+        """Print the arguments."""
+        return " ".join(args)
+
+    def whoami(self, args: List[str]) -> str:
+        """Print the user name."""
+        return USER
+
+    def date(self, args: List[str]) -> str:
+        """Print the date and time; "+FORMAT" chooses the format."""
+        if args and args[0].startswith("+"):
+            return time.strftime(args[0][1:])
+        return time.strftime("%a %b %d %H:%M:%S %Z %Y")
+
+
+_shell: Optional[Shell] = None
+
+
+def get_shell() -> Shell:
+    """
+    Get the sandbox shared by all lessons in this session.
+
+    Returns:
+        The shell, so changes made in one lesson are seen in the others
+    """
+    global _shell
+    if _shell is None:
+        _shell = Shell()
+    return _shell
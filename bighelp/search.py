@@ -0,0 +1,204 @@
+"""
+Full-text search over the tutorials.
+
+This module builds an inverted index over every command and ranks the
+matches with BM25. Words that are not in the index are matched to
+similar ones using trigrams, so small typos still find the command.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+
+# How much a word counts depending on where it appears
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "description": 2.0,
+    "examples": 1.5,
+    "explanation": 1.0,
+    "tip": 0.5,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Typo matching only kicks in for words at least this long
+MIN_FUZZY_LENGTH = 3
+MIN_SIMILARITY = 0.25
+MAX_EXPANSIONS = 10
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class SearchResult(NamedTuple):
+    """A command matching a search."""
+
+    category: str
+    command: str
+    score: float
+    description: str
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words."""
+    return _WORD.findall(text.lower())
+
+
+def trigrams(word: str) -> set:
+    """Get the trigrams of a word, padded so short words have some too."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _fields(info: dict) -> Dict[str, str]:
+    """Collect the searchable text of a command by field."""
+    examples = " ".join(
+        f"{example.get('command', '')} {example.get('explanation', '')}"
+        for example in info.get("examples", [])
+    )
+    return {
+        "name": info.get("name", ""),
+        "description": info.get("description", ""),
+        "examples": examples,
+        "explanation": info.get("explanation", ""),
+        "tip": info.get("tip", ""),
+    }
+
+
+class SearchIndex:
+    """Inverted index over all tutorial commands."""
+
+    def __init__(self, catalog: Mapping[str, Mapping[str, dict]]) -> None:
+        """
+        Args:
+            catalog: Category -> command name -> tutorial, like ALL_TUTORIALS
+        """
+        self.documents: List[Tuple[str, str, str]] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        lengths = []
+        for category in catalog:
+            for name, info in catalog[category].items():
+                doc_id = len(self.documents)
+                self.documents.append((category, name, info.get("description", "")))
+                weights: Counter = Counter()
+                for field, text in _fields(info).items():
+                    for word in tokenize(text):
+                        weights[word] += FIELD_WEIGHTS[field]
+                for word, weight in weights.items():
+                    self.postings[word].append((doc_id, weight))
+                lengths.append(sum(weights.values()))
+
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        count = len(self.documents)
+        self.idf = {
+            word: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for word, docs in self.postings.items()
+        }
+        # Length normalization of each document, computed once
+        self.norms = [
+            K1 * (1 - B + B * length / self.average_length) if self.average_length else K1
+            for length in lengths
+        ]
+        # What each posting adds to a document's score before the idf, so a
+        # search only multiplies and adds
+        norms = self.norms
+        self.postings = {
+            word: [(doc_id, tf * (K1 + 1) / (tf + norms[doc_id])) for doc_id, tf in docs]
+            for word, docs in self.postings.items()
+        }
+        self.vocabulary = sorted(self.postings)
+        self.trigram_index: Dict[str, List[str]] = defaultdict(list)
+        for word in self.vocabulary:
+            for gram in trigrams(word):
+                self.trigram_index[gram].append(word)
+        self.trigram_index = dict(self.trigram_index)
+
+    def expand(self, word: str, prefix: bool = False) -> List[Tuple[str, float]]:
+        """
+        Find the indexed words a query word should match.
+
+        Args:
+            word: A word from the query
+            prefix: Also match words starting with it (for the word being typed)
+
+        Returns:
+            Pairs of (indexed word, weight between 0 and 1)
+        """
+        matches = {}
+        if word in self.postings:
+            matches[word] = 1.0
+        if prefix:
+            start = bisect.bisect_left(self.vocabulary, word)
+            for candidate in self.vocabulary[start:start + MAX_EXPANSIONS]:
+                if not candidate.startswith(word):
+                    break
+                matches.setdefault(candidate, 0.9)
+        if not matches and len(word) >= MIN_FUZZY_LENGTH:
+            grams = trigrams(word)
+            shared: Counter = Counter()
+            for gram in grams:
+                shared.update(self.trigram_index.get(gram, ()))
+            scored = []
+            for candidate, common in shared.items():
+                similarity = common / (len(grams) + len(candidate) + 1 - common)
+                if similarity >= MIN_SIMILARITY:
+                    scored.append((similarity, candidate))
+            for similarity, candidate in heapq.nlargest(MAX_EXPANSIONS, scored):
+                matches[candidate] = similarity * 0.8
+        return list(matches.items())
+
+    def search(self, query: str, limit: int = 20) -> List[SearchResult]:
+        """
+        Find the commands best matching a query.
+
+        The last word is treated as a prefix, since it may still be
+        being typed.
+
+        Args:
+            query: Free text typed by the user
+            limit: Maximum number of results
+
+        Returns:
+            The matching commands, best first
+        """
+        words = tokenize(query)
+        scores: Dict[int, float] = defaultdict(float)
+        for i, word in enumerate(words):
+            is_last = i == len(words) - 1 and not query[-1:].isspace()
+            for term, weight in self.expand(word, prefix=is_last):
+                idf = self.idf[term] * weight
+                for doc_id, score in self.postings[term]:
+                    scores[doc_id] += idf * score
+
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [
+            SearchResult(*self.documents[doc_id][:2], scores[doc_id], self.documents[doc_id][2])
+            for doc_id in best
+        ]
+
+
+_index: Optional[SearchIndex] = None
+
+
+def get_index() -> SearchIndex:
+    """
+    Get the index over ALL_TUTORIALS, building it on first use.
+
+    Returns:
+        The shared search index
+    """
+    global _index
+    if _index is None:
+        from tutorials import ALL_TUTORIALS
+        _index = SearchIndex(ALL_TUTORIALS)
+    return _index
+
+
+def search(query: str, limit: int = 20) -> List[SearchResult]:
+    """Search all tutorials. See SearchIndex.search."""
+    return get_index().search(query, limit)
@@ -0,0 +1,262 @@
+"""
+Span tracing for BigHelp.
+
+When BIGHELP_TRACE is set to a file name, install() wraps the commands,
+the actions, the screens' compose and on_mount and Static.update so each
+call is recorded as a span, and the spans are written to that file on
+exit in the Chrome trace event format. Open it in chrome://tracing or
+https://ui.perfetto.dev. Nothing is wrapped when tracing is off, so it
+costs nothing then.
+"""
+
+import atexit
+import functools
+import importlib.abc
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+TRACE_ENV = "BIGHELP_TRACE"
+
+
+class Tracer:
+    """Records spans from any thread and saves them as a Chrome trace."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: The file the trace is written to
+        """
+        self.path = path
+        self._start = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        # (name, category, thread id, start us, duration us, args)
+        self._spans: List[Tuple[str, str, int, float, float, Optional[dict]]] = []
+        self._threads: Dict[int, str] = {}
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int,
+               args: Optional[dict] = None) -> None:
+        """Record a finished span; times come from time.perf_counter_ns."""
+        thread = threading.current_thread()
+        span = (name, category, thread.ident, (start_ns - self._start) / 1000,
+                (end_ns - start_ns) / 1000, args)
+        with self._lock:
+            self._spans.append(span)
+            if thread.ident not in self._threads:
+                self._threads[thread.ident] = thread.name
+
+    def wrap(self, function: Callable, name: str, category: str,
+             describe: Optional[Callable[..., dict]] = None) -> Callable:
+        """
+        Wrap a function so every call is recorded as a span.
+
+        Generator functions are timed until they are exhausted, and
+        coroutine functions until they return.
+
+        Args:
+            function: The function to wrap
+            name: The span name
+            category: The span category, shown as a filter in the viewer
+            describe: Optional function of the call arguments that returns
+                the span's args
+        """
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def traced_generator(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return (yield from function(*args, **kwargs))
+                finally:
+                    self.record(name, category, start, time.perf_counter_ns(),
+                                describe(*args, **kwargs) if describe else None)
+            return traced_generator
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def traced_coroutine(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    self.record(name, category, start, time.perf_counter_ns(),
+                                describe(*args, **kwargs) if describe else None)
+            return traced_coroutine
+
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, category, start, time.perf_counter_ns(),
+                            describe(*args, **kwargs) if describe else None)
+        return traced
+
+    def trace_event_json(self) -> dict:
+        """The recorded spans in the Chrome trace event format."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in threads.items()
+        ]
+        for name, category, tid, start, duration, args in spans:
+            event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": round(start, 3), "dur": round(duration, 3)}
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self) -> None:
+        """Write the trace file."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_event_json(), f)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """The tracer installed by install(), or None when tracing is off."""
+    return _tracer
+
+
+def _describe_command(command, *args, **kwargs) -> dict:
+    # Arguments may be paths or bytes, like subprocess accepts
+    return {"command": " ".join(map(os.fsdecode, command))}
+
+
+def _describe_widget(widget, *args, **kwargs) -> dict:
+    return {"widget": widget.id or type(widget).__name__}
+
+
+def _wrap_method(tracer: Tracer, cls: type, method: str, category: str,
+                 describe: Optional[Callable[..., dict]] = None) -> None:
+    """Trace a method defined by a class itself, not one it inherits."""
+    function = cls.__dict__.get(method)
+    if function is None:
+        return
+    if isinstance(function, staticmethod):
+        traced = tracer.wrap(function.__func__, f"{cls.__name__}.{method}", category, describe)
+        setattr(cls, method, staticmethod(traced))
+    else:
+        setattr(cls, method, tracer.wrap(function, f"{cls.__name__}.{method}", category, describe))
+
+
+class _ImportHook(importlib.abc.MetaPathFinder):
+    """Calls a function with a module right after it is first imported."""
+
+    def __init__(self, callbacks: Dict[str, Callable[[ModuleType], None]]) -> None:
+        """
+        Args:
+            callbacks: Module name -> function to call with the module
+        """
+        self.callbacks = callbacks
+
+    def find_spec(self, name: str, path=None, target=None):
+        callback = self.callbacks.pop(name, None)
+        if callback is None:
+            return None
+        # The callback is gone, so this finds the module the usual way
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_call(module: ModuleType) -> None:
+            exec_module(module)
+            callback(module)
+
+        spec.loader.exec_module = exec_and_call
+        return spec
+
+
+def _on_import(name: str, callback: Callable[[ModuleType], None]) -> None:
+    """Call a function with a module now if it is imported, or once it is."""
+    module = sys.modules.get(name)
+    if module is not None:
+        callback(module)
+        return
+    for finder in sys.meta_path:
+        if isinstance(finder, _ImportHook):
+            finder.callbacks[name] = callback
+            return
+    sys.meta_path.insert(0, _ImportHook({name: callback}))
+
+
+def _screens(module: ModuleType) -> List[type]:
+    """The screens a module defines."""
+    from textual.screen import Screen
+
+    return [
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, Screen) and value.__module__ == module.__name__
+    ]
+
+
+def install(path: Optional[str] = None) -> Optional[Tracer]:
+    """
+    Start tracing if BIGHELP_TRACE is set, saving the trace on exit.
+
+    Call it before the app starts. The screens and the actions are
+    wrapped when they are first imported, so they still load lazily.
+
+    Args:
+        path: The trace file, defaulting to the BIGHELP_TRACE variable
+
+    Returns:
+        The tracer, or None when tracing is off
+    """
+    global _tracer
+
+    path = path or os.environ.get(TRACE_ENV)
+    if not path or _tracer is not None:
+        return _tracer
+
+    from textual.widgets import Static
+
+    import ui
+    import utils
+
+    tracer = Tracer(path)
+
+    # app.actions imports the command runners by name: once it is imported
+    # it has to be given the traced ones too
+    commands = {}
+    for name in ("run_command", "stream_command"):
+        commands[name] = tracer.wrap(getattr(utils, name), name, "command", _describe_command)
+        setattr(utils, name, commands[name])
+
+    def wrap_actions(module: ModuleType) -> None:
+        for name, traced in commands.items():
+            if hasattr(module, name):
+                setattr(module, name, traced)
+        for name, member in list(vars(module.AppActions).items()):
+            if isinstance(member, staticmethod) and not name.startswith("_"):
+                _wrap_method(tracer, module.AppActions, name, "action")
+
+    def wrap_screens(module: ModuleType) -> None:
+        for screen in _screens(module):
+            _wrap_method(tracer, screen, "compose", "screen")
+            _wrap_method(tracer, screen, "on_mount", "screen")
+
+    _on_import("app.actions", wrap_actions)
+    _on_import("app.menu", wrap_screens)
+    for method in ("compose", "on_mount"):
+        _wrap_method(tracer, ui.BigHelpApp, method, "screen")
+
+    _wrap_method(tracer, Static, "update", "widget", _describe_widget)
+
+    _tracer = tracer
+    atexit.register(tracer.save)
+    return tracer
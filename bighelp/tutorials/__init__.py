@@ -4,13 +4,8 @@ Tutorial modules for BigHelp.
 This package contains educational content for teaching Linux commands to kids.
 """
 
-from .basic import BASIC_COMMANDS
-from .network import NETWORK_COMMANDS
-from .system import SYSTEM_COMMANDS
+from .store import CATEGORIES, TutorialStore
 
-# Combine all commands into a single dictionary for easy access
-ALL_TUTORIALS = {
-    "basic": BASIC_COMMANDS,
-    "network": NETWORK_COMMANDS,
-    "system": SYSTEM_COMMANDS,
-}
\ No newline at end of file
+# All commands by category. Categories are loaded from their compiled
+# form the first time they are used.
+ALL_TUTORIALS = TutorialStore()
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+External tutorial packs for BigHelp.
+
+A tutorial pack is a TOML or JSON file that adds commands without
+editing BigHelp itself:
+
+    category = "arch"
+    title = "📦 Arch Linux Commands"
+
+    [commands.pacman]
+    name = "pacman"
+    description = "Install and remove packages"
+    ...
+
+Packs are read from the system directory and then the user directory,
+so user packs win. Parsed packs are kept in a compiled index and a file
+is only parsed again when it changes. The commands of a pack are only
+read when their category is opened.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .schema import normalize_command, validate_command
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+SYSTEM_PACK_DIR = "/usr/share/bighelp/tutorials"
+
+PACK_EXTENSIONS = (".json", ".toml")
+
+# Bump when the compiled format or the normalization changes
+FORMAT_VERSION = 4
+
+# Category and command names are used in widget ids, so keep them simple
+_NAME = re.compile(r"[a-z0-9][a-z0-9_-]*\Z")
+
+
+def user_pack_dir() -> str:
+    """Get the directory where the user can add tutorial packs."""
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "bighelp", "tutorials")
+
+
+class Pack(NamedTuple):
+    """A parsed tutorial pack."""
+
+    path: str
+    category: str
+    title: str
+    commands: Dict[str, dict]
+    errors: List[str]
+
+
+def parse_pack(path: str) -> Pack:
+    """
+    Read and validate a tutorial pack.
+
+    Invalid commands are left out and reported in the pack's errors, so
+    one mistake doesn't hide the rest of the pack.
+
+    Args:
+        path: The TOML or JSON file to read
+
+    Returns:
+        The pack, with its valid commands already normalized
+    """
+    try:
+        if path.endswith(".toml"):
+            if tomllib is None:
+                return Pack(path, "", "", {}, ["TOML packs need Python 3.11 or the tomli package"])
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        return Pack(path, "", "", {}, [f"can't be read: {e}"])
+
+    if not isinstance(data, dict):
+        return Pack(path, "", "", {}, ["must contain a table"])
+    category = data.get("category")
+    if not isinstance(category, str) or not _NAME.match(category):
+        return Pack(path, "", "", {}, ["'category' must be a lowercase name like 'arch-tools'"])
+    title = data.get("title")
+    if not isinstance(title, str) or not title:
+        title = category.replace("-", " ").title()
+    raw_commands = data.get("commands")
+    if not isinstance(raw_commands, dict):
+        return Pack(path, category, title, {}, ["missing 'commands'"])
+
+    commands = {}
+    errors = []
+    for name, info in raw_commands.items():
+        if not _NAME.match(name):
+            errors.append(f"{name}: command names must be lowercase letters, digits, '-' or '_'")
+            continue
+        problems = validate_command(info)
+        if problems:
+            errors.append(f"{name}: {', '.join(problems)}")
+        else:
+            commands[name] = normalize_command(info)
+    return Pack(path, category, title, commands, errors)
+
+
+class PackInfo(NamedTuple):
+    """What the tutorial menu needs to know about a pack without its commands."""
+
+    path: str
+    category: str
+    title: str
+    errors: List[str]
+
+
+class PackIndex:
+    """
+    All tutorial packs found in the pack directories.
+
+    The parsed packs are saved in a compiled cache together with the
+    modification time and size of their source, so on the next launch
+    only new or changed files are parsed. The index file only holds what
+    the packs are about; the commands of each pack have a compiled file
+    of their own, read the first time their category is opened, so
+    starting up doesn't take longer as the packs grow.
+    """
+
+    def __init__(self, directories: List[str], cache_file: Optional[str] = None) -> None:
+        """
+        Args:
+            directories: Where to look for packs, lowest priority first
+            cache_file: Where the compiled index is kept; the compiled
+                commands go in a directory of the same name without the
+                extension
+        """
+        self.directories = directories
+        self.cache_file = cache_file
+        self.packs: List[PackInfo] = []
+        # Path -> (mtime, size) of the packs in self.packs
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        # Commands of the packs parsed by this index, by path
+        self._parsed: Dict[str, Dict[str, dict]] = {}
+
+    def load(self) -> List[PackInfo]:
+        """
+        Find all packs, parsing only new and changed ones.
+
+        Returns:
+            The packs, lowest priority first
+        """
+        cached = self._load_cache()
+        entries: Dict[str, Tuple[int, int, tuple]] = {}
+        changed = False
+        for path in self._find_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(path)
+            if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                pack = self._parse(path, st.st_mtime_ns, st.st_size)
+                entry = (st.st_mtime_ns, st.st_size, (path, pack.category, pack.title, pack.errors))
+                changed = True
+            entries[path] = entry
+
+        if changed or entries.keys() != cached.keys():
+            self._save_cache(entries)
+        self.packs = [PackInfo(*entry[2]) for entry in entries.values()]
+        self._stamps = {path: entry[:2] for path, entry in entries.items()}
+        return self.packs
+
+    def commands(self, category: str) -> Dict[str, dict]:
+        """
+        Get the commands the packs add to a category.
+
+        Args:
+            category: The category name
+
+        Returns:
+            Command name -> tutorial, later packs overriding earlier ones
+        """
+        commands: Dict[str, dict] = {}
+        for pack in self.packs:
+            if pack.category == category:
+                commands.update(self._load_commands(pack.path))
+        return commands
+
+    def _parse(self, path: str, mtime: int, size: int) -> Pack:
+        """Parse a pack and compile its commands."""
+        try:
+            pack = parse_pack(path)
+        except Exception as e:
+            # One broken pack must not hide the others
+            pack = Pack(path, "", "", {}, [f"can't be loaded: {e}"])
+        self._parsed[path] = pack.commands
+        self._write(self._commands_file(path), (FORMAT_VERSION, mtime, size, pack.commands))
+        return pack
+
+    def _load_commands(self, path: str) -> Dict[str, dict]:
+        """Read the compiled commands of a pack, parsing it again if they are missing."""
+        if path in self._parsed:
+            return self._parsed[path]
+        mtime, size = self._stamps[path]
+        commands_file = self._commands_file(path)
+        if commands_file:
+            try:
+                with open(commands_file, "rb") as f:
+                    version, cached_mtime, cached_size, commands = marshal.load(f)
+                if (version, cached_mtime, cached_size) == (FORMAT_VERSION, mtime, size):
+                    return commands
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+        return self._parse(path, mtime, size).commands
+
+    def _commands_file(self, path: str) -> Optional[str]:
+        if not self.cache_file:
+            return None
+        name = hashlib.sha1(path.encode(errors="surrogateescape")).hexdigest()
+        return os.path.join(os.path.splitext(self.cache_file)[0], f"{name}.marshal")
+
+    def _find_files(self) -> List[str]:
+        """List the pack files, in priority order."""
+        files = []
+        for directory in self.directories:
+            try:
+                names = sorted(os.listdir(directory))
+            except OSError:
+                continue
+            files.extend(
+                os.path.join(directory, name)
+                for name in names if name.endswith(PACK_EXTENSIONS)
+            )
+        return files
+
+    def _load_cache(self) -> Dict[str, tuple]:
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, "rb") as f:
+                version, entries = marshal.load(f)
+            if version == FORMAT_VERSION and isinstance(entries, dict):
+                return entries
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        return {}
+
+    def _save_cache(self, entries: Dict[str, tuple]) -> None:
+        if not self.cache_file:
+            return
+        self._write(self.cache_file, (FORMAT_VERSION, entries))
+        # Drop the compiled commands of packs that are gone
+        commands_dir = os.path.splitext(self.cache_file)[0]
+        keep = {os.path.basename(self._commands_file(path)) for path in entries}
+        try:
+            for name in os.listdir(commands_dir):
+                if name not in keep:
+                    os.remove(os.path.join(commands_dir, name))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write(cache_file: Optional[str], data: tuple) -> None:
+        """Write a compiled file, ignoring a read-only cache."""
+        if not cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(tmp_file, cache_file)
+        except (OSError, ValueError):
+            # ValueError: a value marshal can't write; the pack is simply
+            # parsed again next time
+            pass
@@ -0,0 +1,75 @@
+"""
+Tutorial format for BigHelp.
+
+Every command tutorial is a dictionary with the fields listed in
+REQUIRED_FIELDS. This module checks tutorials against that format and
+cleans up their text for display.
+"""
+
+import textwrap
+from typing import List
+
+
+REQUIRED_FIELDS = ("name", "description", "explanation", "examples", "tip", "safety")
+EXAMPLE_FIELDS = ("command", "explanation")
+
+
+def _clean(text: str) -> str:
+    """Remove the indentation and surrounding blank lines of a text block."""
+    return textwrap.dedent(text).strip()
+
+
+def normalize_command(info: dict) -> dict:
+    """
+    Prepare a command's tutorial for display.
+
+    Args:
+        info: The command as written in a tutorial module or pack
+
+    Returns:
+        A copy with all text fields dedented and stripped. Other fields,
+        like a TOML date or flag a pack added, are left out.
+    """
+    command = {
+        key: _clean(value)
+        for key, value in info.items() if isinstance(value, str)
+    }
+    command["examples"] = [
+        {key: _clean(value) for key, value in example.items() if isinstance(value, str)}
+        for example in info.get("examples", [])
+    ]
+    return command
+
+
+def validate_command(info: object) -> List[str]:
+    """
+    Check a command's tutorial against the tutorial format.
+
+    Args:
+        info: The command to check
+
+    Returns:
+        A list of problems, empty if the tutorial is valid
+    """
+    if not isinstance(info, dict):
+        return ["must be a table of fields"]
+    problems = []
+    for field in REQUIRED_FIELDS:
+        if field not in info:
+            problems.append(f"missing '{field}'")
+        elif field != "examples" and not isinstance(info[field], str):
+            problems.append(f"'{field}' must be text")
+
+    examples = info.get("examples")
+    if examples is not None:
+        if not isinstance(examples, list) or not examples:
+            problems.append("'examples' must be a non-empty list")
+        else:
+            for i, example in enumerate(examples, 1):
+                if not isinstance(example, dict) or not all(
+                    isinstance(example.get(field), str) for field in EXAMPLE_FIELDS
+                ):
+                    problems.append(f"example {i} needs 'command' and 'explanation' text")
+                elif not example["command"].strip():
+                    problems.append(f"example {i} has an empty 'command'")
+    return problems
@@ -0,0 +1,159 @@
+"""
+Compiled tutorial content for BigHelp.
+
+The tutorial modules are compiled into one marshal file per category,
+with the text already cleaned up for display. A category is only loaded
+the first time it's used, and it is compiled again whenever its source
+module changes.
+"""
+
+import importlib
+import importlib.util
+import marshal
+import os
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from utils import get_cache_dir
+from .packs import SYSTEM_PACK_DIR, PackIndex, user_pack_dir
+from .schema import normalize_command
+
+
+# Bump when the compiled format or the normalization changes
+FORMAT_VERSION = 2
+
+# Category name -> (module in this package, dictionary in that module)
+CATEGORIES: Dict[str, Tuple[str, str]] = {
+    "basic": ("basic", "BASIC_COMMANDS"),
+    "network": ("network", "NETWORK_COMMANDS"),
+    "system": ("system", "SYSTEM_COMMANDS"),
+}
+
+CATEGORY_TITLES = {
+    "basic": "📁 Basic Commands",
+    "network": "🌐 Network Commands",
+    "system": "⚙️ System Commands",
+}
+
+
+class TutorialStore(Mapping):
+    """
+    Lazily loaded mapping of category -> command name -> tutorial.
+
+    Behaves like the dictionary it replaces, but reads each category from
+    its compiled file on first access instead of importing every tutorial
+    module at startup. Commands from tutorial packs are added to their
+    category, and packs may add new categories too.
+    """
+
+    def __init__(
+        self,
+        sources: Optional[Dict[str, Tuple[str, str]]] = None,
+        cache_dir: Optional[str] = None,
+        pack_dirs: Optional[List[str]] = None
+    ) -> None:
+        """
+        Args:
+            sources: Categories to serve, like CATEGORIES
+            cache_dir: Where compiled categories are kept
+            pack_dirs: Where to look for tutorial packs, lowest priority first
+        """
+        self.sources = sources if sources is not None else CATEGORIES
+        self.cache_dir = cache_dir or os.path.join(get_cache_dir(), "tutorials")
+        self.pack_dirs = pack_dirs if pack_dirs is not None else [SYSTEM_PACK_DIR, user_pack_dir()]
+        self._loaded: Dict[str, Dict[str, dict]] = {}
+        self._packs: Optional[PackIndex] = None
+        self._pack_categories_found: Dict[str, None] = {}
+        self._titles = dict(CATEGORY_TITLES)
+
+    def __getitem__(self, category: str) -> Dict[str, dict]:
+        if category not in self._loaded:
+            in_packs = category in self._pack_categories()
+            if category not in self.sources and not in_packs:
+                raise KeyError(category)
+            commands = self._load(category) if category in self.sources else {}
+            if in_packs:
+                pack_commands = self._packs.commands(category)
+                if pack_commands:
+                    commands = {**commands, **pack_commands}
+            self._loaded[category] = commands
+        return self._loaded[category]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.sources
+        for category in self._pack_categories():
+            if category not in self.sources:
+                yield category
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def title(self, category: str) -> str:
+        """Get the display title of a category."""
+        self._pack_categories()
+        return self._titles.get(category, category.title())
+
+    @property
+    def pack_errors(self) -> List[str]:
+        """Problems found in the tutorial packs, one line per problem."""
+        self._pack_categories()
+        return [f"{pack.path}: {error}" for pack in self._packs.packs for error in pack.errors]
+
+    def _pack_categories(self) -> Dict[str, None]:
+        """
+        Find the tutorial packs the first time they are needed.
+
+        Their commands are only read when their category is opened.
+
+        Returns:
+            The categories the packs add commands to, in pack order
+        """
+        if self._packs is None:
+            packs = PackIndex(self.pack_dirs, os.path.join(self.cache_dir, "packs.marshal"))
+            for pack in packs.load():
+                if not pack.category:
+                    continue
+                self._pack_categories_found[pack.category] = None
+                self._titles.setdefault(pack.category, pack.title)
+            self._packs = packs
+        return self._pack_categories_found
+
+    def _load(self, category: str) -> Dict[str, dict]:
+        """Load a category from its compiled file, compiling it if needed."""
+        module_name, attribute = self.sources[category]
+        module_name = f"{__package__}.{module_name}"
+        spec = importlib.util.find_spec(module_name)
+        stamp = [FORMAT_VERSION]
+        if spec is not None and spec.origin:
+            try:
+                st = os.stat(spec.origin)
+                stamp += [spec.origin, st.st_mtime_ns, st.st_size]
+            except OSError:
+                pass
+
+        cache_file = os.path.join(self.cache_dir, f"{category}.marshal")
+        try:
+            with open(cache_file, "rb") as f:
+                cached_stamp, commands = marshal.load(f)
+            if cached_stamp == stamp:
+                return commands
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        module = importlib.import_module(module_name)
+        commands = {
+            name: normalize_command(info)
+            for name, info in getattr(module, attribute).items()
+        }
+        self._save(cache_file, stamp, commands)
+        return commands
+
+    def _save(self, cache_file: str, stamp: list, commands: Dict[str, dict]) -> None:
+        """Write a compiled category, ignoring a read-only cache."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "wb") as f:
+                marshal.dump([stamp, commands], f)
+            os.replace(tmp_file, cache_file)
+        except (OSError, ValueError):
+            pass
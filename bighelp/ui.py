@@ -9,7 +9,34 @@ from textual.widgets import Header, Footer, Button, Static
 from textual.containers import Container, VerticalScroll
 from textual.binding import Binding
 
-from app.menu import MainMenu
+from app.cache import ScreenCache
+from app.main_menu import MainMenu
+
+
+class KeyFooter(Footer):
+    """
+    Footer that only rebuilds its keys when they change.
+
+    Footer rebuilds its keys every time the screen's bindings are updated,
+    which happens on every screen change, and the keys it replaces stay
+    alive for as long as the footer does. The main menu's keys are the same
+    every time, so there is nothing to rebuild.
+    """
+
+    _shown_keys = None
+
+    def _keys(self) -> tuple:
+        return tuple(
+            (binding.key, binding.description, binding.action, enabled, tooltip)
+            for (_, binding, enabled, tooltip) in self.screen.active_bindings.values()
+            if binding.show
+        )
+
+    async def recompose(self) -> None:
+        keys = self._keys()
+        if keys != self._shown_keys:
+            self._shown_keys = keys
+            await super().recompose()
 
 
 class BigHelpApp(App):
@@ -68,6 +95,52 @@ class BigHelpApp(App):
         background: #2b6cb0;
     }
 
+    #command-list {
+        height: 1fr;
+        margin-bottom: 1;
+    }
+
+    .command-list {
+        height: 100%;
+    }
+
+    .metrics-panel {
+        height: auto;
+        margin-bottom: 1;
+    }
+
+    .metric-row {
+        height: 1;
+    }
+
+    .metric-label {
+        width: 24;
+    }
+
+    .metric-sparkline {
+        width: 1fr;
+    }
+
+    .stream-output {
+        height: 16;
+        margin-top: 1;
+    }
+
+    .stream-log {
+        height: 1fr;
+        border: round #2c5282;
+    }
+
+    .perf-overlay {
+        overlay: screen;
+        position: absolute;
+        height: auto;
+        padding: 0 1;
+        background: #1a202c;
+        color: #ffffff;
+        border: round #ecc94b;
+    }
+
 
     """
 
@@ -75,6 +148,7 @@ class BigHelpApp(App):
     BINDINGS = [
         Binding("q", "quit", "Quit"),
         Binding("h", "home", "Home"),
+        Binding("f12", "toggle_perf_overlay", "Performance", show=False),
         Binding("tab", "focus_next", "Next", show=False),
         Binding("shift+tab", "focus_previous", "Previous", show=False),
         Binding("up", "focus_previous", "Previous", show=False),
@@ -82,6 +156,13 @@ class BigHelpApp(App):
         Binding("enter", "select", "Select", show=False),
     ]
 
+    def __init__(self) -> None:
+        super().__init__()
+        # Tutorial screens are kept after leaving them so revisits are instant
+        self.screen_cache = ScreenCache(self)
+        self._perf_overlay = None
+        self._perf_timer = None
+
     def compose(self) -> ComposeResult:
         """Create the UI layout."""
         yield Header()
@@ -92,7 +173,7 @@ class BigHelpApp(App):
                 classes="menu-container"
             )
         )
-        yield Footer()
+        yield KeyFooter()
 
     def on_mount(self) -> None:
         """Initialize the app when mounted."""
@@ -114,6 +195,35 @@ class BigHelpApp(App):
         if buttons:
             buttons[0].focus()
 
+    def action_toggle_perf_overlay(self) -> None:
+        """Show or hide the performance overlay."""
+        from app.overlay import PerfOverlay, get_frame_timer
+
+        if self._perf_timer is not None:
+            self._perf_timer.stop()
+            self._perf_timer = None
+            if self._perf_overlay.is_attached:
+                self._perf_overlay.remove()
+            self._perf_overlay = None
+            return
+
+        get_frame_timer().install()
+        self._perf_timer = self.set_interval(PerfOverlay.INTERVAL, self._refresh_perf_overlay)
+        self._refresh_perf_overlay()
+
+    def _refresh_perf_overlay(self) -> None:
+        """Update the performance overlay, moving it to the current screen."""
+        from app.overlay import PerfOverlay
+
+        overlay = self._perf_overlay
+        if overlay is not None and overlay.is_attached and overlay.screen is self.screen:
+            overlay.refresh_stats()
+            return
+        if overlay is not None and overlay.is_attached:
+            overlay.remove()
+        self._perf_overlay = PerfOverlay()
+        self.screen.mount(self._perf_overlay)
+
     def action_quit(self) -> None:
         """Quit the application."""
         self.exit()
@@ -4,10 +4,156 @@ Utility functions for BigHelp.
 This module contains various helper functions used throughout the application.
 """
 
+import json
 import os
 import platform
+import re
+import selectors
 import subprocess
-from typing import Tuple, List, Optional
+import time
+import weakref
+from typing import Callable, Dict, Tuple, List, Optional
+
+
+def get_cache_dir() -> str:
+    """
+    Get the directory where BigHelp keeps its cache files.
+    
+    Returns:
+        The cache directory, following the XDG base directory spec
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "bighelp")
+
+
+class PathIndex:
+    """
+    Index of the executables found on PATH.
+    
+    The PATH directories are scanned once and the result is kept in a
+    dictionary, so lookups never fork a process. A directory is scanned
+    again only when its modification time changes.
+    """
+    
+    # Minimum number of seconds between two checks for changed directories
+    CHECK_INTERVAL = 1.0
+    
+    def __init__(self, path: Optional[str] = None, cache_file: Optional[str] = None) -> None:
+        """
+        Args:
+            path: Directories to index, in PATH format (defaults to $PATH)
+            cache_file: Optional JSON file used to keep the index between runs
+        """
+        self.path = path if path is not None else os.environ.get("PATH", os.defpath)
+        self.cache_file = cache_file
+        self._dirs: Dict[str, Tuple[float, List[str]]] = {}
+        self._commands: Dict[str, str] = {}
+        self._checked = 0.0
+        self._load_cache()
+        self.refresh()
+    
+    def __contains__(self, command: str) -> bool:
+        return self.which(command) is not None
+    
+    def which(self, command: str) -> Optional[str]:
+        """
+        Find the full path of a command.
+        
+        Args:
+            command: The command name, or a path to an executable
+            
+        Returns:
+            The path of the executable, or None if it wasn't found
+        """
+        if os.sep in command:
+            return command if os.path.isfile(command) and os.access(command, os.X_OK) else None
+        if time.monotonic() - self._checked >= self.CHECK_INTERVAL:
+            self.refresh()
+        directory = self._commands.get(command)
+        return os.path.join(directory, command) if directory is not None else None
+    
+    def refresh(self) -> None:
+        """Scan again the PATH directories that changed since the last scan."""
+        self._checked = time.monotonic()
+        changed = False
+        dirs = {}
+        for directory in dict.fromkeys(d for d in self.path.split(os.pathsep) if d):
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            cached = self._dirs.get(directory)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, _list_executables(directory))
+                changed = True
+            dirs[directory] = cached
+        
+        save = changed or dirs.keys() != self._dirs.keys()
+        # The commands also have to be built from a cache loaded unchanged
+        if save or not self._commands:
+            self._dirs = dirs
+            self._commands = {}
+            # Earlier PATH entries win, like in the shell
+            for directory, (_, names) in reversed(list(dirs.items())):
+                self._commands.update(dict.fromkeys(names, directory))
+        if save:
+            self._save_cache()
+    
+    def _load_cache(self) -> None:
+        """Load a previously saved index, if there is one."""
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, "r") as f:
+                data = json.load(f)
+            self._dirs = {d: (mtime, names) for d, (mtime, names) in data["dirs"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            self._dirs = {}
+    
+    def _save_cache(self) -> None:
+        """Save the index so the next run doesn't have to scan PATH again."""
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"dirs": self._dirs}, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+
+def _list_executables(directory: str) -> List[str]:
+    """List the names of the executable files in a directory."""
+    names = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and os.access(entry.path, os.X_OK):
+                        names.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return names
+
+
+_path_index: Optional[PathIndex] = None
+
+
+def get_path_index() -> PathIndex:
+    """
+    Get the shared PATH index, building it on first use.
+    
+    Returns:
+        The PATH index, persisted under the BigHelp cache directory
+    """
+    global _path_index
+    if _path_index is None:
+        _path_index = PathIndex(cache_file=os.path.join(get_cache_dir(), "path-index.json"))
+    return _path_index
 
 
 def is_command_available(command: str) -> bool:
@@ -20,17 +166,7 @@ def is_command_available(command: str) -> bool:
     Returns:
         True if the command is available, False otherwise
     """
-    try:
-        subprocess.run(
-            ["which", command], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            check=False,
-            text=True
-        )
-        return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        return False
+    return command in get_path_index()
 
 
 def get_system_info() -> dict:
@@ -62,35 +198,176 @@ def get_system_info() -> dict:
     return info
 
 
-def run_command(command: List[str], timeout: int = 5) -> Tuple[bool, str]:
+# Every process started by run_command and stream_command, until it is freed
+_processes: "weakref.WeakSet[subprocess.Popen]" = weakref.WeakSet()
+
+
+def running_commands() -> int:
+    """
+    Count the commands started by BigHelp that are still running.
+    
+    Returns:
+        The number of commands that haven't finished or been killed yet
+    """
+    return sum(1 for process in list(_processes) if process.returncode is None)
+
+
+def run_command(
+    command: List[str],
+    timeout: int = 5,
+    cancelled: Optional[Callable[[], bool]] = None
+) -> Tuple[bool, str]:
     """
     Run a command safely and return its output.
     
     Args:
         command: List of command and arguments to run
         timeout: Maximum time to wait for the command to complete
+        cancelled: Optional callback polled while waiting; when it returns
+            True the command is killed
         
     Returns:
         A tuple (success, output)
     """
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            check=False,
-            timeout=timeout,
             text=True
         )
+    except Exception as e:
+        return False, f"Error running command: {e}"
+    _processes.add(process)
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        wait = min(remaining, 0.1) if cancelled is not None else remaining
+        try:
+            stdout, stderr = process.communicate(timeout=max(wait, 0))
+            break
+        except subprocess.TimeoutExpired:
+            if cancelled is not None and cancelled():
+                _kill(process)
+                return False, "Command cancelled"
+            if time.monotonic() >= deadline:
+                _kill(process)
+                return False, "Command timed out"
+        except Exception as e:
+            _kill(process)
+            return False, f"Error running command: {e}"
+    
+    if process.returncode == 0:
+        return True, stdout
+    else:
+        return False, stderr
+
+
+# Progress updates often end with a carriage return instead of a newline
+_LINE_END = re.compile(rb"\r\n|\r|\n")
+
+
+def stream_command(
+    command: List[str],
+    on_lines: Callable[[List[str]], None],
+    idle_timeout: float = 60,
+    cancelled: Optional[Callable[[], bool]] = None
+) -> Tuple[bool, str]:
+    """
+    Run a command, passing its output to a callback as it arrives.
+    
+    stdout and stderr are merged and split into lines, counting lines
+    ended by a carriage return, which is how progress is usually drawn.
+    Blank lines are skipped. The command is only stopped when it prints
+    nothing for idle_timeout seconds, so an operation that keeps printing
+    can run as long as it needs.
+    
+    Args:
+        command: List of command and arguments to run
+        on_lines: Called with the complete lines read at once, in order
+        idle_timeout: Maximum time to wait for more output
+        cancelled: Optional callback polled while waiting; when it returns
+            True the command is killed
         
-        if result.returncode == 0:
-            return True, result.stdout
-        else:
-            return False, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "Command timed out"
+    Returns:
+        A tuple (success, message)
+    """
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT
+        )
     except Exception as e:
         return False, f"Error running command: {e}"
+    _processes.add(process)
+    
+    fd = process.stdout.fileno()
+    pending = b""
+    last_output = time.monotonic()
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            if cancelled is not None and cancelled():
+                _kill(process)
+                return False, "Command cancelled"
+            if not selector.select(0.1):
+                if time.monotonic() - last_output >= idle_timeout:
+                    _kill(process)
+                    return False, f"Command printed nothing for {idle_timeout:g} seconds"
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            last_output = time.monotonic()
+            *lines, pending = _LINE_END.split(pending + chunk)
+            lines = [line.decode("utf-8", errors="replace") for line in lines if line]
+            if lines:
+                on_lines(lines)
+    
+    if pending:
+        on_lines([pending.decode("utf-8", errors="replace")])
+    process.stdout.close()
+    process.wait()
+    if process.returncode == 0:
+        return True, ""
+    return False, f"Command failed with exit status {process.returncode}"
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """
+    Stop a child process and reap it.
+    
+    SIGTERM is sent first because sudo passes it on to the command it
+    runs, while a SIGKILL would leave that command running on its own.
+    """
+    process.terminate()
+    try:
+        process.communicate(timeout=2)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+
+
+def format_size(num_bytes: float) -> str:
+    """
+    Format a number of bytes in a human-readable way.
+    
+    Args:
+        num_bytes: The size in bytes
+        
+    Returns:
+        The size with a unit, like "1.5 GB"
+    """
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(num_bytes) < 1024 or unit == "TB":
+            break
+        num_bytes /= 1024
+    if unit == "B":
+        return f"{num_bytes:.0f} {unit}"
+    return f"{num_bytes:.1f} {unit}"
 
 
 def format_command_help(command: str, description: str, example: str) -> str: